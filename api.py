@@ -1,79 +1,458 @@
+import asyncio
+import hmac
+import os
+import signal
+import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request, UploadFile, File, HTTPException
-import spacy
-from utils import clean_text, is_valid_entity, read_pdf
-from config import SKILLS, ORGANIZATIONS, LOCATIONS, API_TITLE, API_VERSION, SPACY_MODEL
+from functools import partial
+from typing import Callable
+from fastapi import Depends, FastAPI, Header, Query, Request, Response, UploadFile, File, HTTPException
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse
+import metrics
+from batcher import MicroBatcher
+from cache import ResultCache
+from dedup import DuplicateIndex, Match, entities_of, minhash
+from index import CandidateIndex
+from jobs import JobQueue, QueueFull
+from responses import FastJSONResponse, result_shaper
+from uploads import Upload, UploadLimitMiddleware, discard, receive_upload
+from pipeline import (
+    MODES, Mode, analyze_text_batch, fast_pipeline, gazetteer_version,
+    load_pipeline, make_worker_pool, pipeline_fingerprint, prepare_text,
+    reload_gazetteer, warm_up, worker_ready,
+)
+from config import (
+    API_TITLE, API_VERSION, WORKER_POOL_KIND, WORKER_POOL_SIZE, JOB_RETRY_AFTER_SECONDS, GZIP_MIN_BYTES, ADMIN_TOKEN, INDEX_DB_PATH,
+    DEDUP_ENABLED, DEDUP_REUSE,
+)
 
-
-def make_phrase_patterns(items: list[str], label: str) -> list[dict]:
-    patterns = []
-    for item in items:
-        toks = [tok.lower() for tok in item.split()]
-        patterns.append({"label": label, "pattern": [{"LOWER": t} for t in toks]})
-    return patterns
-
-# This function runs the model.
-def load_model_with_ruler() -> spacy.Language:
-    nlp = spacy.load(SPACY_MODEL)
-    ruler = nlp.add_pipe("entity_ruler", config={"overwrite_ents": False}, before="ner")
-
-    patterns = []
-
-    patterns += make_phrase_patterns(SKILLS, "SKILL")
-    patterns += make_phrase_patterns(ORGANIZATIONS, "ORG")
-    patterns += make_phrase_patterns(LOCATIONS, "GPE")
-
-    ruler.add_patterns(patterns)
-
-    return nlp
+NOT_PDF_DETAIL = "File must be a PDF"
+NO_TEXT_DETAIL = "Couldn't extract text from PDF. It might be an image scan"
+MODE_DESCRIPTION = "fast: gazetteer matches only (skills, known orgs and locations, no people), no statistical NER"
 
 # Initialize the API with a lifespan to manage the NLP model
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Load the spaCy model on startup and store it in app.state."""
-    app.state.nlp = load_model_with_ruler()
+    """Load the spaCy model, start the worker pool and open the result cache, store them in app.state."""
+    # Prebuilt artifact when available (see `./run.sh build`), warmed up before we report ready.
+    # server.py loads it in the master before forking, so the workers share those pages.
+    # Only thread workers use this copy: process workers load their own, so then the API loads none
+    if getattr(app.state, "nlp", None) is None:
+        app.state.nlp = warm_up(load_pipeline()) if WORKER_POOL_KIND == "thread" else None
+    fast_pipeline()  # rules-only pipeline for ?mode=fast, shared by the thread workers
+    app.state.pool = make_worker_pool(nlp=app.state.nlp)
+    loop = asyncio.get_running_loop()
+    # Not ready until every worker has loaded its model, not just the first one to answer
+    ready = await asyncio.gather(*[loop.run_in_executor(app.state.pool, worker_ready) for _ in range(WORKER_POOL_SIZE)])
+    if len(set(ready)) != WORKER_POOL_SIZE:
+        raise RuntimeError(f"Only {len(set(ready))} of {WORKER_POOL_SIZE} workers answered the startup probe")
+    app.state.cache = ResultCache(pipeline_fingerprint())
+    app.state.index = CandidateIndex(INDEX_DB_PATH) if INDEX_DB_PATH else None
+    app.state.dedup = DuplicateIndex() if DEDUP_ENABLED else None
+    # Concurrent /analyze requests share NER batches, one batcher per mode. A text goes out at
+    # once while a worker is idle; batches only build up when every worker is busy
+    app.state.batchers = {
+        mode: MicroBatcher(partial(ner_batch, app, mode), max_running=WORKER_POOL_SIZE) for mode in MODES
+    }
+    app.state.jobs = JobQueue(lambda upload: run_job(app, upload), on_drop=discard)
+    app.state.jobs.start()
+    if getattr(app.state, "master_pid", None) is not None:
+        # Pre-fork worker (server.py): the master relays every gazetteer reload as a SIGHUP
+        reloads = set()
+
+        def on_sighup():
+            task = loop.create_task(reload_gazetteer_files(app))
+            reloads.add(task)  # keep a reference until it is done
+            task.add_done_callback(reloads.discard)
+
+        loop.add_signal_handler(signal.SIGHUP, on_sighup)
     yield
-    # Shutdown: no explicit cleanup needed for spaCy, but the hook is here
+    # Shutdown: stop the job workers and the pool, close the cache (spaCy itself needs no explicit cleanup)
+    await app.state.jobs.stop()
+    app.state.pool.shutdown(wait=True, cancel_futures=True)
+    app.state.cache.close()
+    if app.state.index is not None:
+        app.state.index.close()
 
-app = FastAPI(title=API_TITLE, version=API_VERSION, lifespan=lifespan)
+app = FastAPI(title=API_TITLE, version=API_VERSION, lifespan=lifespan, default_response_class=FastJSONResponse)
+# Oversized bodies are refused before (or while) they are read, not after
+app.add_middleware(UploadLimitMiddleware)
+if GZIP_MIN_BYTES > 0:
+    app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_BYTES)
 
 @app.post("/analyze")
-async def analyze_resume(request: Request, file: UploadFile = File(...)):
+async def analyze_resume(request: Request, file: UploadFile = File(...),
+                         shape: Callable[[dict], dict] = Depends(result_shaper),
+                         mode: Mode = Query("full", description=MODE_DESCRIPTION)):
     # Check file type
     if file.content_type != "application/pdf":
-        raise HTTPException(status_code=400, detail="File must be a PDF")
+        metrics.REJECTIONS.inc("not_pdf")
+        raise HTTPException(status_code=400, detail=NOT_PDF_DETAIL)
+
+    start = time.perf_counter()
+    upload = await receive_upload(file)
+    timings = {"upload": time.perf_counter() - start}
+    if upload is None:
+        metrics.REJECTIONS.inc("not_pdf")
+        raise HTTPException(status_code=400, detail=NOT_PDF_DETAIL)
+
+    try:
+        # Same bytes + same pipeline → same answer, skip the whole analysis
+        start = time.perf_counter()
+        cache = request.app.state.cache
+        key = cache.digest_key(upload.digest, mode)
+        result = await cache.get_async(key)
+        timings["cache"] = time.perf_counter() - start
+
+        if result is not None:
+            metrics.observe_analysis({"timings": timings})
+            return FastJSONResponse(shape(result), headers={"Server-Timing": metrics.server_timing(timings)})
 
-    content = await file.read()
+        # Extract and clean in the worker pool so the event loop stays free
+        loop = asyncio.get_running_loop()
+        text, extraction, stats = await loop.run_in_executor(request.app.state.pool, prepare_text, upload.source)
+    finally:
+        discard(upload)
+    stats["timings"].update(timings)
 
-    raw_text = read_pdf(content)
+    if text is None:
+        metrics.observe_analysis(stats)
+        metrics.REJECTIONS.inc("empty_text")
+        server_timing = metrics.server_timing(stats["timings"])
+        raise HTTPException(status_code=400, detail=NO_TEXT_DETAIL, headers={"Server-Timing": server_timing})
 
-    if not raw_text.strip():
-        raise HTTPException(status_code=400, detail="Couldn't extract text from PDF. It might be an image scan")
+    signature, match = await find_duplicate(request.app, upload.digest, text, mode)
+    reused = reusable(request.app, match, mode)
+    if reused:
+        # Near-duplicate of a resume already analysed: its entities stand in for the NER
+        result = {"text": text, **match.entities}
+    else:
+        # NER and filter, batched with the texts of concurrent requests
+        result, ner_stats = await request.app.state.batchers[mode].submit(text)
+        stats["timings"].update(ner_stats.pop("timings"))
+        stats.update(ner_stats)
+        remember(request.app, upload.digest, signature, result, mode)
+    metrics.observe_analysis(stats)
+    server_timing = metrics.server_timing(stats["timings"])
 
-    processed_text = clean_text(raw_text)
+    mark_duplicate(result, match, reused)
+    result["extraction"] = extraction
+    await cache.set_async(key, result)
+    if mode == "full":
+        await index_result(request.app, upload.digest, result, file.filename)
+    return FastJSONResponse(shape(result), headers={"Server-Timing": server_timing})
 
-    # Retrieve the NLP model from app state and process the text
-    nlp = request.app.state.nlp
-    doc = nlp(processed_text)
+def gazetteer_pipeline(app: FastAPI):
+    """The API's own gazetteer, which the workers follow: the shared model's, else the rules-only pipeline's."""
+    return app.state.nlp if app.state.nlp is not None else fast_pipeline()
 
-    # Extract the data
-    skills = set()
-    people = []
-    info = set()
+async def index_result(app: FastAPI, digest: str, result: dict, filename: str | None = None):
+    """Stores a freshly analysed full-mode result in the candidate index, when one is configured."""
+    if app.state.index is not None:
+        await asyncio.to_thread(app.state.index.add, digest, result, filename)
 
-    for ent in doc.ents:
-        if ent.label_ == "SKILL":
-            skills.add(ent.text)
-        elif ent.label_ == "PER" and not people and is_valid_entity(ent.text, ent.label_):
-            people.append(ent.text)
+async def find_duplicate(app: FastAPI, digest: str, text: str, mode: Mode):
+    """
+    MinHash of a fresh text and the most similar document analysed before it. (None, None)
+    when dedup is off, and in fast mode, whose results are never added to the index.
+    """
+    if app.state.dedup is None or mode != "full":
+        return None, None
+    signature = await asyncio.to_thread(minhash, text)
+    return signature, app.state.dedup.query(signature, exclude=digest)
+
+def reusable(app: FastAPI, match: Match | None, mode: Mode, in_flight: dict | None = None) -> bool:
+    """
+    Whether a near-duplicate's entities can replace the NER: reuse enabled, full mode, same
+    gazetteer. A match still being analysed counts when it is one of `in_flight`, the texts
+    going through the same NER pass (its entities are taken from that pass).
+    """
+    if not (DEDUP_REUSE and mode == "full" and match is not None):
+        return False
+    if match.entities is None:
+        return in_flight is not None and match.id in in_flight
+    return match.entities.get("gazetteer_version") == gazetteer_version(gazetteer_pipeline(app))
+
+def remember(app: FastAPI, digest: str, signature, result: dict, mode: Mode):
+    """Adds a freshly analysed full-mode result to the near-duplicate index."""
+    if signature is not None and mode == "full":
+        app.state.dedup.add(digest, signature, entities_of(result))
+
+def mark_duplicate(result: dict, match: Match | None, reused: bool):
+    """Reports the near-duplicate (id and estimated similarity) in the result, and counts it."""
+    result["duplicate_of"] = match.id if match else None
+    result["similarity"] = round(match.similarity, 3) if match else None
+    if match is not None:
+        metrics.DUPLICATES.inc("reused" if reused else "analysed")
+
+async def ner_batch(app: FastAPI, mode: Mode, texts: list[str]) -> list[tuple[dict, dict]]:
+    """
+    MicroBatcher handler: NER over the texts of concurrent /analyze calls, split into one
+    slice per pool worker like /analyze/batch, each slice one nlp.pipe pass.
+    """
+    metrics.NER_BATCH_SIZE.observe(len(texts), mode)
+    loop = asyncio.get_running_loop()
+    # Process workers compare their gazetteer with ours and reload it if we were reloaded
+    expected = gazetteer_version(gazetteer_pipeline(app))
+    parts = await asyncio.gather(*[
+        loop.run_in_executor(app.state.pool, analyze_text_batch, part, mode, expected)
+        for part in split_evenly(texts, WORKER_POOL_SIZE)
+    ])
+    return [item for items in parts for item in items]
+
+def split_evenly(items: list, n: int) -> list[list]:
+    """Consecutive slices of `items`, at most `n` of them, whose sizes differ by one at most."""
+    n = max(1, min(n, len(items)))
+    bounds = [len(items) * k // n for k in range(n + 1)]
+    return [items[bounds[k]:bounds[k + 1]] for k in range(n)] if items else []
+
+@app.post("/analyze/batch")
+async def analyze_resume_batch(request: Request, files: list[UploadFile] = File(...),
+                               shape: Callable[[dict], dict] = Depends(result_shaper),
+                               mode: Mode = Query("full", description=MODE_DESCRIPTION)):
+    """
+    Analyses many PDFs in one request. Extraction runs per file in the worker pool,
+    then the texts are split into one slice per worker, each going through a single
+    nlp.pipe pass there. Results keep the upload order; files that fail carry an
+    "error" instead of the entities.
+    """
+    loop = asyncio.get_running_loop()
+    pool = request.app.state.pool
+    cache = request.app.state.cache
+
+    results = [{"filename": file.filename} for file in files]
+    keys = {}
+    digests = {}
+    pending = {}
+    uploads = []
+
+    try:
+        for i, file in enumerate(files):
+            try:
+                upload = await receive_upload(file) if file.content_type == "application/pdf" else None
+            except HTTPException as e:  # this file is over the size limit, the others go on
+                results[i]["error"] = e.detail
+                continue
+            if upload is None:
+                metrics.REJECTIONS.inc("not_pdf")
+                results[i]["error"] = NOT_PDF_DETAIL
+                continue
+            uploads.append(upload)
+            keys[i] = cache.digest_key(upload.digest, mode)
+            digests[i] = upload.digest
+            cached = await cache.get_async(keys[i])
+            if cached is not None:
+                results[i].update(shape(cached))
+                continue
+            pending[i] = loop.run_in_executor(pool, prepare_text, upload.source)
+        prepared = await asyncio.gather(*pending.values())
+    finally:
+        for upload in uploads:
+            discard(upload)
+
+    texts = {}
+    extractions = {}
+    prepare_stats = {}
+    for i, (text, extraction, stats) in zip(pending, prepared):
+        if text is None:
+            metrics.observe_analysis(stats)
+            metrics.REJECTIONS.inc("empty_text")
+            results[i]["error"] = NO_TEXT_DETAIL
         else:
-            # Capture Everything Else (Orgs, Locations, and Extra People)
-            if is_valid_entity(ent.text, ent.label_):
-                info.add(ent.text)
-
-    return {
-        "text_preview": processed_text,
-        "skills": list(skills),
-        "people": people,
-        "info": list(info)
-    }
+            texts[i] = text
+            extractions[i] = extraction
+            prepare_stats[i] = stats
+
+    duplicates = {}
+    to_analyze = {}
+    in_flight = {}  # digest -> position, of the texts this batch sends to the NER
+    for i, text in texts.items():
+        signature, match = await find_duplicate(request.app, digests[i], text, mode)
+        duplicates[i] = (signature, match, reusable(request.app, match, mode, in_flight))
+        if not duplicates[i][2]:
+            to_analyze[i] = text
+            in_flight[digests[i]] = i
+            if signature is not None:
+                # Matchable by the rest of this batch right away; its entities come with the NER results
+                request.app.state.dedup.add(digests[i], signature)
+
+    # NER in the worker pool: one nlp.pipe pass per slice, the slices spread over the workers
+    expected = gazetteer_version(gazetteer_pipeline(request.app))
+    slices = split_evenly(list(to_analyze), WORKER_POOL_SIZE)
+    parts = await asyncio.gather(*[
+        loop.run_in_executor(pool, analyze_text_batch, [texts[i] for i in part], mode, expected)
+        for part in slices
+    ])
+    analyzed = {i: item for part, items in zip(slices, parts) for i, item in zip(part, items)}
+
+    for i, (signature, match, reused) in duplicates.items():
+        if reused:
+            # Near-duplicate of a resume already analysed (or in this batch): its entities stand in for the NER
+            entities = match.entities
+            if entities is None:
+                entities = entities_of(analyzed[in_flight[match.id]][0])
+            result, stats = {"text": texts[i], **entities}, {}
+        else:
+            result, stats = analyzed[i]
+            stats["timings"].update(prepare_stats[i]["timings"])
+            remember(request.app, digests[i], signature, result, mode)
+        metrics.observe_analysis({**prepare_stats[i], **stats})
+        mark_duplicate(result, match, reused)
+        result["extraction"] = extractions[i]
+        await cache.set_async(keys[i], result)
+        if mode == "full":
+            await index_result(request.app, digests[i], result, files[i].filename)
+        results[i].update(shape(result))
+
+    return FastJSONResponse({"results": results})
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics(request: Request):
+    """Stage latency histograms and pipeline counters in Prometheus text format."""
+    cache = request.app.state.cache.stats()
+    extra = (
+        metrics.gauge("vitae_cache_hits", "Result cache hits since startup.", cache["hits"])
+        + metrics.gauge("vitae_cache_misses", "Result cache misses since startup.", cache["misses"])
+        + metrics.gauge("vitae_cache_entries", "Results held in the in-memory cache.", cache["entries"])
+        + metrics.gauge("vitae_jobs_queued", "Jobs waiting in the /jobs queue.", request.app.state.jobs.stats()["queued"])
+    )
+    return PlainTextResponse(metrics.render(extra), media_type="text/plain; version=0.0.4")
+
+@app.post("/admin/gazetteers/reload")
+async def reload_gazetteers(request: Request, x_admin_token: str | None = Header(None)):
+    """
+    Re-reads the gazetteer term files into the running pipeline: no restart, no model
+    reload, in-flight requests finish with the previous terms.
+    """
+    # Fail closed: without a configured token nobody may reload (under server.py, every worker)
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled: set VITAE_ADMIN_TOKEN")
+    if not hmac.compare_digest(x_admin_token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+    version = await reload_gazetteer_files(request.app)
+    master_pid = getattr(request.app.state, "master_pid", None)
+    if master_pid is not None:
+        # Pre-fork server: the master reloads its own copy (for future forks) and tells every worker
+        os.kill(master_pid, signal.SIGHUP)
+    return {"gazetteer_version": version, "terms": len(gazetteer_pipeline(request.app).get_pipe("gazetteer"))}
+
+async def reload_gazetteer_files(app: FastAPI) -> str:
+    """Re-reads the term files into this process's gazetteer and moves the result cache to the new fingerprint."""
+    version = await asyncio.to_thread(reload_gazetteer, gazetteer_pipeline(app))
+    # The fingerprint covers the term files, so results from the old terms stop matching
+    app.state.cache.fingerprint = pipeline_fingerprint()
+    return version
+
+def split_terms(value: str | None) -> list[str]:
+    return [term.strip() for term in value.split(",") if term.strip()] if value else []
+
+@app.get("/candidates/search")
+async def search_candidates(
+    request: Request,
+    skills: str | None = Query(None, description="Comma-separated skills a candidate must all have"),
+    any_skills: str | None = Query(None, alias="any", description="Comma-separated skills ranked by how many match"),
+    exclude: str | None = Query(None, description="Comma-separated skills a candidate must not have"),
+    org: str | None = Query(None, description="Comma-separated organizations a candidate must all mention"),
+    location: str | None = Query(None, description="Comma-separated locations a candidate must all mention"),
+    q: str | None = Query(None, description="Full-text query (SQLite FTS5 syntax) over names, skills and entities"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Boolean skill/org/location filters and ranking over every resume analysed so far,
+    answered from the candidate index without touching a PDF. Needs VITAE_INDEX_DB.
+    """
+    index = request.app.state.index
+    if index is None:
+        raise HTTPException(status_code=503, detail="Candidate index is disabled (set VITAE_INDEX_DB)")
+    try:
+        return await asyncio.to_thread(
+            index.search, split_terms(skills), split_terms(any_skills), split_terms(exclude),
+            split_terms(org), split_terms(location), q, limit, offset,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/cache/stats")
+async def cache_stats(request: Request):
+    """Hit/miss counters and occupancy of the result cache."""
+    return request.app.state.cache.stats()
+
+async def run_job(app: FastAPI, upload: Upload) -> dict:
+    """
+    Job queue handler: same analysis as /analyze. Extraction runs in the worker pool and
+    the NER goes through the full-mode micro-batcher, so jobs never hold the event loop.
+    """
+    cache = app.state.cache
+    key = cache.digest_key(upload.digest)
+    try:
+        result = await cache.get_async(key)
+        if result is not None:
+            return result
+
+        loop = asyncio.get_running_loop()
+        text, extraction, stats = await loop.run_in_executor(app.state.pool, prepare_text, upload.source)
+    finally:
+        discard(upload)
+    if text is None:
+        metrics.observe_analysis(stats)
+        metrics.REJECTIONS.inc("empty_text")
+        raise ValueError(NO_TEXT_DETAIL)
+
+    result, ner_stats = await app.state.batchers["full"].submit(text)
+    stats["timings"].update(ner_stats.pop("timings"))
+    stats.update(ner_stats)
+    metrics.observe_analysis(stats)
+
+    result["extraction"] = extraction
+    await cache.set_async(key, result)
+    await index_result(app, upload.digest, result)
+    return result
+
+@app.post("/jobs", status_code=202)
+async def create_job(request: Request, response: Response, file: UploadFile = File(...)):
+    """
+    Queues a resume for analysis and returns its job id right away.
+    Poll GET /jobs/{id} for the result. Answers 429 when the queue is full.
+    """
+    if file.content_type != "application/pdf":
+        metrics.REJECTIONS.inc("not_pdf")
+        raise HTTPException(status_code=400, detail=NOT_PDF_DETAIL)
+
+    # Refuse before spooling the upload to disk; the QueueFull below covers the race
+    if request.app.state.jobs.full():
+        raise queue_full()
+
+    upload = await receive_upload(file)
+    if upload is None:
+        metrics.REJECTIONS.inc("not_pdf")
+        raise HTTPException(status_code=400, detail=NOT_PDF_DETAIL)
+
+    try:
+        job = request.app.state.jobs.submit(upload)
+    except QueueFull:
+        discard(upload)
+        raise queue_full()
+
+    response.headers["Location"] = f"/jobs/{job['id']}"
+    return job
+
+def queue_full() -> HTTPException:
+    """ 429 for a full /jobs queue, with a Retry-After hint """
+    return HTTPException(
+        status_code=429,
+        detail="Too many resumes waiting, try again later",
+        headers={"Retry-After": str(JOB_RETRY_AFTER_SECONDS)},
+    )
+
+@app.get("/jobs/{job_id}")
+async def get_job(request: Request, job_id: str, shape: Callable[[dict], dict] = Depends(result_shaper)):
+    """Status of a queued job ("queued", "running", "done" or "failed") and its result when done."""
+    job = request.app.state.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if "result" in job:
+        job = {**job, "result": shape(job["result"])}
+    return FastJSONResponse(job)
@@ -1,8 +1,16 @@
+import hashlib
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
 
 API_URL = os.environ.get("VITAE_API_URL", "http://127.0.0.1:8000/analyze")
+# (connect, read) seconds: a dead API fails fast, a long resume still has time to be analysed
+API_TIMEOUT = (5, float(os.environ.get("VITAE_API_TIMEOUT", "120")))
+# Resumes sent to the API at the same time
+MAX_PARALLEL = int(os.environ.get("VITAE_UI_PARALLEL", "8"))
 
 
 def load_css(filepath: str):
@@ -11,72 +19,133 @@ def load_css(filepath: str):
         st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
 
 
+@st.cache_resource
+def http_session() -> requests.Session:
+    """ One pooled session per server process: connections are kept alive across reruns and users """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_PARALLEL)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def analyse(name: str, content: bytes) -> dict:
+    """ Posts one resume to the API. Returns the result, or {"error": ...} """
+    files = {"file": (name, content, "application/pdf")}
+    try:
+        response = http_session().post(API_URL, files=files, timeout=API_TIMEOUT)
+    except requests.exceptions.ConnectionError:
+        return {"error": "Could not connect to the Brain! Is the API server running?"}
+    except requests.exceptions.Timeout:
+        return {"error": "The API took too long to answer."}
+    except requests.exceptions.RequestException as e:
+        return {"error": f"Request failed: {e}"}
+
+    if response.status_code != 200:
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        detail = body.get("detail", "") if isinstance(body, dict) else ""
+        return {"error": f"API ERROR: {response.status_code} {detail}".strip()}
+    try:
+        return response.json()
+    except ValueError:
+        # e.g. a proxy answering 200 with an HTML page: fail this file, not the whole run
+        return {"error": "The API answered with something that is not JSON."}
+
+
+def show_result(data: dict):
+    if "error" in data:
+        st.error(data["error"])
+        return
+
+    skills = data.get("skills", [])
+    people = data.get("people", [])
+    info = data.get("info", [])
+
+    st.markdown("### Skills Identified (from API)")
+
+    if skills:
+        skills_text = ", ".join([f"{skill}" for skill in skills])
+        st.markdown(
+            f'<p class="skills-tag">{skills_text}</p>',
+            unsafe_allow_html=True
+        )
+    else:
+        st.info("No skills found.")
+
+    with st.expander("### Extracted content:"):
+        column1, column2 = st.columns([1, 3])
+
+        with column1:
+            st.write("#### Candidate")
+            if people:
+                for person in list(set(people)):
+                    st.write(f"- {person}")
+            else:
+                st.caption("No people found.")
+
+        with column2:
+            st.write("#### Key Entities")
+            if info:
+                # Display as comma-separated tags
+                info_text = ", ".join([f"{item}" for item in info])
+                st.markdown(
+                    f'<p class="info-tag">{info_text}</p>',
+                    unsafe_allow_html=True
+                )
+            else:
+                st.caption("No key entities found.")
+
+        st.write("#### Text preview")
+        st.text(data.get("text_preview", "No preview avaliable"))
+
+
 # Front-end code
 load_css("styles/styles.css")
 st.title("Vitae-I: Intelligent Curriculum Analyser")
 
-#place where the user can put the resume
-uploaded_file = st.file_uploader("Upload your resume (PDF only", type=["pdf"])
-if uploaded_file is not None:
-    st.success("File uploaded sucessfully!")
-
-    #Waits for a button click
-    if st.button("Analyse Resume"):
-        with st.spinner("Reading PDF and Extracting Intelligence..."):
-            try:
-                # prepare the file for the API
-                # we send the bytes directly to the backend
-                files = {"file": ("resume.pdf", uploaded_file.getvalue(), "application/pdf")}
-
-                response = requests.post(API_URL, files=files)
-
-                if response.status_code == 200:
-                    data = response.json()
-
-                    skills = data.get("skills", [])
-                    people = data.get("people", [])
-                    info = data.get("info", [])
-
-                    st.markdown("### Skills Identified (from API)")
-
-                    if skills:
-                        skills_text = ", ".join([f"{skill}" for skill in skills])
-                        st.markdown(
-                            f'<p class="skills-tag">{skills_text}</p>',
-                            unsafe_allow_html=True
-                        )
-                    else:
-                        st.info("No skills found.")
-                    
-                    with st.expander("### Extracted content:"):
-                        column1, column2 = st.columns([1, 3])
-                        
-                        with column1:
-                            st.write("#### Candidate")
-                            if people:
-                                for person in list(set(people)):
-                                    st.write(f"- {person}")
-                            else:
-                                st.caption("No people found.")
-                        
-                        with column2:
-                            st.write("#### Key Entities")
-                            if info:
-                                # Display as comma-separated tags
-                                info_text = ", ".join([f"{item}" for item in info])
-                                st.markdown(
-                                    f'<p class="info-tag">{info_text}</p>',
-                                    unsafe_allow_html=True
-                                )
-                            else:
-                                st.caption("No key entities found.")
-                        
-                        with st.expander("see extracted text"):
-                            st.text(data.get("text_preview",  "No preview avaliable"))
-
-                else:
-                    st.error(f"API ERROR: {response.status_code}")
-            
-            except requests.exceptions.ConnectionError:
-                st.error("Could not connect to the Brain! Is the API server running?"
-                )
\ No newline at end of file
+# Results of this browser session by file hash: reruns (any widget click) and
+# re-uploads of the same PDF are answered from here instead of the API
+if "results" not in st.session_state:
+    st.session_state.results = {}
+results = st.session_state.results
+
+#place where the user can put the resumes
+uploaded_files = st.file_uploader("Upload resumes (PDF only)", type=["pdf"], accept_multiple_files=True)
+if uploaded_files:
+    st.success(f"{len(uploaded_files)} file(s) uploaded sucessfully!")
+
+    uploads = [(file.name, file.getvalue()) for file in uploaded_files]
+    digests = [hashlib.sha256(content).hexdigest() for _, content in uploads]
+    todo = {digest: (name, content) for (name, content), digest in zip(uploads, digests) if digest not in results}
+
+    #Waits for a button click (only needed for files not analysed yet)
+    analyse_clicked = bool(todo) and st.button(f"Analyse {len(todo)} Resume(s)")
+
+    # One slot per file in upload order, filled as soon as its result is known
+    slots = {}
+    for (name, _), digest in zip(uploads, digests):
+        slot = st.container()
+        slot.subheader(name)
+        slots.setdefault(digest, []).append(slot)
+        if digest in results:
+            with slot:
+                show_result(results[digest])
+
+    if analyse_clicked:
+        progress = st.progress(0.0, text="Reading PDFs and Extracting Intelligence...")
+        # All resumes go out at once; the wait is the slowest one, not the sum of them
+        with ThreadPoolExecutor(max_workers=MAX_PARALLEL) as executor:
+            futures = {executor.submit(analyse, name, content): digest for digest, (name, content) in todo.items()}
+            for done, future in enumerate(as_completed(futures), 1):
+                digest = futures[future]
+                data = future.result()
+                if "error" not in data:
+                    results[digest] = data  # failures are retried on the next click
+                for slot in slots[digest]:
+                    with slot:
+                        show_result(data)
+                progress.progress(done / len(futures), text=f"{done}/{len(futures)} analysed")
+        progress.empty()
@@ -0,0 +1,66 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+from config import MICROBATCH_MAX_DOCS, MICROBATCH_MAX_WAIT_MS
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item calls into batched calls (/analyze → one nlp.pipe).
+    submit(item) waits for its own result. An item arriving while fewer than `max_running`
+    batches run (one per idle worker) is dispatched at once, so light traffic never waits.
+    Once they all run, new items are collected for up to `max_wait` seconds or `max_items`
+    items and handed to `handler(items)` together; the handler returns one result per
+    item, in order.
+    """
+
+    def __init__(self, handler: Callable[[list], Awaitable[list]], max_items: int = MICROBATCH_MAX_DOCS,
+                 max_wait: float = MICROBATCH_MAX_WAIT_MS / 1000, max_running: int = 1):
+        self.handler = handler
+        self.max_items = max_items
+        self.max_wait = max_wait
+        self.max_running = max_running
+        self._pending = []  # (item, future) waiting for the next batch
+        self._timer = None
+        self._running = 0
+        self._tasks = set()
+
+    async def submit(self, item: Any) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if self._running < self.max_running or len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+        return await future
+
+    def stats(self) -> dict:
+        return {"pending": len(self._pending), "running": self._running}
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        self._running += 1
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)  # keep a reference until it is done
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list):
+        try:
+            results = await self.handler([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future), result in zip(batch, results):
+                if not future.done():  # the caller may have gone away (client disconnect)
+                    future.set_result(result)
+        finally:
+            self._running -= 1
+            # Whatever queued up behind this batch goes now rather than at the end of its wait
+            if self._running < self.max_running:
+                self._flush()
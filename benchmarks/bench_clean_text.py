@@ -0,0 +1,68 @@
+"""
+Micro-benchmark: utils.clean_text against the original implementation
+(tests/reference_impl.py) on long multi-page resumes.
+
+    python benchmarks/bench_clean_text.py [--pages 1,10,50] [--repeat 20]
+"""
+import argparse
+import json
+import random
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from config import SKILLS, ORGANIZATIONS, LOCATIONS
+from reference_impl import clean_text as reference_clean_text
+from utils import INVALID_WORDS, JOB_KEYWORDS, clean_text
+
+
+def resume_page(rng: random.Random, number: int, total: int) -> str:
+    """ ~50 lines the way pypdf returns them: short header lines, long wrapped ones, page footer """
+    lines = []
+    for _ in range(50):
+        kind = rng.random()
+        if kind < 0.2:
+            lines.append(rng.choice(sorted(INVALID_WORDS)).capitalize())
+        elif kind < 0.4:
+            lines.append(f"{rng.choice(sorted(JOB_KEYWORDS)).capitalize()} na {rng.choice(ORGANIZATIONS)}")
+        elif kind < 0.6:
+            lines.append(", ".join(rng.sample(SKILLS, 4)))
+        else:
+            lines.append(
+                f"Atuei em {rng.choice(LOCATIONS)} no desenvolvimento de sistemas com "
+                f"{rng.choice(SKILLS)} e {rng.choice(SKILLS)}, liderando entregas de ponta a ponta"
+            )
+        if rng.random() < 0.1:
+            lines.append("")
+    lines.append(f"Página {number} de {total}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="1,10,50")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    for pages in (int(p) for p in args.pages.split(",")):
+        text = "\n".join(resume_page(rng, n, pages) for n in range(1, pages + 1))
+        assert clean_text(text) == reference_clean_text(text)
+
+        before = min(timeit.repeat(lambda: reference_clean_text(text), number=1, repeat=args.repeat))
+        after = min(timeit.repeat(lambda: clean_text(text), number=1, repeat=args.repeat))
+        print(json.dumps({
+            "pages": pages,
+            "chars": len(text),
+            "reference_ms": round(before * 1000, 3),
+            "clean_text_ms": round(after * 1000, 3),
+            "speedup": round(before / after, 1),
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Measures what the SPACY_COMPONENTS allow-list saves per document.
+
+Each configuration is loaded in its own subprocess so RSS numbers are not
+polluted by the other model. Usage:
+
+    python benchmarks/bench_components.py [--docs 200] [--components tok2vec,ner]
+"""
+import argparse
+import json
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import SKILLS, ORGANIZATIONS, LOCATIONS, SPACY_COMPONENTS
+
+
+def rss_mb() -> float:
+    """ Current resident set size of this process in MB (Linux /proc, falls back to peak RSS) """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_corpus(n_docs: int, seed: int = 42) -> list[str]:
+    """ Resume-like paragraphs built from the gazetteers, so every document has entities """
+    rng = random.Random(seed)
+    docs = []
+    for _ in range(n_docs):
+        sentences = [
+            f"Experiência profissional na {rng.choice(ORGANIZATIONS)} em {rng.choice(LOCATIONS)}.",
+            f"Desenvolvedor com experiência em {', '.join(rng.sample(SKILLS, 5))}.",
+            f"Formação pela {rng.choice(ORGANIZATIONS)}, projetos com {rng.choice(SKILLS)} e {rng.choice(SKILLS)}.",
+        ]
+        docs.append(" ".join(sentences * rng.randint(2, 8)))
+    return docs
+
+
+def measure(components: str, n_docs: int) -> dict:
+    """ Runs inside the subprocess: load one configuration and time the corpus """
+    from pipeline import load_model_with_ruler
+
+    baseline = rss_mb()
+    start = time.perf_counter()
+    nlp = load_model_with_ruler(components=components)
+    load_s = time.perf_counter() - start
+    loaded = rss_mb()
+
+    corpus = make_corpus(n_docs)
+    nlp(corpus[0])  # warm-up
+
+    start = time.perf_counter()
+    for text in corpus:
+        nlp(text)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "components": components,
+        "pipe_names": nlp.pipe_names,
+        "load_seconds": round(load_s, 3),
+        "model_rss_mb": round(loaded - baseline, 1),
+        "peak_rss_mb": round(rss_mb(), 1),
+        "ms_per_doc": round(elapsed / n_docs * 1000, 3),
+    }
+
+
+def run_isolated(components: str, n_docs: int) -> dict:
+    out = subprocess.run(
+        [sys.executable, __file__, "--measure", components, "--docs", str(n_docs)],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--components", default=SPACY_COMPONENTS, help="allow-list to compare with 'all'")
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.docs)))
+        return
+
+    full = run_isolated("all", args.docs)
+    trimmed = run_isolated(args.components, args.docs)
+
+    for result in (full, trimmed):
+        print(json.dumps(result))
+
+    saved_ms = full["ms_per_doc"] - trimmed["ms_per_doc"]
+    saved_rss = full["peak_rss_mb"] - trimmed["peak_rss_mb"]
+    print(
+        f"Saved per document: {saved_ms:.3f} ms ({saved_ms / full['ms_per_doc']:.0%}), "
+        f"RSS saved: {saved_rss:.1f} MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
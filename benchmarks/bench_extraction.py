@@ -0,0 +1,57 @@
+"""
+Serial vs page-parallel PDF extraction on long synthetic resumes.
+
+    python benchmarks/bench_extraction.py [--pages 10,30,60,100] [--workers 4]
+
+The page pool is started and warmed up before timing, as it would be in a
+long-running API process.
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import utils
+from utils import extract_pdf, page_pool
+
+import corpus
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="10,30,60,100")
+    parser.add_argument("--workers", type=int, default=utils.PARALLEL_PDF_WORKERS)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    utils.PARALLEL_PDF_WORKERS = args.workers
+    utils.PARALLEL_PDF_MIN_PAGES = 1
+    list(page_pool().map(abs, range(args.workers * 4)))  # start every worker before timing
+
+    rng = random.Random(42)
+    print(f"{'pages':>6s} {'serial ms':>10s} {'parallel ms':>12s} {'speedup':>8s}   ({args.workers} workers)")
+    for pages in map(int, args.pages.split(",")):
+        pdf = corpus.make_pdf(corpus.resume_lines(rng, pages))
+
+        utils.PARALLEL_PDF_WORKERS = 1
+        serial = best_of(args.repeat, lambda: extract_pdf(pdf, max_pages=pages, max_chars=10**9))
+        utils.PARALLEL_PDF_WORKERS = args.workers
+        parallel = best_of(args.repeat, lambda: extract_pdf(pdf, max_pages=pages, max_chars=10**9))
+
+        print(f"{pages:6d} {serial * 1000:10.1f} {parallel * 1000:12.1f} {serial / parallel:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
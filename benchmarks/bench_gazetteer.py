@@ -0,0 +1,92 @@
+"""
+Shows that the PhraseMatcher gazetteer keeps a flat matching cost as the term
+lists grow 100x, compared with the old per-item token patterns in entity_ruler.
+
+Runs on a blank Portuguese tokenizer, so no model download is needed:
+
+    python benchmarks/bench_gazetteer.py [--docs 200] [--scales 1,10,100]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import spacy
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import gazetteer  # noqa: F401  (registers the "gazetteer" factory)
+from config import SKILLS, ORGANIZATIONS, LOCATIONS
+from bench_components import make_corpus
+
+SYLLABLES = ["ba", "ce", "di", "fo", "gu", "la", "me", "ni", "po", "ru", "sa", "te", "vi", "xo", "za"]
+
+
+def synthetic_terms(n: int, rng: random.Random) -> list[str]:
+    """ Made-up one to three word names that never occur in the corpus """
+    terms = []
+    for _ in range(n):
+        words = ["".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))).capitalize()
+                 for _ in range(rng.randint(1, 3))]
+        terms.append(" ".join(words))
+    return terms
+
+
+def gazetteers(scale: int, rng: random.Random) -> dict:
+    """ The config.py lists padded with synthetic terms up to `scale` times their size """
+    base = {"SKILL": SKILLS, "ORG": ORGANIZATIONS, "GPE": LOCATIONS}
+    return {label: terms + synthetic_terms(len(terms) * (scale - 1), rng) for label, terms in base.items()}
+
+
+def build_gazetteer(terms: dict) -> spacy.Language:
+    nlp = spacy.blank("pt")
+    ruler = nlp.add_pipe("gazetteer")
+    for label, items in terms.items():
+        ruler.add_terms(label, items)
+    return nlp
+
+
+def build_token_patterns(terms: dict) -> spacy.Language:
+    """ The previous implementation: one {"LOWER": ...} token pattern per item """
+    nlp = spacy.blank("pt")
+    ruler = nlp.add_pipe("entity_ruler", config={"overwrite_ents": False})
+    ruler.add_patterns([
+        {"label": label, "pattern": [{"LOWER": tok.lower()} for tok in item.split()]}
+        for label, items in terms.items() for item in items
+    ])
+    return nlp
+
+
+def time_matching(nlp: spacy.Language, docs: list) -> float:
+    """ Milliseconds per document spent in the matching component only """
+    component = nlp.pipeline[-1][1]
+    start = time.perf_counter()
+    for doc in docs:
+        component(doc)
+    return (time.perf_counter() - start) / len(docs) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--scales", default="1,10,100")
+    args = parser.parse_args()
+
+    texts = make_corpus(args.docs)
+
+    for scale in (int(s) for s in args.scales.split(",")):
+        terms = gazetteers(scale, random.Random(scale))
+        row = {"scale": scale, "terms": sum(len(items) for items in terms.values())}
+        for name, build in (("gazetteer", build_gazetteer), ("token_patterns", build_token_patterns)):
+            start = time.perf_counter()
+            nlp = build(terms)
+            row[f"{name}_build_s"] = round(time.perf_counter() - start, 3)
+            docs = [nlp.make_doc(text) for text in texts]
+            row[f"{name}_ms_per_doc"] = round(time_matching(nlp, docs), 3)
+        print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
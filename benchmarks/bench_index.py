@@ -0,0 +1,72 @@
+"""
+Query latency of the candidate index (index.py) with many stored resumes.
+
+    python benchmarks/bench_index.py [--candidates 100000] [--db /tmp/index.db]
+
+Synthetic results (skills, orgs, locations drawn from the gazetteers) are inserted
+once, then each query is timed; the best of --repeat runs is reported.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import SKILLS, ORGANIZATIONS, LOCATIONS
+from index import CandidateIndex
+
+QUERIES = {
+    "skills=Python": {"skills": ["Python"]},
+    "skills=Python,Docker org=UFMG": {"skills": ["Python", "Docker"], "orgs": ["UFMG"]},
+    "skills=Python exclude=Java": {"skills": ["Python"], "exclude": ["Java"]},
+    "any=React,Vue,Angular (ranked)": {"any_skills": ["React", "Vue", "Angular"]},
+    "skills=SQL any=AWS,Azure,GCP location=Minas Gerais": {
+        "skills": ["SQL"], "any_skills": ["AWS", "Azure", "GCP"], "locations": ["Minas Gerais"],
+    },
+    "q=kubernetes": {"q": "kubernetes"},
+}
+
+
+def fake_result(rng: random.Random, i: int) -> dict:
+    info = rng.sample(ORGANIZATIONS, 2) + rng.sample(LOCATIONS, 1)
+    return {
+        "skills": rng.sample(SKILLS, rng.randint(3, 12)),
+        "people": [f"Candidato {i}"],
+        "info": info,
+        "info_labels": ["ORG", "ORG", "LOC"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=100_000)
+    parser.add_argument("--db", help="SQLite file (default: a temporary file)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), "index.db")
+    index = CandidateIndex(path)
+    missing = args.candidates - index.count()
+    if missing > 0:
+        rng = random.Random(42)
+        start = time.perf_counter()
+        for i in range(index.count(), args.candidates):
+            index.add(f"{i:064x}", fake_result(rng, i))
+        print(f"indexed {missing} candidates in {time.perf_counter() - start:.1f}s ({path})")
+
+    print(f"{'query':55s} {'total':>7s} {'ms':>8s}")
+    for name, query in QUERIES.items():
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            found = index.search(**query)
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:55s} {found['total']:7d} {best * 1000:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Throughput of mode="full" (statistical NER + gazetteer) vs mode="fast" (tokenizer + gazetteer).
+
+Each mode is loaded in its own subprocess so load time and RSS are not polluted
+by the other pipeline. Texts are synthetic resumes already cleaned, so only the
+NER → filter stage (analyze_texts) is timed. Usage:
+
+    python benchmarks/bench_modes.py [--docs 200] [--pages 2]
+"""
+import argparse
+import json
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench_components import rss_mb
+
+
+def make_texts(n_docs: int, pages: int, seed: int = 42) -> list[str]:
+    import corpus
+    from utils import clean_text
+
+    rng = random.Random(seed)
+    return [clean_text("\n".join(line for page in corpus.resume_lines(rng, pages) for line in page))
+            for _ in range(n_docs)]
+
+
+def measure(mode: str, n_docs: int, pages: int) -> dict:
+    """ Runs inside the subprocess: load one mode's pipeline and time the corpus """
+    from pipeline import analyze_texts, load_fast_pipeline, load_pipeline
+
+    texts = make_texts(n_docs, pages)
+    baseline = rss_mb()
+    start = time.perf_counter()
+    nlp = load_fast_pipeline() if mode == "fast" else load_pipeline()
+    load_s = time.perf_counter() - start
+    loaded = rss_mb()
+
+    analyze_texts(nlp, texts[:1])  # warm-up
+
+    start = time.perf_counter()
+    results = analyze_texts(nlp, texts)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "mode": mode,
+        "pipe_names": nlp.pipe_names,
+        "load_seconds": round(load_s, 3),
+        "model_rss_mb": round(loaded - baseline, 1),
+        "docs_per_second": round(n_docs / elapsed, 1),
+        "ms_per_doc": round(elapsed / n_docs * 1000, 3),
+        "skills_found": sum(len(result["skills"]) for result, _ in results),
+    }
+
+
+def run_isolated(mode: str, n_docs: int, pages: int) -> dict:
+    out = subprocess.run(
+        [sys.executable, __file__, "--measure", mode, "--docs", str(n_docs), "--pages", str(pages)],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=2, help="pages per synthetic resume")
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.docs, args.pages)))
+        return
+
+    full = run_isolated("full", args.docs, args.pages)
+    fast = run_isolated("fast", args.docs, args.pages)
+
+    for result in (full, fast):
+        print(json.dumps(result))
+
+    print(
+        f"fast mode: {fast['docs_per_second'] / full['docs_per_second']:.1f}x the throughput, "
+        f"loads in {fast['load_seconds']}s instead of {full['load_seconds']}s, "
+        f"{full['model_rss_mb'] - fast['model_rss_mb']:.1f} MB less RSS"
+    )
+    if fast["skills_found"] != full["skills_found"]:
+        print(f"warning: skills differ ({fast['skills_found']} fast vs {full['skills_found']} full)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Synthetic PT-BR resume corpus for the benchmarks.
+
+Resumes are built from the gazetteers in config.py and the word lists in
+utils.py, so every pipeline stage has realistic work to do: names for the
+NER, section headers and job titles for clean_text/is_valid_entity, skills,
+orgs and locations for the gazetteer. Everything is seeded and offline.
+
+    python benchmarks/corpus.py --out /tmp/corpus --docs 20 --min-pages 1 --max-pages 50
+"""
+import argparse
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import SKILLS, ORGANIZATIONS, LOCATIONS
+from utils import JOB_KEYWORDS
+
+FIRST_NAMES = ["Ana", "Bruno", "Camila", "Diego", "Eduarda", "Felipe", "Gabriela", "Henrique", "Isabela",
+               "João", "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sofia", "Thiago", "Vitória"]
+LAST_NAMES = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima",
+              "Gomes", "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Nascimento", "Barbosa"]
+JOB_AREAS = ["de Software", "de Dados", "Backend", "Frontend", "Full Stack", "de Sistemas", "de Infraestrutura"]
+MONTHS = ["janeiro", "fevereiro", "março", "abril", "maio", "junho",
+          "julho", "agosto", "setembro", "outubro", "novembro", "dezembro"]
+DEGREES = ["Bacharelado em Ciência da Computação", "Graduação em Sistemas de Informação",
+           "Mestrado em Engenharia Elétrica", "Tecnólogo em Análise e Desenvolvimento de Sistemas"]
+ACTIVITIES = [
+    "Desenvolvimento e manutenção de APIs REST com {0} e {1}, atendendo milhões de requisições por dia",
+    "Migração de sistemas legados para {0}, reduzindo o custo de infraestrutura em {n}%",
+    "Implantação de pipelines de integração contínua com {0} e {1}",
+    "Modelagem de dados e otimização de consultas em {0}",
+    "Liderança técnica de um time de {n} pessoas usando {0}, {1} e {2}",
+    "Criação de dashboards e relatórios analíticos com {0} para a área de negócios",
+]
+LINES_PER_PAGE = 45
+
+
+def person_name(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def experience(rng: random.Random) -> list[str]:
+    title = f"{rng.choice(sorted(JOB_KEYWORDS)).capitalize()} {rng.choice(JOB_AREAS)}"
+    start, end = sorted(rng.sample(range(2005, 2026), 2))
+    lines = [
+        f"{title} - {rng.choice(ORGANIZATIONS)}",
+        f"{rng.choice(MONTHS)} {start} - {rng.choice(MONTHS)} {end} | {rng.choice(LOCATIONS)}",
+    ]
+    for _ in range(rng.randint(2, 5)):
+        activity = rng.choice(ACTIVITIES).format(*rng.sample(SKILLS, 3), n=rng.randint(3, 40))
+        # Long activities wrap over two lines, like pypdf returns them
+        cut = activity.rfind(" ", 0, 70) if len(activity) > 80 else -1
+        lines.extend([activity[:cut], activity[cut + 1:]] if cut > 0 else [activity])
+    return lines
+
+
+def resume_lines(rng: random.Random, pages: int) -> list[list[str]]:
+    """ Lines of one resume, already split into pages (each ending with its page footer) """
+    name = person_name(rng)
+    body = [
+        name,
+        f"{rng.choice(sorted(JOB_KEYWORDS)).capitalize()} {rng.choice(JOB_AREAS)}",
+        f"{rng.choice(LOCATIONS)} | {name.split()[0].lower()}@email.com | (31) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+        "",
+        "Resumo",
+        f"Profissional com experiência em {', '.join(rng.sample(SKILLS, 4))} e atuação em times ágeis.",
+        "",
+        "Experiência Profissional",
+    ]
+    # Leave room for the last experience block (<= 13 lines) and the closing sections (9 lines)
+    target = pages * LINES_PER_PAGE - 25
+    while len(body) < target:
+        body.extend(experience(rng))
+        body.append("")
+    body += ["Formação Acadêmica", f"{rng.choice(DEGREES)} - {rng.choice(ORGANIZATIONS)}", ""]
+    body += ["Habilidades", ", ".join(rng.sample(SKILLS, min(12, len(SKILLS)))), ""]
+    body += ["Idiomas", "Português - Nativo", "Inglês - Avançado"]
+
+    split = [body[i:i + LINES_PER_PAGE] for i in range(0, len(body), LINES_PER_PAGE)]
+    return [page + [f"Página {n} de {len(split)}"] for n, page in enumerate(split, start=1)]
+
+
+def _escape(line: str) -> bytes:
+    return line.encode("latin-1", errors="replace").replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def make_pdf(pages: list[list[str]]) -> bytes:
+    """ Valid multi-page PDF (Helvetica, one text line per PDF line) with a correct xref table """
+    n = len(pages)
+    font_id = 3 + 2 * n
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % (3 + 2 * i) for i in range(n)) + b"] /Count %d >>" % n,
+    ]
+    for i, lines in enumerate(pages):
+        stream = b"BT /F1 10 Tf 14 TL 40 800 Td " + b" ".join(b"(" + _escape(line) + b") Tj T*" for line in lines) + b" ET"
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents %d 0 R"
+            b" /Resources << /Font << /F1 %d 0 R >> >> >>" % (4 + 2 * i, font_id)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF" % (len(objects) + 1, xref)
+    return pdf
+
+
+def generate(n_docs: int, min_pages: int = 1, max_pages: int = 50, seed: int = 42) -> list[tuple[int, bytes]]:
+    """ (page count, PDF bytes) for n_docs resumes, page counts spread from min_pages to max_pages """
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(n_docs):
+        # Spread lengths evenly over the range so short and long resumes are both covered
+        pages = min_pages + round(i * (max_pages - min_pages) / max(n_docs - 1, 1))
+        corpus.append((pages, make_pdf(resume_lines(rng, pages))))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--min-pages", type=int, default=1)
+    parser.add_argument("--max-pages", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    for i, (pages, pdf) in enumerate(generate(args.docs, args.min_pages, args.max_pages, args.seed)):
+        (out / f"resume_{i:04d}_{pages}p.pdf").write_bytes(pdf)
+    print(f"Wrote {args.docs} resumes to {out}")
+
+
+if __name__ == "__main__":
+    main()
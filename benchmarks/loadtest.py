@@ -0,0 +1,276 @@
+"""
+Load generator for the API: concurrent upload traffic with latency percentiles,
+throughput, error rates and peak RSS.
+
+By default the app is driven in-process through httpx's ASGI transport (lifespan
+included, result cache disabled so every upload is analysed). With --url it
+targets a running server instead, e.g. `uvicorn api:app`; pass --pid to sample
+the server's memory.
+
+    python benchmarks/loadtest.py --concurrency 8 --requests 200
+    python benchmarks/loadtest.py --mix analyze=8,batch=1,jobs=1 --pages 1-3:0.8,10-30:0.2
+    python benchmarks/loadtest.py --url http://127.0.0.1:8000 --pid $(pgrep -f uvicorn) --duration 60
+
+Each of the --concurrency clients sends its next request as soon as the previous
+one finishes (closed loop), so the reported requests/sec is the service's
+throughput at that concurrency.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+
+KINDS = ("analyze", "batch", "jobs", "metrics")
+
+
+def parse_weights(spec: str) -> dict[str, float]:
+    """ "analyze=8,batch=1" → {"analyze": 8.0, "batch": 1.0} """
+    weights = {}
+    for item in spec.split(","):
+        kind, _, weight = item.partition("=")
+        if kind not in KINDS:
+            raise argparse.ArgumentTypeError(f"unknown request kind {kind!r}, expected one of {KINDS}")
+        weights[kind] = float(weight or 1)
+    return weights
+
+
+def parse_pages(spec: str) -> list[tuple[int, int, float]]:
+    """ "1-3:0.8,10-30:0.2" → [(1, 3, 0.8), (10, 30, 0.2)] """
+    ranges = []
+    for item in spec.split(","):
+        span, _, weight = item.partition(":")
+        low, _, high = span.partition("-")
+        ranges.append((int(low), int(high or low), float(weight or 1)))
+    return ranges
+
+
+def make_pool(page_ranges: list, size: int, seed: int) -> list[tuple[int, bytes]]:
+    """ `size` distinct resumes whose page counts follow the --pages distribution """
+    import corpus  # imports config, so only after main() has set the environment
+    rng = random.Random(seed)
+    pool = []
+    for _ in range(size):
+        low, high, _ = rng.choices(page_ranges, weights=[w for _, _, w in page_ranges])[0]
+        pages = rng.randint(low, high)
+        pool.append((pages, corpus.make_pdf(corpus.resume_lines(rng, pages))))
+    return pool
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+
+def read_rss_mb(pid: int) -> tuple[float, float]:
+    """ (current RSS, peak RSS) of a process in MB, from /proc/<pid>/status """
+    values = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    values[line[:5]] = int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return values.get("VmRSS", 0.0), values.get("VmHWM", 0.0)
+
+
+def child_pids(pid: int) -> list[int]:
+    """ Direct children of a process (the worker pool), Linux only """
+    try:
+        return [int(p) for p in Path(f"/proc/{pid}/task/{pid}/children").read_text().split()]
+    except OSError:
+        return []
+
+
+async def sample_memory(pid: int, interval: float, peaks: dict):
+    """ Tracks peak RSS of `pid` and of `pid` plus its children until cancelled """
+    while True:
+        own, hwm = read_rss_mb(pid)
+        total = own + sum(read_rss_mb(child)[0] for child in child_pids(pid))
+        peaks["server_mb"] = max(peaks.get("server_mb", 0.0), own, hwm)
+        peaks["with_workers_mb"] = max(peaks.get("with_workers_mb", 0.0), total)
+        await asyncio.sleep(interval)
+
+
+async def measure_loop_lag(interval: float, lags: list):
+    """
+    In-process only: how late the event loop wakes up from a short sleep.
+    Anything CPU-bound running on the loop shows up here as lag.
+    """
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def send(client: httpx.AsyncClient, kind: str, docs: list[bytes], job_poll: float) -> int:
+    """ Performs one request of the given kind and returns the final HTTP status """
+    if kind == "metrics":
+        return (await client.get("/metrics")).status_code
+    if kind == "batch":
+        files = [("files", (f"resume_{i}.pdf", pdf, "application/pdf")) for i, pdf in enumerate(docs)]
+        return (await client.post("/analyze/batch", files=files)).status_code
+
+    upload = {"file": ("resume.pdf", docs[0], "application/pdf")}
+    if kind == "analyze":
+        return (await client.post("/analyze", files=upload)).status_code
+
+    # jobs: submit, then poll until the job leaves the queue. Latency includes the wait
+    response = await client.post("/jobs", files=upload)
+    if response.status_code != 202:
+        return response.status_code
+    location = response.headers["Location"]
+    while True:
+        await asyncio.sleep(job_poll)
+        response = await client.get(location)
+        if response.status_code != 200 or response.json()["status"] in ("done", "failed"):
+            return 500 if response.status_code == 200 and response.json()["status"] == "failed" else response.status_code
+
+
+async def client_loop(client, rng, pool, weights, args, deadline, budget, results):
+    kinds, kind_weights = list(weights), list(weights.values())
+    while time.perf_counter() < deadline and budget["left"] > 0:
+        budget["left"] -= 1
+        kind = rng.choices(kinds, weights=kind_weights)[0]
+        picked = rng.sample(pool, args.batch_size if kind == "batch" else 1)
+        start = time.perf_counter()
+        try:
+            status = await send(client, kind, [pdf for _, pdf in picked], args.job_poll)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        results.append({
+            "kind": kind,
+            "status": status,
+            "seconds": time.perf_counter() - start,
+            "pages": sum(pages for pages, _ in picked),
+        })
+
+
+@asynccontextmanager
+async def open_client(args):
+    """ AsyncClient against --url, or against api:app in-process with its lifespan running """
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as client:
+            yield client, None
+        return
+
+    from api import app
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout) as client:
+            yield client, app
+
+
+def summarise(results: list[dict], wall: float) -> dict:
+    report = {"wall_s": round(wall, 3), "requests": len(results),
+              "rps": round(len(results) / wall, 2) if wall else None, "by_kind": {}}
+    for kind in sorted({r["kind"] for r in results}):
+        rows = [r for r in results if r["kind"] == kind]
+        ordered = sorted(r["seconds"] for r in rows)
+        errors = {}
+        for r in rows:
+            if r["status"] not in (200, 202):
+                errors[str(r["status"])] = errors.get(str(r["status"]), 0) + 1
+        report["by_kind"][kind] = {
+            "requests": len(rows),
+            "rps": round(len(rows) / wall, 2) if wall else None,
+            "pages_per_s": round(sum(r["pages"] for r in rows) / wall, 2) if wall else None,
+            "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+            "p90_ms": round(percentile(ordered, 0.90) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2),
+            "error_rate": round(sum(errors.values()) / len(rows), 4),
+            "errors": errors,
+        }
+    return report
+
+
+async def run(args) -> dict:
+    weights = parse_weights(args.mix)
+    pool = make_pool(parse_pages(args.pages), args.pool_size, args.seed)
+
+    results, lags, peaks = [], [], {}
+    budget = {"left": args.requests if args.requests else float("inf")}
+    async with open_client(args) as (client, app):
+        pid = args.pid or (os.getpid() if app is not None else None)
+        background = []
+        if pid:
+            background.append(asyncio.create_task(sample_memory(pid, 0.1, peaks)))
+        if app is not None:
+            background.append(asyncio.create_task(measure_loop_lag(0.01, lags)))
+
+        start = time.perf_counter()
+        deadline = start + args.duration if args.duration else float("inf")
+        await asyncio.gather(*(
+            client_loop(client, random.Random(args.seed + i), pool, weights, args, deadline, budget, results)
+            for i in range(args.concurrency)
+        ))
+        wall = time.perf_counter() - start
+
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+
+    report = summarise(results, wall)
+    report["config"] = {k: v for k, v in vars(args).items() if k != "out"}
+    report["config"]["pool_pages"] = [pages for pages, _ in pool]
+    if peaks:
+        report["peak_rss_mb"] = {k: round(v, 1) for k, v in peaks.items()}
+    if lags:
+        ordered = sorted(lags)
+        report["loop_lag_ms"] = {"p50": round(percentile(ordered, 0.5) * 1000, 2),
+                                 "p99": round(percentile(ordered, 0.99) * 1000, 2),
+                                 "max": round(ordered[-1] * 1000, 2)}
+    return report
+
+
+def print_report(report: dict):
+    print(f"{report['requests']} requests in {report['wall_s']} s → {report['rps']} req/s "
+          f"(concurrency {report['config']['concurrency']})")
+    for kind, row in report["by_kind"].items():
+        print(f"  {kind:8s} n={row['requests']:<5d} p50 {row['p50_ms']:9.1f} ms  p90 {row['p90_ms']:9.1f} ms  "
+              f"p99 {row['p99_ms']:9.1f} ms  errors {row['error_rate']:.1%} {row['errors'] or ''}")
+    if "peak_rss_mb" in report:
+        print(f"  peak RSS: {report['peak_rss_mb']}")
+    if "loop_lag_ms" in report:
+        print(f"  event loop lag (ms): {report['loop_lag_ms']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="target a running server instead of api:app in-process")
+    parser.add_argument("--pid", type=int, help="server process to sample RSS from (with --url)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=100, help="total requests (0 = until --duration)")
+    parser.add_argument("--duration", type=float, default=0, help="stop after this many seconds (0 = no limit)")
+    parser.add_argument("--mix", default="analyze=1", help=f"weighted request kinds among {', '.join(KINDS)}")
+    parser.add_argument("--pages", default="1-2:0.6,3-10:0.3,11-50:0.1", help="page-count ranges with weights")
+    parser.add_argument("--pool-size", type=int, default=32, help="distinct PDFs to draw requests from")
+    parser.add_argument("--batch-size", type=int, default=4, help="files per /analyze/batch request")
+    parser.add_argument("--job-poll", type=float, default=0.05, help="seconds between GET /jobs/{id} polls")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--keep-cache", action="store_true", help="leave the result cache on (in-process mode)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="also write the report as JSON")
+    args = parser.parse_args()
+    if not args.requests and not args.duration:
+        parser.error("set --requests or --duration")
+    if not args.url and not args.keep_cache:
+        os.environ["VITAE_CACHE_MAX_ENTRIES"] = "0"
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Reproducible performance suite for the analysis pipeline.
+
+Times each stage separately (read_pdf, clean_text, NER, is_valid_entity) and the
+whole request end to end through the FastAPI app, on a seeded synthetic corpus
+(benchmarks/corpus.py). Runs offline. Results go to JSON so runs on different
+commits can be compared:
+
+    python benchmarks/run_benchmarks.py --out before.json
+    python benchmarks/run_benchmarks.py --out after.json --compare before.json
+
+With --compare, any stage whose mean latency got worse than --threshold
+(default 15%) is reported and the script exits with status 1.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Before anything imports config: no result cache, so every request does the work
+os.environ["VITAE_CACHE_MAX_ENTRIES"] = "0"
+os.environ.setdefault("VITAE_WORKER_POOL", "thread")
+os.environ.setdefault("VITAE_WORKER_POOL_SIZE", "1")
+
+import corpus
+
+
+def summarise(durations: list[float], pages: int) -> dict:
+    total = sum(durations)
+    ordered = sorted(durations)
+    return {
+        "docs": len(durations),
+        "total_s": round(total, 4),
+        "mean_ms": round(statistics.fmean(durations) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        "docs_per_s": round(len(durations) / total, 2) if total else None,
+        "pages_per_s": round(pages / total, 2) if total else None,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def bench_stages(docs: list[tuple[int, bytes]], repeat: int) -> dict:
+    """ Each stage timed on its own, best of `repeat` runs per document """
+    import spacy
+    from pipeline import load_pipeline, extract_entities
+    from utils import ENTITY_FILTER, clean_text, read_pdf
+
+    nlp = load_pipeline()
+    nlp("aquecimento")
+
+    timings = {"read_pdf": [], "clean_text": [], "ner": [], "is_valid_entity": []}
+    for _, pdf in docs:
+        best = dict.fromkeys(timings, float("inf"))
+        for _ in range(repeat):
+            start = time.perf_counter()
+            raw = read_pdf(pdf)
+            best["read_pdf"] = min(best["read_pdf"], time.perf_counter() - start)
+
+            start = time.perf_counter()
+            text = clean_text(raw)
+            best["clean_text"] = min(best["clean_text"], time.perf_counter() - start)
+
+            start = time.perf_counter()
+            doc = nlp(text)
+            best["ner"] = min(best["ner"], time.perf_counter() - start)
+
+            ENTITY_FILTER.is_valid.cache_clear()  # time the rules, not the memo
+            start = time.perf_counter()
+            extract_entities(doc)
+            best["is_valid_entity"] = min(best["is_valid_entity"], time.perf_counter() - start)
+        for stage, seconds in best.items():
+            timings[stage].append(seconds)
+
+    pages = sum(p for p, _ in docs)
+    return {stage: summarise(durations, pages) for stage, durations in timings.items()} | {
+        "_pipeline": {"spacy": spacy.__version__, "pipe_names": nlp.pipe_names},
+    }
+
+
+def bench_end_to_end(docs: list[tuple[int, bytes]], repeat: int) -> dict:
+    """ POST /analyze through the app (result cache disabled at import time) """
+    from fastapi.testclient import TestClient
+    from api import app
+
+    durations = []
+    with TestClient(app) as client:
+        for _, pdf in docs:
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                response = client.post("/analyze", files={"file": ("resume.pdf", io.BytesIO(pdf), "application/pdf")})
+                best = min(best, time.perf_counter() - start)
+                response.raise_for_status()
+            durations.append(best)
+
+    return {"end_to_end": summarise(durations, sum(p for p, _ in docs))}
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """ Stages whose mean latency regressed by more than `threshold` """
+    regressions = []
+    for stage, result in current["stages"].items():
+        before = baseline.get("stages", {}).get(stage)
+        if stage.startswith("_") or not before:
+            continue
+        change = result["mean_ms"] / before["mean_ms"] - 1 if before["mean_ms"] else 0
+        line = f"{stage:16s} {before['mean_ms']:10.3f} ms → {result['mean_ms']:10.3f} ms ({change:+.1%})"
+        print(line)
+        if change > threshold:
+            regressions.append(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--min-pages", type=int, default=1)
+    parser.add_argument("--max-pages", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per document, the best one is kept")
+    parser.add_argument("--skip-e2e", action="store_true", help="only time the stages, not the HTTP path")
+    parser.add_argument("--out", default="bench_output.json")
+    parser.add_argument("--compare", help="previous results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args()
+
+    docs = corpus.generate(args.docs, args.min_pages, args.max_pages, args.seed)
+
+    stages = bench_stages(docs, args.repeat)
+    if not args.skip_e2e:
+        stages |= bench_end_to_end(docs, args.repeat)
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "corpus": {"docs": args.docs, "min_pages": args.min_pages, "max_pages": args.max_pages,
+                       "seed": args.seed, "pages": sum(p for p, _ in docs)},
+            "repeat": args.repeat,
+        },
+        "stages": stages,
+    }
+    Path(args.out).write_text(json.dumps(results, indent=2, ensure_ascii=False))
+
+    for stage, result in stages.items():
+        if not stage.startswith("_"):
+            print(f"{stage:16s} mean {result['mean_ms']:10.3f} ms  p95 {result['p95_ms']:10.3f} ms  "
+                  f"{result['docs_per_s']} docs/s")
+    print(f"Results written to {args.out}")
+
+    if args.compare:
+        regressions = compare(results, json.loads(Path(args.compare).read_text()), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} stage(s) regressed more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
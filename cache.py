@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from config import CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS, CACHE_DB_PATH, CACHE_PURGE_INTERVAL_SECONDS
+
+
+class ResultCache:
+    """
+    Content-addressed cache for analysis results.
+    Tier 1 is an in-memory LRU with size and TTL eviction; tier 2 is an optional
+    SQLite file that survives restarts. Keys combine the SHA-256 of the uploaded
+    bytes with a pipeline fingerprint, so changing the model or the rules never
+    serves a stale result. From the event loop use get_async/set_async, which run the
+    SQLite work in a thread.
+    """
+
+    def __init__(self, fingerprint: str, max_entries: int = CACHE_MAX_ENTRIES,
+                 ttl: float = CACHE_TTL_SECONDS, db_path: str | None = CACHE_DB_PATH,
+                 purge_interval: float = CACHE_PURGE_INTERVAL_SECONDS):
+        self.fingerprint = fingerprint
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0  # time.monotonic() after which the next write drops expired rows
+
+        self._entries = OrderedDict()  # key -> (expires_at, result)
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, expires_at REAL, result TEXT)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_expires_at ON results (expires_at)")
+            self._db.commit()
+
+    def key(self, content: bytes) -> str:
+        return self.digest_key(hashlib.sha256(content).hexdigest())
+
+    def digest_key(self, digest: str, mode: str = "full") -> str:
+        """ Key for content whose SHA-256 hex digest is already known (streamed uploads) """
+        key = f"{digest}:{self.fingerprint}"
+        return key if mode == "full" else f"{key}:{mode}"
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, result = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return result
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT expires_at, result FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[0] > time.time():
+                    result = json.loads(row[1])
+                    self._remember(key, result)
+                    self.disk_hits += 1
+                    return result
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, result: dict):
+        with self._lock:
+            self._remember(key, result)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, expires_at, result) VALUES (?, ?, ?)",
+                    (key, time.time() + self.ttl, json.dumps(result)),
+                )
+                # Expired rows are never served, so dropping them can wait for the next interval
+                if time.monotonic() >= self._next_purge:
+                    self._db.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+                    self._next_purge = time.monotonic() + self.purge_interval
+                self._db.commit()
+
+    async def get_async(self, key: str) -> dict | None:
+        """ get() for the event loop: memory hits answer inline, SQLite lookups run in a thread """
+        if self._db is None or self._in_memory(key):
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def set_async(self, key: str, result: dict):
+        """ set() for the event loop: the JSON encoding and SQLite write run in a thread """
+        if self._db is None:
+            self.set(key, result)
+        else:
+            await asyncio.to_thread(self.set, key, result)
+
+    def _in_memory(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > time.monotonic()
+
+    def _remember(self, key: str, result: dict):
+        """ Puts a result in the memory tier, evicting the least recently used entries """
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "disk": self._db is not None,
+            }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -1,4 +1,7 @@
 # Configuration constants for Vitae-I API
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # API Configuration
 API_TITLE = "Vitae-I API"
@@ -7,6 +10,123 @@ API_VERSION = "1.0.3"
 # SpaCy Model Configuration
 SPACY_MODEL = "pt_core_news_lg"
 
+# Components of SPACY_MODEL that are actually loaded. The analyzer only reads doc.ents,
+# so the parser, morphologizer, lemmatizer and attribute_ruler are never loaded.
+# The gazetteer is added on top by load_model_with_ruler(). Use "all" to load everything.
+SPACY_COMPONENTS = os.environ.get("VITAE_SPACY_COMPONENTS", "tok2vec,ner")
+
+# Prebuilt pipeline (model + gazetteer) written by `./run.sh build`.
+# The API loads it directly when its stamp matches the current config, otherwise it rebuilds.
+NLP_ARTIFACT_PATH = os.environ.get("VITAE_NLP_ARTIFACT", os.path.join(BASE_DIR, "artifacts", "nlp"))
+
+# Large gazetteer term files (one term per line, '#' for comments), added on top of the
+# SKILLS / ORGANIZATIONS / LOCATIONS lists below. Missing files are simply skipped.
+GAZETTEER_DIR = os.environ.get("VITAE_GAZETTEER_DIR", os.path.join(BASE_DIR, "data", "gazetteers"))
+GAZETTEER_FILES = {
+    "SKILL": os.path.join(GAZETTEER_DIR, "skills.txt"),
+    "ORG": os.path.join(GAZETTEER_DIR, "organizations.txt"),
+    "GPE": os.path.join(GAZETTEER_DIR, "locations.txt"),
+}
+
+# Response Configuration
+# text_preview holds the first PREVIEW_CHARS characters of the cleaned text (?include_text=true
+# adds the whole text). Responses over GZIP_MIN_BYTES are gzipped when the client accepts it (0 disables).
+PREVIEW_CHARS = int(os.environ.get("VITAE_PREVIEW_CHARS", 500))
+GZIP_MIN_BYTES = int(os.environ.get("VITAE_GZIP_MIN_BYTES", 1000))
+
+# Upload Limits
+# Every uploaded file over MAX_UPLOAD_MB is rejected with 413 (in a batch, that file gets an error).
+# Request bodies are capped too, from Content-Length or while streaming: at MAX_UPLOAD_MB for
+# the single-file endpoints, at MAX_BATCH_MB for /analyze/batch, which carries many files.
+# Files larger than UPLOAD_SPOOL_BYTES are handed to the extractor as a temp file path,
+# so they are never held in memory as a whole.
+MAX_UPLOAD_MB = float(os.environ.get("VITAE_MAX_UPLOAD_MB", 20))
+MAX_UPLOAD_BYTES = int(MAX_UPLOAD_MB * 1024 * 1024)
+MAX_BATCH_MB = float(os.environ.get("VITAE_MAX_BATCH_MB", 500))
+MAX_BATCH_BYTES = int(MAX_BATCH_MB * 1024 * 1024)
+UPLOAD_SPOOL_BYTES = int(os.environ.get("VITAE_UPLOAD_SPOOL_BYTES", 1024 * 1024))
+
+# PDF Extraction Limits
+# Extraction stops at whichever limit is reached first, so one huge PDF can't monopolise a worker.
+MAX_PDF_PAGES = int(os.environ.get("VITAE_MAX_PDF_PAGES", 100))
+MAX_PDF_CHARS = int(os.environ.get("VITAE_MAX_PDF_CHARS", 500_000))
+
+# Page-parallel Extraction
+# PDFs with at least PARALLEL_PDF_MIN_PAGES pages to read are split into page ranges and
+# extracted by a pool of PARALLEL_PDF_WORKERS processes. Smaller PDFs, and extraction that
+# already runs inside a worker process, stay serial. In the API this means thread mode only
+# (VITAE_WORKER_POOL=thread): process workers and ingest.py are parallel across documents
+# instead. Set the workers to 1 to disable it.
+PARALLEL_PDF_MIN_PAGES = int(os.environ.get("VITAE_PARALLEL_PDF_MIN_PAGES", 30))
+PARALLEL_PDF_WORKERS = int(os.environ.get("VITAE_PARALLEL_PDF_WORKERS", os.cpu_count() or 1))
+
+# Entity Filter Configuration
+# is_valid_entity() decisions are memoised per (text, label); org and location strings repeat a lot.
+ENTITY_FILTER_CACHE_SIZE = int(os.environ.get("VITAE_ENTITY_FILTER_CACHE_SIZE", 65536))
+
+# Worker Pool Configuration
+# "process" gives every worker its own interpreter and model copy (uses all cores; the API
+# process itself then loads no model), "thread" shares one model loaded by the API lifespan.
+WORKER_POOL_KIND = os.environ.get("VITAE_WORKER_POOL", "process")
+WORKER_POOL_SIZE = int(os.environ.get("VITAE_WORKER_POOL_SIZE", min(4, os.cpu_count() or 1)))
+
+# Chunked NER
+# Cleaned texts longer than NER_CHUNK_CHARS go through the NER in windows cut at the ". "
+# sentence boundaries clean_text() inserts, so no single Doc (and its tensors) gets huge.
+# Normal resumes are far shorter and take the single nlp(text) path.
+NER_CHUNK_CHARS = int(os.environ.get("VITAE_NER_CHUNK_CHARS", 100_000))
+
+# Micro-batching of /analyze
+# While every pool worker is running an NER batch, texts from concurrent /analyze requests are
+# collected for up to MICROBATCH_MAX_WAIT_MS or MICROBATCH_MAX_DOCS texts, then split over the
+# workers. A request arriving while a worker is idle goes straight through. MAX_DOCS=1 disables it.
+MICROBATCH_MAX_DOCS = int(os.environ.get("VITAE_MICROBATCH_MAX_DOCS", 16))
+MICROBATCH_MAX_WAIT_MS = float(os.environ.get("VITAE_MICROBATCH_MAX_WAIT_MS", 5))
+
+# Batch Analysis Configuration (/analyze/batch → nlp.pipe)
+# The batch's texts are split into one slice per pool worker; each slice is one nlp.pipe pass.
+BATCH_SIZE = int(os.environ.get("VITAE_BATCH_SIZE", 32))
+
+# Job Queue Configuration (POST /jobs, GET /jobs/{id})
+# When JOB_QUEUE_SIZE jobs are already waiting, new ones get 429 with Retry-After.
+JOB_WORKERS = int(os.environ.get("VITAE_JOB_WORKERS", 2))
+JOB_QUEUE_SIZE = int(os.environ.get("VITAE_JOB_QUEUE_SIZE", 100))
+JOB_RESULTS_KEPT = int(os.environ.get("VITAE_JOB_RESULTS_KEPT", 1000))
+JOB_RETRY_AFTER_SECONDS = int(os.environ.get("VITAE_JOB_RETRY_AFTER_SECONDS", 5))
+
+# Result Cache Configuration
+# Results are keyed by the SHA-256 of the upload plus a fingerprint of the model,
+# gazetteers and filter rules. Set VITAE_CACHE_DB to also keep them on disk (SQLite).
+CACHE_MAX_ENTRIES = int(os.environ.get("VITAE_CACHE_MAX_ENTRIES", 1024))
+CACHE_TTL_SECONDS = float(os.environ.get("VITAE_CACHE_TTL_SECONDS", 24 * 60 * 60))
+CACHE_DB_PATH = os.environ.get("VITAE_CACHE_DB") or None
+# Expired rows are dropped from the SQLite file by at most one write per interval
+CACHE_PURGE_INTERVAL_SECONDS = float(os.environ.get("VITAE_CACHE_PURGE_INTERVAL_SECONDS", 300))
+
+# Near-duplicate Detection (off unless VITAE_DEDUP is set; ingest.py has its own --dedup flag)
+# Cleaned texts are MinHashed (DEDUP_NUM_PERM permutations over DEDUP_SHINGLE_WORDS-word shingles,
+# LSH with DEDUP_BANDS bands) into an index of the last DEDUP_MAX_DOCS full-mode documents.
+# The index lives in memory, per API process: it starts empty after a restart and is not
+# shared between server.py workers. An upload at least DEDUP_THRESHOLD similar (estimated
+# Jaccard) to one of them is reported as its duplicate_of; with DEDUP_REUSE its entities
+# are reused and the NER is skipped.
+DEDUP_ENABLED = os.environ.get("VITAE_DEDUP", "false").lower() in ("1", "true", "yes")
+DEDUP_THRESHOLD = float(os.environ.get("VITAE_DEDUP_THRESHOLD", 0.9))
+DEDUP_REUSE = os.environ.get("VITAE_DEDUP_REUSE", "false").lower() in ("1", "true", "yes")
+DEDUP_NUM_PERM = int(os.environ.get("VITAE_DEDUP_NUM_PERM", 128))
+DEDUP_BANDS = int(os.environ.get("VITAE_DEDUP_BANDS", 16))
+DEDUP_SHINGLE_WORDS = int(os.environ.get("VITAE_DEDUP_SHINGLE_WORDS", 5))
+DEDUP_MAX_DOCS = int(os.environ.get("VITAE_DEDUP_MAX_DOCS", 50_000))
+
+# Candidate Index
+# When VITAE_INDEX_DB names a SQLite file, every full-mode analysis is stored there with
+# inverted indexes by skill, organization and location, searchable at GET /candidates/search.
+INDEX_DB_PATH = os.environ.get("VITAE_INDEX_DB") or None
+
+# Admin Endpoints
+# POST /admin/* requires this value in the X-Admin-Token header; while unset they answer 403.
+ADMIN_TOKEN = os.environ.get("VITAE_ADMIN_TOKEN") or None
+
 # Skills dictionary for NER patterns
 SKILLS = [
     # Programming languages
@@ -0,0 +1,120 @@
+import threading
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy
+from config import DEDUP_THRESHOLD, DEDUP_NUM_PERM, DEDUP_BANDS, DEDUP_SHINGLE_WORDS, DEDUP_MAX_DOCS
+
+# Universal hashing (a·x + b) mod p; with p < 2^31 the products fit in uint64
+PRIME = numpy.uint64((1 << 31) - 1)
+# Shingle hashes processed per numpy block, bounds the (num_perm × block) temporary
+BLOCK = 4096
+
+# Result fields a near-duplicate can take over from the document it duplicates
+ENTITY_FIELDS = ("skills", "people", "info", "info_labels", "gazetteer_version")
+
+
+def shingles(text: str, k: int = DEDUP_SHINGLE_WORDS) -> set[str]:
+    """ Overlapping k-word windows of the lower-cased text (the whole text if it is shorter) """
+    words = text.lower().split()
+    if len(words) <= k:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+@lru_cache(maxsize=None)
+def _permutations(num_perm: int) -> tuple[numpy.ndarray, numpy.ndarray]:
+    # Fixed seed: signatures must agree across processes and restarts
+    rng = numpy.random.default_rng(1)
+    a = rng.integers(1, int(PRIME), num_perm, dtype=numpy.uint64)
+    b = rng.integers(0, int(PRIME), num_perm, dtype=numpy.uint64)
+    return a[:, None], b[:, None]
+
+
+def minhash(text: str, num_perm: int = DEDUP_NUM_PERM, k: int = DEDUP_SHINGLE_WORDS) -> numpy.ndarray:
+    """
+    MinHash signature of the text's shingles: num_perm uint32 values. The share of equal
+    positions between two signatures estimates the Jaccard similarity of their shingle sets.
+    """
+    hashes = numpy.fromiter((zlib.crc32(s.encode()) for s in shingles(text, k)), dtype=numpy.uint64) % PRIME
+    a, b = _permutations(num_perm)
+    signature = numpy.full(num_perm, PRIME, dtype=numpy.uint64)
+    for start in range(0, len(hashes), BLOCK):
+        block = (a * hashes[start:start + BLOCK] + b) % PRIME
+        numpy.minimum(signature, block.min(axis=1), out=signature)
+    return signature.astype(numpy.uint32)
+
+
+def entities_of(result: dict) -> dict:
+    return {field: result[field] for field in ENTITY_FIELDS if field in result}
+
+
+class Match(NamedTuple):
+    id: str
+    similarity: float
+    entities: dict | None  # None while the matched document is still being analysed
+
+
+class DuplicateIndex:
+    """
+    MinHash/LSH index of the documents analysed so far, to spot resubmitted resumes with
+    trivial edits (new phone number, re-exported PDF) that an exact byte hash misses.
+    Signatures are cut into `bands`; documents sharing a band are candidates, confirmed
+    by comparing the full signatures. Keeps the last `max_docs` documents.
+    """
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, num_perm: int = DEDUP_NUM_PERM,
+                 bands: int = DEDUP_BANDS, max_docs: int = DEDUP_MAX_DOCS):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.max_docs = max_docs
+        self._docs = OrderedDict()  # id -> (signature, entities), oldest first
+        self._buckets = [{} for _ in range(bands)]  # per band: band bytes -> ids
+        self._lock = threading.Lock()
+
+    def _keys(self, signature: numpy.ndarray) -> list[bytes]:
+        return [band.tobytes() for band in numpy.split(signature, self.bands)]
+
+    def query(self, signature: numpy.ndarray, exclude: str | None = None) -> Match | None:
+        """ Most similar stored document at or above the threshold, if any (`exclude`: the document itself) """
+        with self._lock:
+            candidates = set()
+            for bucket, key in zip(self._buckets, self._keys(signature)):
+                candidates.update(bucket.get(key, ()))
+            candidates.discard(exclude)
+            best = None
+            for doc_id in candidates:
+                stored, entities = self._docs[doc_id]
+                similarity = float(numpy.count_nonzero(stored == signature)) / self.num_perm
+                if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                    best = Match(doc_id, similarity, entities)
+            return best
+
+    def add(self, doc_id: str, signature: numpy.ndarray, entities: dict | None = None):
+        """ Stores a document, or fills in the entities of one already stored """
+        with self._lock:
+            if doc_id in self._docs:
+                self._docs[doc_id] = (self._docs[doc_id][0], entities)
+                self._docs.move_to_end(doc_id)
+                return
+            self._docs[doc_id] = (signature, entities)
+            for bucket, key in zip(self._buckets, self._keys(signature)):
+                bucket.setdefault(key, set()).add(doc_id)
+            while len(self._docs) > self.max_docs:
+                self._forget(next(iter(self._docs)))
+
+    def _forget(self, doc_id: str):
+        signature, _ = self._docs.pop(doc_id)
+        for bucket, key in zip(self._buckets, self._keys(signature)):
+            ids = bucket[key]
+            ids.discard(doc_id)
+            if not ids:
+                del bucket[key]
+
+    def __len__(self) -> int:
+        return len(self._docs)
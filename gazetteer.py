@@ -0,0 +1,136 @@
+import hashlib
+import json
+import re
+from pathlib import Path
+
+import srsly
+from spacy.language import Language
+from spacy.matcher import PhraseMatcher
+from spacy.tokens import Doc, Span
+from spacy.util import filter_spans
+
+# Splits a term at every word/punctuation boundary ("CI/CD" → "CI", "/", "CD")
+TERM_PIECES = re.compile(r"\w+|[^\w\s]+")
+
+
+def terms_version(terms: dict) -> str:
+    """ Short content hash of a {label: terms} mapping, reported as gazetteer_version """
+    data = json.dumps(terms, sort_keys=True, ensure_ascii=False).encode()
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def read_terms(path: str | Path) -> list[str]:
+    """ One term per line; blank lines and lines starting with '#' are ignored """
+    terms = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                terms.append(line)
+    return terms
+
+
+class Gazetteer:
+    """
+    Dictionary entity matcher built on PhraseMatcher(attr="LOWER").
+    Matching cost depends on the document length, not on the number of terms, so the
+    gazetteers can grow to tens of thousands of entries. Like entity_ruler with
+    overwrite_ents=False, it never replaces entities that are already set.
+
+    The matcher, its terms and their version live in one tuple, so reload() can build
+    a new matcher on the side and swap it in with a single assignment: documents
+    already being matched finish with the old one, nothing is ever half-loaded.
+    """
+
+    def __init__(self, nlp: Language, name: str = "gazetteer", overwrite_ents: bool = False):
+        self.nlp = nlp
+        self.name = name
+        self.overwrite_ents = overwrite_ents
+        # (matcher, label -> list of terms kept for serialisation, version)
+        self._state = (PhraseMatcher(nlp.vocab, attr="LOWER"), {}, terms_version({}))
+
+    @property
+    def matcher(self) -> PhraseMatcher:
+        return self._state[0]
+
+    @property
+    def terms(self) -> dict:
+        return self._state[1]
+
+    @property
+    def version(self) -> str:
+        return self._state[2]
+
+    def __len__(self) -> int:
+        return sum(len(terms) for terms in self.terms.values())
+
+    def _add(self, matcher: PhraseMatcher, label: str, terms: list[str]):
+        variants = []
+        for term in terms:
+            variants.append(self.nlp.make_doc(term))
+            pieces = TERM_PIECES.findall(term)
+            if len(pieces) > 1 and pieces != [t.text for t in variants[-1]]:
+                variants.append(Doc(self.nlp.vocab, words=pieces, spaces=[False] * len(pieces)))
+        matcher.add(label, variants)
+
+    def add_terms(self, label: str, terms: list[str]):
+        """
+        Adds terms under `label`. Each term is tokenised by the pipeline's own tokenizer
+        and, when it contains punctuation, also split at every word/symbol boundary,
+        so "C#", ".NET" or "CI/CD" match however the tokenizer cuts them in context.
+        """
+        matcher, current, _ = self._state
+        self._add(matcher, label, terms)
+        current = {**current, label: current.get(label, []) + list(terms)}
+        self._state = (matcher, current, terms_version(current))
+
+    def add_file(self, label: str, path: str | Path):
+        self.add_terms(label, read_terms(path))
+
+    def reload(self, terms: dict) -> str:
+        """ Replaces every term at once (see the class docstring) and returns the new version """
+        matcher = PhraseMatcher(self.nlp.vocab, attr="LOWER")
+        terms = {label: list(items) for label, items in terms.items()}
+        for label, items in terms.items():
+            self._add(matcher, label, items)
+        self._state = (matcher, terms, terms_version(terms))
+        return self.version
+
+    def __call__(self, doc: Doc) -> Doc:
+        matcher, _, version = self._state
+        doc.user_data["gazetteer_version"] = version
+        # Longest match wins, then the earliest one, same as entity_ruler
+        matches = filter_spans(matcher(doc, as_spans=True))
+
+        entities = list(doc.ents)
+        new_entities = []
+        for span in matches:
+            if not self.overwrite_ents and any(token.ent_type for token in span):
+                continue
+            entities = [e for e in entities if not (e.start < span.end and e.end > span.start)]
+            new_entities.append(Span(doc, span.start, span.end, label=span.label_))
+
+        doc.ents = entities + new_entities
+        return doc
+
+    # Serialisation stores the raw terms and rebuilds the matcher on load
+    def to_bytes(self, exclude=tuple()) -> bytes:
+        return srsly.msgpack_dumps(self.terms)
+
+    def from_bytes(self, data: bytes, exclude=tuple()) -> "Gazetteer":
+        self.reload(srsly.msgpack_loads(data))
+        return self
+
+    def to_disk(self, path, exclude=tuple()):
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        srsly.write_json(path / "terms.json", self.terms)
+
+    def from_disk(self, path, exclude=tuple()) -> "Gazetteer":
+        self.reload(srsly.read_json(Path(path) / "terms.json"))
+        return self
+
+
+@Language.factory("gazetteer", default_config={"overwrite_ents": False})
+def make_gazetteer(nlp: Language, name: str, overwrite_ents: bool) -> Gazetteer:
+    return Gazetteer(nlp, name, overwrite_ents=overwrite_ents)
@@ -0,0 +1,180 @@
+import heapq
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter
+from config import INDEX_DB_PATH
+
+# Labels of result["info"] entries → kinds in the index (the NER says LOC, the gazetteer GPE)
+INFO_KINDS = {"ORG": "org", "LOC": "location", "GPE": "location", "PER": "person"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id INTEGER PRIMARY KEY,
+    digest TEXT NOT NULL UNIQUE,
+    filename TEXT,
+    name TEXT,
+    skills TEXT NOT NULL,
+    orgs TEXT NOT NULL,
+    locations TEXT NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS terms (
+    kind TEXT NOT NULL,
+    term TEXT NOT NULL,
+    candidate_id INTEGER NOT NULL,
+    PRIMARY KEY (kind, term, candidate_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS terms_by_candidate ON terms (candidate_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS candidates_fts USING fts5(
+    name, skills, entities, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+def normalise(term: str) -> str:
+    """ Index form of a skill/org/location: case-insensitive, Unicode aware ("Inglês" == "INGLÊS") """
+    return term.strip().casefold()
+
+
+class CandidateIndex:
+    """
+    Searchable store of analysis results (SQLite), one row per distinct PDF (SHA-256).
+    `terms` is the inverted index: one row per (kind, term, candidate), keyed in that
+    order, so every skill/org/location filter is a b-tree range scan and boolean
+    filters are INTERSECT/EXCEPT of those posting lists. `candidates_fts` (FTS5)
+    serves free-text queries ranked by bm25. Re-indexing the same PDF replaces it.
+    """
+
+    def __init__(self, path: str = INDEX_DB_PATH):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")  # safe with WAL, far fewer fsyncs per add()
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def add(self, digest: str, result: dict, filename: str | None = None) -> int:
+        """ Stores (or replaces) the result of the PDF with this SHA-256; returns its candidate id """
+        labels = dict(zip(result["info"], result.get("info_labels", ())))
+        orgs = [text for text, label in labels.items() if INFO_KINDS.get(label) == "org"]
+        locations = [text for text, label in labels.items() if INFO_KINDS.get(label) == "location"]
+        people = result["people"] + [text for text, label in labels.items() if INFO_KINDS.get(label) == "person"]
+        name = result["people"][0] if result["people"] else None
+
+        terms = {("skill", normalise(t)) for t in result["skills"]}
+        terms.update(("org", normalise(t)) for t in orgs)
+        terms.update(("location", normalise(t)) for t in locations)
+        terms.update(("person", normalise(t)) for t in people)
+
+        with self._lock, self._db:  # one transaction: readers never see half an entry
+            row = self._db.execute("SELECT id FROM candidates WHERE digest = ?", (digest,)).fetchone()
+            if row is not None:
+                self._db.execute("DELETE FROM terms WHERE candidate_id = ?", row)
+                self._db.execute("DELETE FROM candidates_fts WHERE rowid = ?", row)
+                self._db.execute("DELETE FROM candidates WHERE id = ?", row)
+            candidate_id = self._db.execute(
+                "INSERT INTO candidates (digest, filename, name, skills, orgs, locations, indexed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (digest, filename, name, json.dumps(result["skills"]), json.dumps(orgs), json.dumps(locations),
+                 time.time()),
+            ).lastrowid
+            self._db.executemany(
+                "INSERT INTO terms (kind, term, candidate_id) VALUES (?, ?, ?)",
+                [(kind, term, candidate_id) for kind, term in terms],
+            )
+            self._db.execute(
+                "INSERT INTO candidates_fts (rowid, name, skills, entities) VALUES (?, ?, ?, ?)",
+                (candidate_id, " ".join(people), " ".join(result["skills"]), " ".join(result["info"])),
+            )
+        return candidate_id
+
+    def search(self, skills: list[str] = (), any_skills: list[str] = (), exclude: list[str] = (),
+               orgs: list[str] = (), locations: list[str] = (), q: str | None = None,
+               limit: int = 20, offset: int = 0) -> dict:
+        """
+        Candidates having every skill in `skills` and every org/location given, none of
+        `exclude`, and matching the full-text query `q`. Ranked by how many of `any_skills`
+        they have (on its own, `any_skills` also requires at least one), then by bm25
+        relevance to `q`, then newest first. Raises ValueError for a malformed `q`.
+        """
+        required = [("skill", t) for t in skills] + [("org", t) for t in orgs] + [("location", t) for t in locations]
+        with self._lock:
+            # Boolean filters are set operations on posting lists; only the page's rows are read in full
+            matched = None
+            for kind, term in required:
+                posting = self._posting(kind, term)
+                matched = posting if matched is None else matched & posting
+            scores = Counter()
+            for term in any_skills:
+                scores.update(self._posting("skill", term))
+            if any_skills and matched is None:
+                matched = set(scores)
+            relevance = {}
+            if q:
+                try:
+                    relevance = dict(self._db.execute(
+                        "SELECT rowid, bm25(candidates_fts) FROM candidates_fts WHERE candidates_fts MATCH ?", (q,)
+                    ))
+                except sqlite3.OperationalError as e:  # FTS5 syntax: "unterminated string", "syntax error near"...
+                    raise ValueError(f"Invalid search query: {e}")
+                matched = set(relevance) if matched is None else matched & relevance.keys()
+            for term in exclude:
+                if matched is None:
+                    matched = {row[0] for row in self._db.execute("SELECT id FROM candidates")}
+                matched -= self._posting("skill", term)
+
+            if matched is None:  # no filter at all: newest first, straight from the table
+                total = self._db.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+                page = [row[0] for row in self._db.execute(
+                    "SELECT id FROM candidates ORDER BY id DESC LIMIT ? OFFSET ?", (limit, offset)
+                )]
+            else:
+                total = len(matched)
+                if scores or relevance:  # bm25 is lower for better matches
+                    ranked = heapq.nlargest(offset + limit, matched,
+                                            key=lambda i: (scores[i], -relevance.get(i, 0.0), i))
+                else:
+                    ranked = heapq.nlargest(offset + limit, matched)
+                page = ranked[offset:]
+            results = self._rows(page)
+
+        for result in results:
+            result["score"] = scores[result.pop("id")]
+        return {"total": total, "results": results}
+
+    def _posting(self, kind: str, term: str) -> set[int]:
+        """ Ids of the candidates having this term (one range scan of the terms primary key) """
+        rows = self._db.execute("SELECT candidate_id FROM terms WHERE kind = ? AND term = ?", (kind, normalise(term)))
+        return {row[0] for row in rows}
+
+    def _rows(self, ids: list[int]) -> list[dict]:
+        """ Stored entries of `ids`, in that order """
+        if not ids:
+            return []
+        rows = self._db.execute(
+            "SELECT id, digest, filename, name, skills, orgs, locations, indexed_at FROM candidates"
+            f" WHERE id IN ({', '.join('?' * len(ids))})", ids,
+        )
+        by_id = {
+            row[0]: {
+                "id": row[0],
+                "digest": row[1],
+                "filename": row[2],
+                "name": row[3],
+                "skills": json.loads(row[4]),
+                "orgs": json.loads(row[5]),
+                "locations": json.loads(row[6]),
+                "indexed_at": row[7],
+            }
+            for row in rows
+        }
+        return [by_id[i] for i in ids]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,287 @@
+"""
+Offline bulk analysis of a resume archive, without the HTTP layer.
+
+    python ingest.py /data/resumes --output results.jsonl
+    python ingest.py --file-list todo.txt --output results.parquet --workers 8
+    python ingest.py /data/resumes --output skills.jsonl --mode fast
+    ./run.sh ingest /data/resumes --output results.jsonl
+
+Every worker process loads the pipeline once, then analyses chunks of files:
+extract → clean per file, one nlp.pipe pass per chunk. Results are streamed to
+JSONL (one object per line) or Parquet (a directory of part files). The output is
+also the checkpoint: re-running the same command skips every file already written.
+--mode fast runs only the tokenizer and the gazetteer (skills, dictionary orgs and
+locations, no people): workers never load the statistical model. With --dedup, a file
+whose text is a near-duplicate of one already analysed in this run (same resume, new
+phone number) gets its entities and a duplicate_of, and skips the NER.
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from functools import partial
+from pathlib import Path
+
+from config import BATCH_SIZE, WORKER_POOL_SIZE
+from dedup import DuplicateIndex, entities_of
+from pipeline import MODES, analyze_files, analyze_text_batch, make_worker_pool, prepare_files
+
+
+def find_pdfs(paths: list[str], file_list: str | None = None) -> list[str]:
+    """ PDFs under the given directories/files plus those named in `file_list`, sorted and deduplicated """
+    found = set()
+    for path in map(Path, paths):
+        if path.is_dir():
+            found.update(str(p) for p in path.rglob("*") if p.suffix.lower() == ".pdf" and p.is_file())
+        else:
+            found.add(str(path))
+    if file_list:
+        with open(file_list, encoding="utf-8") as f:
+            found.update(line.strip() for line in f if line.strip())
+    return sorted(found)
+
+
+class JsonlWriter:
+    """ Appends one JSON object per line, flushed per chunk so a crash loses at most one chunk """
+
+    def __init__(self, path: Path, include_text: bool):
+        self.path = path
+        self.include_text = include_text
+        self._repair()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _repair(self):
+        # An interrupted run can leave half a line at the end; cut back to the last full one
+        if not self.path.exists():
+            return
+        data = self.path.read_bytes()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            with open(self.path, "r+b") as f:
+                f.truncate(end)
+
+    def done(self) -> set[str]:
+        if not self.path.exists():
+            return set()
+        with open(self.path, encoding="utf-8") as f:
+            return {json.loads(line)["path"] for line in f if line.strip()}
+
+    def write(self, records: list[dict]):
+        for record in records:
+            if not self.include_text:
+                record.pop("text", None)
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """
+    Writes a directory of Parquet part files (a Parquet file can't be appended to).
+    Records are buffered and written `rows_per_part` at a time; each part is written
+    under a temporary name and renamed, so a part either exists whole or not at all.
+    """
+
+    def __init__(self, path: Path, include_text: bool, rows_per_part: int = 5000):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet output needs pyarrow: pip install pyarrow")
+        self.pa, self.pq = pa, pq
+        self.path = path
+        self.include_text = include_text
+        self.rows_per_part = rows_per_part
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._buffer = []
+
+        fields = [
+            ("path", pa.string()),
+            ("skills", pa.list_(pa.string())),
+            ("people", pa.list_(pa.string())),
+            ("info", pa.list_(pa.string())),
+            ("extraction", pa.struct([
+                ("pages_read", pa.int32()),
+                ("total_pages", pa.int32()),
+                ("failed_pages", pa.list_(pa.int32())),
+                ("truncated", pa.bool_()),
+            ])),
+            ("duplicate_of", pa.string()),
+            ("similarity", pa.float64()),
+            ("error", pa.string()),
+        ]
+        if include_text:
+            fields.append(("text", pa.string()))
+        self.schema = pa.schema(fields)
+
+    def done(self) -> set[str]:
+        paths = set()
+        for part in sorted(self.path.glob("part-*.parquet")):
+            paths.update(self.pq.read_table(part, columns=["path"]).column("path").to_pylist())
+        return paths
+
+    def write(self, records: list[dict]):
+        self._buffer.extend(records)
+        if len(self._buffer) >= self.rows_per_part:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        part = self.path / f"part-{len(list(self.path.glob('part-*.parquet'))):05d}.parquet"
+        tmp = part.with_suffix(".tmp")
+        self.pq.write_table(self.pa.Table.from_pylist(self._buffer, schema=self.schema), tmp)
+        tmp.rename(part)
+        self._buffer = []
+
+    def close(self):
+        self._flush()
+
+
+def open_writer(output: str, fmt: str | None, include_text: bool):
+    fmt = fmt or ("parquet" if output.endswith(".parquet") else "jsonl")
+    if fmt == "parquet":
+        return ParquetWriter(Path(output), include_text)
+    return JsonlWriter(Path(output), include_text)
+
+
+def progress(done: int, total: int, errors: int, start: float, final: bool = False):
+    elapsed = time.perf_counter() - start
+    rate = done / elapsed if elapsed else 0.0
+    eta = (total - done) / rate if rate else 0.0
+    print(f"\r{done}/{total} docs  {rate:.1f} docs/s  {errors} errors  ETA {eta:.0f}s   ",
+          end="\n" if final else "", file=sys.stderr, flush=True)
+
+
+def deduplicate(dedup: DuplicateIndex, prepared: list) -> tuple[list[dict], list[tuple], list[tuple]]:
+    """
+    Splits a chunk from prepare_files() into finished records (unreadable files, and
+    near-duplicates of files already analysed, which take over their entities), the
+    (path, record, text, signature) of the files that still need the NER, and the
+    (duplicate_of, path, record, text) of near-duplicates of files still in the NER.
+    """
+    records, todo, deferred = [], [], []
+    for path, record, text, signature in prepared:
+        if text is None:
+            records.append({"path": path, **record})
+            continue
+        match = dedup.query(signature)
+        if match is None:
+            dedup.add(path, signature)  # matchable right away, its entities come with the NER results
+            todo.append((path, record, text, signature))
+            continue
+        record = {**record, "duplicate_of": match.id, "similarity": round(match.similarity, 3)}
+        if match.entities is None:
+            deferred.append((match.id, path, record, text))
+        else:
+            records.append({"path": path, **match.entities, "text": text, **record})
+    return records, todo, deferred
+
+
+def ingest(files: list[str], writer, workers: int, chunk_size: int, batch_size: int,
+           mode: str = "full", dedup: DuplicateIndex | None = None) -> tuple[int, int]:
+    """
+    Analyses `files` in a process pool and streams the records to `writer`. Returns (done, errors).
+    With `dedup`, chunks are extracted first; near-duplicates of files already analysed reuse
+    their entities and only the rest is sent to the NER.
+    """
+    chunks = [files[i:i + chunk_size] for i in range(0, len(files), chunk_size)]
+    done = errors = reused = 0
+    start = last_report = time.perf_counter()
+
+    with make_worker_pool("process", workers, mode=mode) as pool:
+        pending = {}  # future -> function turning its result into records
+        waiting = {}  # path in the NER -> near-duplicates waiting for its entities
+
+        def analysed(result):
+            return [{"path": path, **record} for path, record in result]
+
+        def prepared(result):
+            nonlocal reused
+            records, todo, deferred = deduplicate(dedup, result)
+            reused += sum(1 for record in records if "duplicate_of" in record)
+            for duplicate_of, *waiter in deferred:
+                waiting.setdefault(duplicate_of, []).append(waiter)
+            if todo:
+                texts = [text for _, _, text, _ in todo]
+                pending[pool.submit(analyze_text_batch, texts, mode, None, batch_size)] = partial(recognised, todo)
+            return records
+
+        def recognised(todo, result):
+            nonlocal reused
+            records = []
+            for (path, record, _, signature), (analysis, _) in zip(todo, result):
+                entities = entities_of(analysis)
+                dedup.add(path, signature, entities)
+                records.append({"path": path, **analysis, **record})
+                for duplicate_path, duplicate_record, text in waiting.pop(path, ()):
+                    records.append({"path": duplicate_path, **entities, "text": text, **duplicate_record})
+                    reused += 1
+            return records
+
+        try:
+            while chunks or pending:
+                # A couple of chunks in flight per worker keeps them busy without queueing the whole archive
+                while chunks and len(pending) < workers * 2:
+                    if dedup is None:
+                        pending[pool.submit(analyze_files, chunks.pop(0), batch_size, mode)] = analysed
+                    else:
+                        pending[pool.submit(prepare_files, chunks.pop(0), True)] = prepared
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    records = pending.pop(future)(future.result())
+                    writer.write(records)
+                    done += len(records)
+                    errors += sum(1 for record in records if "error" in record)
+                if time.perf_counter() - last_report >= 1:
+                    progress(done, len(files), errors, start)
+                    last_report = time.perf_counter()
+        except KeyboardInterrupt:
+            for future in pending:
+                future.cancel()
+            print("\nInterrupted, re-run the same command to resume.", file=sys.stderr)
+        finally:
+            writer.close()
+
+    progress(done, len(files), errors, start, final=True)
+    if dedup is not None:
+        print(f"{reused} near-duplicates took over earlier entities instead of running the NER", file=sys.stderr)
+    return done, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="PDF files or directories (searched recursively)")
+    parser.add_argument("--file-list", help="text file with one PDF path per line")
+    parser.add_argument("--output", required=True, help="results.jsonl, or results.parquet (a directory)")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], help="default: from the --output suffix")
+    parser.add_argument("--workers", type=int, default=WORKER_POOL_SIZE, help="worker processes, one model each")
+    parser.add_argument("--chunk-size", type=int, default=64, help="files per task sent to a worker")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="nlp.pipe batch size")
+    parser.add_argument("--mode", choices=MODES, default="full", help="fast: gazetteer only, no statistical NER")
+    parser.add_argument("--dedup", action="store_true",
+                        help="near-duplicates of files already analysed reuse their entities (VITAE_DEDUP_THRESHOLD)")
+    parser.add_argument("--include-text", action="store_true", help="also store the full cleaned text")
+    args = parser.parse_args()
+    if not args.paths and not args.file_list:
+        parser.error("give at least one path or --file-list")
+
+    files = find_pdfs(args.paths, args.file_list)
+    writer = open_writer(args.output, args.format, args.include_text)
+    already = writer.done()
+    todo = [path for path in files if path not in already]
+    print(f"{len(files)} PDFs found, {len(files) - len(todo)} already in {args.output}, {len(todo)} to do",
+          file=sys.stderr)
+
+    if not todo:
+        writer.close()
+        return
+    dedup = DuplicateIndex(max_docs=max(len(todo), 1)) if args.dedup else None
+    ingest(todo, writer, args.workers, args.chunk_size, args.batch_size, args.mode, dedup)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+from config import JOB_WORKERS, JOB_QUEUE_SIZE, JOB_RESULTS_KEPT
+
+
+class QueueFull(Exception):
+    """ Raised by JobQueue.submit() when no more work can be accepted """
+
+
+class JobQueue:
+    """
+    In-process bounded work queue behind POST /jobs.
+    A fixed number of worker tasks drain the queue by awaiting `handler(payload)`.
+    Finished jobs are kept (oldest evicted first) so clients can poll for the result.
+    Jobs still queued at stop() are failed and their payload handed to `on_drop`.
+    """
+
+    def __init__(self, handler: Callable[[Any], Awaitable[dict]], workers: int = JOB_WORKERS,
+                 max_queued: int = JOB_QUEUE_SIZE, max_finished: int = JOB_RESULTS_KEPT,
+                 on_drop: Callable[[Any], None] | None = None):
+        self.handler = handler
+        self.on_drop = on_drop
+        self.workers = workers
+        self.max_finished = max_finished
+        self._queue = asyncio.Queue(maxsize=max_queued)
+        self._jobs = {}  # job id -> public job record
+        self._finished = OrderedDict()  # job ids in completion order, for eviction
+        self._tasks = []
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Nothing will run the jobs still waiting, so release what they hold (temp files)
+        while not self._queue.empty():
+            job_id, payload = self._queue.get_nowait()
+            job = self._jobs[job_id]
+            job.update(status="failed", error="Server shut down before the job ran", finished_at=time.time())
+            if self.on_drop is not None:
+                self.on_drop(payload)
+
+    def full(self) -> bool:
+        """ True when submit() would raise QueueFull, so callers can refuse before doing any work """
+        return self._queue.full()
+
+    def submit(self, payload: Any) -> dict:
+        """ Queues a job and returns its record. Raises QueueFull instead of waiting """
+        job = {"id": uuid.uuid4().hex, "status": "queued", "created_at": time.time()}
+        try:
+            self._queue.put_nowait((job["id"], payload))
+        except asyncio.QueueFull:
+            raise QueueFull(f"{self._queue.maxsize} jobs already waiting")
+        self._jobs[job["id"]] = job
+        return job
+
+    def get(self, job_id: str) -> dict | None:
+        return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        return {"queued": self._queue.qsize(), "max_queued": self._queue.maxsize, "workers": self.workers}
+
+    async def _work(self):
+        while True:
+            job_id, payload = await self._queue.get()
+            job = self._jobs[job_id]
+            job["status"] = "running"
+            try:
+                job["result"] = await self.handler(payload)
+                job["status"] = "done"
+            except Exception as e:
+                job["status"] = "failed"
+                job["error"] = str(e)
+            finally:
+                job["finished_at"] = time.time()
+                self._queue.task_done()
+                self._forget_old(job_id)
+
+    def _forget_old(self, job_id: str):
+        self._finished[job_id] = None
+        while len(self._finished) > self.max_finished:
+            old_id, _ = self._finished.popitem(last=False)
+            self._jobs.pop(old_id, None)
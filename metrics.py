@@ -0,0 +1,118 @@
+import threading
+from bisect import bisect_left
+
+# Latency buckets in seconds, from a cache hit to a 50-page resume
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Pipeline stages, in the order they run (also the order of the Server-Timing header)
+STAGES = ("upload", "cache", "extract", "clean", "ner", "filter")
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """ Monotonic counter with optional labels, rendered in Prometheus text format """
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values = {} if labelnames else {(): 0}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labelvalues, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {value}")
+        return lines
+
+
+class Histogram:
+    """ Cumulative-bucket histogram with optional labels, rendered in Prometheus text format """
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DURATION_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series = {}  # labelvalues -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str):
+        with self._lock:
+            series = self._series.setdefault(labelvalues, [0] * (len(self.buckets) + 2))
+            bucket = bisect_left(self.buckets, value)
+            if bucket < len(self.buckets):  # above the last bound only counts towards +Inf
+                series[bucket] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labelvalues, series in sorted(self._series.items()):
+                labels = _labels(self.labelnames, labelvalues)
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    le = 'le="%s"' % bound
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames, labelvalues, le)} {cumulative}")
+                le = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labelvalues, le)} {series[-1]}")
+                lines.append(f"{self.name}_sum{labels} {series[-2]}")
+                lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+STAGE_DURATION = Histogram("vitae_stage_duration_seconds", "Time spent in each analysis stage.", ("stage",))
+PAGES = Counter("vitae_pages_total", "PDF pages extracted.")
+CHARACTERS = Counter("vitae_characters_total", "Characters of cleaned text sent to the NER.")
+TOKENS = Counter("vitae_tokens_total", "Tokens processed by the NER.")
+ENTITIES = Counter("vitae_entities_total", "Entities found before filtering, by label.", ("label",))
+REJECTIONS = Counter("vitae_rejections_total", "Uploads rejected, by reason.", ("reason",))
+DUPLICATES = Counter("vitae_near_duplicates_total", "Uploads found to be near-duplicates, by whether the NER ran.",
+                     ("outcome",))
+NER_BATCH_SIZE = Histogram("vitae_ner_batch_size", "Texts per coalesced /analyze NER batch.", ("mode",),
+                           buckets=(1, 2, 4, 8, 16, 32, 64))
+
+REGISTRY = [STAGE_DURATION, PAGES, CHARACTERS, TOKENS, ENTITIES, REJECTIONS, DUPLICATES, NER_BATCH_SIZE]
+
+
+def observe_analysis(stats: dict):
+    """ Records the stats returned by the pipeline for one document """
+    for stage, seconds in stats.get("timings", {}).items():
+        STAGE_DURATION.observe(seconds, stage)
+    PAGES.inc(amount=stats.get("pages", 0))
+    CHARACTERS.inc(amount=stats.get("chars", 0))
+    TOKENS.inc(amount=stats.get("tokens", 0))
+    for label, count in stats.get("entities", {}).items():
+        ENTITIES.inc(label, amount=count)
+
+
+def server_timing(timings: dict) -> str:
+    """ Server-Timing header value, durations in milliseconds """
+    return ", ".join(f"{stage};dur={timings[stage] * 1000:.2f}" for stage in STAGES if stage in timings)
+
+
+def gauge(name: str, help: str, value: float) -> list[str]:
+    """ One-off gauge lines for values owned elsewhere (cache size, queue depth) """
+    return [f"# HELP {name} {help}", f"# TYPE {name} gauge", f"{name} {value}"]
+
+
+def render(extra: list[str] = ()) -> str:
+    """ Every registered metric in Prometheus text exposition format """
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(extra)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,445 @@
+import hashlib
+import inspect
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Literal, get_args
+
+import numpy
+import spacy
+from spacy.tokens import Doc
+import gazetteer  # registers the "gazetteer" pipeline factory
+from dedup import minhash
+from gazetteer import read_terms
+import utils
+from utils import clean_text, extract_pdf, is_valid_entity
+from config import (
+    SKILLS, ORGANIZATIONS, LOCATIONS, SPACY_MODEL, SPACY_COMPONENTS, NLP_ARTIFACT_PATH, GAZETTEER_FILES,
+    WORKER_POOL_KIND, WORKER_POOL_SIZE, BATCH_SIZE, NER_CHUNK_CHARS,
+)
+
+
+# Analysis modes: "full" runs the statistical NER, "fast" only the tokenizer and the gazetteer
+Mode = Literal["full", "fast"]
+MODES = get_args(Mode)
+
+
+def model_meta(model: str = SPACY_MODEL) -> dict:
+    """ meta.json of an installed model package or a model directory, read without loading the model """
+    path = spacy.util.get_package_path(model) if spacy.util.is_package(model) else Path(model)
+    return spacy.util.get_model_meta(path)
+
+
+def excluded_components(components: str = SPACY_COMPONENTS, model: str = SPACY_MODEL) -> list[str]:
+    """ Components of `model` that are not in the comma-separated allow-list ("all" keeps everything) """
+    if components.strip() == "all":
+        return []
+    allowed = {name.strip() for name in components.split(",")}
+    return [name for name in model_meta(model)["components"] if name not in allowed]
+
+# This function runs the model.
+def load_model_with_ruler(components: str = SPACY_COMPONENTS) -> spacy.Language:
+    # Excluded components are never deserialised, so they cost neither RAM nor time
+    nlp = spacy.load(SPACY_MODEL, exclude=excluded_components(components))
+    if "ner" in nlp.pipe_names:
+        ruler = nlp.add_pipe("gazetteer", config={"overwrite_ents": False}, before="ner")
+    else:
+        ruler = nlp.add_pipe("gazetteer", config={"overwrite_ents": False})
+
+    ruler.reload(gazetteer_terms())
+    return nlp
+
+
+def load_fast_pipeline() -> spacy.Language:
+    """
+    Rules-only pipeline for mode="fast": a blank tokenizer of the model's language plus the
+    gazetteer. No vectors, tok2vec or NER are loaded, so it finds exactly the dictionary
+    skills, organizations and locations, and no people.
+    """
+    nlp = spacy.blank(model_meta()["lang"])
+    nlp.add_pipe("gazetteer", config={"overwrite_ents": False}).reload(gazetteer_terms())
+    return nlp
+
+
+def gazetteer_terms() -> dict[str, list[str]]:
+    """ Dictionary entities from config.py plus the term files as they are on disk right now """
+    terms = {"SKILL": list(SKILLS), "ORG": list(ORGANIZATIONS), "GPE": list(LOCATIONS)}
+    for label, path in GAZETTEER_FILES.items():
+        if os.path.exists(path):
+            terms[label] = terms.get(label, []) + read_terms(path)
+    return terms
+
+
+def reload_gazetteer(nlp: spacy.Language) -> str:
+    """
+    Re-reads the term files into the pipeline's gazetteer without touching the model.
+    The new matcher is swapped in atomically; returns the new gazetteer version.
+    """
+    return nlp.get_pipe("gazetteer").reload(gazetteer_terms())
+
+
+def gazetteer_version(nlp: spacy.Language) -> str | None:
+    return nlp.get_pipe("gazetteer").version if "gazetteer" in nlp.pipe_names else None
+
+
+def pipeline_fingerprint() -> str:
+    """
+    Short hash of everything that changes the analysis output: spaCy and the model
+    (name and installed version), the SKILLS/ORGANIZATIONS/LOCATIONS gazetteers and
+    term files, the matching logic in gazetteer.py and the cleaning/filter rules in
+    utils.py and this module.
+    """
+    h = hashlib.sha256()
+    h.update(spacy.about.__version__.encode())
+    h.update(SPACY_MODEL.encode())
+    h.update(SPACY_COMPONENTS.encode())
+    h.update(str(spacy.util.get_package_version(SPACY_MODEL)).encode())
+    h.update(json.dumps([SKILLS, ORGANIZATIONS, LOCATIONS]).encode())
+    for path in GAZETTEER_FILES.values():
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                h.update(f.read())
+    h.update(inspect.getsource(gazetteer).encode())
+    h.update(inspect.getsource(utils).encode())
+    h.update(inspect.getsource(sys.modules[__name__]).encode())
+    return h.hexdigest()[:16]
+
+
+# Key in the artifact's meta.json holding the pipeline_fingerprint() it was built from
+ARTIFACT_STAMP = "vitae_fingerprint"
+
+# Short resume used to run one inference before a model is reported ready
+WARM_UP_TEXT = "Leonardo Ruhmann. Desenvolvedor Python com experiência em Docker na Petrobras, em São Paulo."
+
+
+def build_artifact(path: str = NLP_ARTIFACT_PATH) -> str:
+    """ Writes the fully assembled pipeline (gazetteer included) to disk, stamped with its fingerprint """
+    nlp = load_model_with_ruler()
+    fingerprint = pipeline_fingerprint()
+    nlp.meta[ARTIFACT_STAMP] = fingerprint
+    nlp.to_disk(path)
+    return fingerprint
+
+
+def load_pipeline(path: str = NLP_ARTIFACT_PATH) -> spacy.Language:
+    """
+    Loads the prebuilt artifact when its stamp matches the current config.
+    A missing or stale artifact falls back to building the pipeline from config.py.
+    """
+    try:
+        meta = spacy.util.get_model_meta(Path(path))
+    except (OSError, ValueError):
+        meta = {}
+
+    if meta.get(ARTIFACT_STAMP) == pipeline_fingerprint():
+        return spacy.load(path)
+
+    return load_model_with_ruler()
+
+
+def warm_up(nlp: spacy.Language) -> spacy.Language:
+    """ Runs one inference so lazy allocations happen before the first real request """
+    nlp(WARM_UP_TEXT)
+    return nlp
+
+
+# Model used by the functions running inside the worker pool.
+# Each worker process loads its own copy; worker threads share the API's copy.
+_worker_nlp = None
+
+# Startup barrier of the pool (one party per worker), see worker_ready()
+_ready_barrier = None
+
+# Longest a started worker waits at the barrier for the others to finish loading
+WORKER_START_TIMEOUT = 600
+
+
+def init_worker(nlp: spacy.Language | None = None, mode: Mode = "full", barrier=None):
+    """ Pool initializer: loads the model once per worker (or reuses a shared one) """
+    global _worker_nlp, _ready_barrier
+    _ready_barrier = barrier
+    if nlp is not None:
+        _worker_nlp = nlp
+    elif mode == "fast":
+        fast_pipeline()  # rules-only workers never load the statistical model
+    elif _worker_nlp is None:
+        _worker_nlp = warm_up(load_pipeline())
+
+
+# Rules-only pipeline, built on first use in each process (it takes milliseconds, not seconds)
+_fast_nlp = None
+
+
+def fast_pipeline() -> spacy.Language:
+    global _fast_nlp
+    if _fast_nlp is None:
+        _fast_nlp = warm_up(load_fast_pipeline())
+    return _fast_nlp
+
+
+def mode_pipeline(mode: Mode = "full", nlp: spacy.Language | None = None,
+                  expected_gazetteer: str | None = None) -> spacy.Language:
+    """
+    The pipeline analysing `mode`: `nlp` (or this worker's model) for "full", the rules-only
+    one for "fast". When its gazetteer is not at `expected_gazetteer` (the API reloaded its
+    own), it is reloaded from the term files first.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown analysis mode: {mode!r} (expected one of {', '.join(MODES)})")
+    nlp = fast_pipeline() if mode == "fast" else nlp or _worker_nlp
+    if expected_gazetteer is not None and gazetteer_version(nlp) != expected_gazetteer:
+        reload_gazetteer(nlp)
+    return nlp
+
+
+def worker_ready() -> tuple[int, int]:
+    """
+    Startup probe, submitted once per worker before the API reports ready. A worker runs
+    one task at a time, so holding each probe at the pool's barrier until all of them have
+    arrived means every worker has run init_worker(). Returns the worker's (pid, thread id).
+    """
+    if _ready_barrier is not None:
+        _ready_barrier.wait(WORKER_START_TIMEOUT)
+    if _worker_nlp is None:
+        raise RuntimeError("Worker has no model loaded")
+    return os.getpid(), threading.get_ident()
+
+
+def make_worker_pool(kind: str = WORKER_POOL_KIND, size: int = WORKER_POOL_SIZE,
+                     nlp: spacy.Language | None = None, mode: Mode = "full") -> Executor:
+    """
+    Creates the pool that runs the analysis off the event loop.
+    Process pools use "spawn" so every worker starts clean and loads the model once
+    (only the rules-only pipeline for mode="fast");
+    thread pools share `nlp` (the model already loaded by the API).
+    """
+    if kind == "process":
+        context = multiprocessing.get_context("spawn")
+        return ProcessPoolExecutor(
+            max_workers=size,
+            mp_context=context,
+            initializer=init_worker,
+            initargs=(None, mode, context.Barrier(size)),
+        )
+    if kind == "thread":
+        return ThreadPoolExecutor(
+            max_workers=size,
+            thread_name_prefix="vitae-worker",
+            initializer=init_worker,
+            initargs=(nlp, mode, threading.Barrier(size)),
+        )
+    raise ValueError(f"Unknown worker pool kind: {kind!r} (expected 'process' or 'thread')")
+
+
+def extract_entities(doc) -> dict:
+    """
+    Splits the entities of a processed Doc into skills, people and extra info, in document order.
+    info_labels holds the label of each info entry (ORG, LOC, ...) for the candidate index.
+    """
+    # dicts as insertion-ordered sets: O(1) dedup and a stable, reproducible order
+    skills = {}
+    people = []
+    info = {}
+
+    for ent in doc.ents:
+        if ent.label_ == "SKILL":
+            skills[ent.text] = None
+        elif ent.label_ == "PER" and not people and is_valid_entity(ent.text, ent.label_):
+            people.append(ent.text)
+        else:
+            # Capture Everything Else (Orgs, Locations, and Extra People)
+            if is_valid_entity(ent.text, ent.label_):
+                info.setdefault(ent.text, ent.label_)
+
+    return {
+        "skills": list(skills),
+        "people": people,
+        "info": list(info),
+        "info_labels": list(info.values()),
+    }
+
+
+def split_chunks(text: str, max_chars: int = NER_CHUNK_CHARS) -> list[str]:
+    """
+    Cuts text into consecutive windows of at most max_chars that join back into text.
+    Each cut goes right after the last ". " in the window, else after the last space,
+    else at max_chars.
+    """
+    chunks = []
+    start = 0
+    while len(text) - start > max_chars:
+        end = start + max_chars
+        cut = text.rfind(". ", start, end)
+        if cut != -1:
+            cut += 2
+        else:
+            cut = text.rfind(" ", start, end) + 1 or end
+        chunks.append(text[start:cut])
+        start = cut
+    chunks.append(text[start:])
+    return chunks
+
+
+def ner_doc(nlp: spacy.Language, text: str, max_chars: int = NER_CHUNK_CHARS) -> Doc:
+    """
+    nlp(text) for normal texts. Longer ones run window by window through nlp.pipe and
+    are joined back into one Doc, so entity offsets refer to the full text. Each window's
+    tensor is dropped as soon as it is processed, which bounds peak memory.
+    """
+    if len(text) <= max_chars:
+        return nlp(text)
+
+    docs = []
+    for doc in nlp.pipe(split_chunks(text, max_chars), batch_size=1):
+        doc.tensor = numpy.zeros((0,), dtype="float32")
+        docs.append(doc)
+    merged = Doc.from_docs(docs, ensure_whitespace=False, exclude=["tensor", "user_data"])
+    merged.user_data["gazetteer_version"] = docs[0].user_data.get("gazetteer_version")
+    return merged
+
+
+def prepare_text(content: bytes | str) -> tuple[str | None, dict, dict]:
+    """
+    Extract → clean stage. Returns the cleaned text (None when no text could be
+    extracted), the extraction report (pages read, failed pages, truncation) and
+    the stage stats for the metrics (timings, pages, characters).
+    `content` is the PDF itself or the path of a spooled upload.
+    """
+    start = time.perf_counter()
+    extraction = extract_pdf(content)
+    stats = {"timings": {"extract": time.perf_counter() - start}, "pages": extraction.pages_read}
+    report = {field: value for field, value in extraction._asdict().items() if field != "text"}
+
+    if not extraction.text.strip():
+        return None, report, stats
+
+    start = time.perf_counter()
+    processed_text = clean_text(extraction.text)
+    stats["timings"]["clean"] = time.perf_counter() - start
+    stats["chars"] = len(processed_text)
+
+    return processed_text, report, stats
+
+
+def filter_doc(text: str, doc, stats: dict) -> dict:
+    """
+    Filter stage for one processed Doc; adds token/entity counts and timing to `stats`.
+    The result carries the full cleaned text; the API trims it to a preview on the way out.
+    """
+    start = time.perf_counter()
+    result = {"text": text, **extract_entities(doc), "gazetteer_version": doc.user_data.get("gazetteer_version")}
+    stats["timings"]["filter"] = time.perf_counter() - start
+    stats["tokens"] = len(doc)
+    stats["entities"] = dict(Counter(ent.label_ for ent in doc.ents))
+    return result
+
+
+def analyze_pdf(content: bytes | str, nlp: spacy.Language | None = None,
+                expected_gazetteer: str | None = None, mode: Mode = "full") -> tuple[dict | None, dict]:
+    """
+    Full extract → clean → NER → filter pipeline for one PDF.
+    Runs inside the worker pool (or any thread, given `nlp`).
+    A worker whose gazetteer is not at `expected_gazetteer` (the API reloaded it)
+    reloads its own from the term files first. mode="fast" skips the statistical NER.
+    Returns the result (None when no text could be extracted) and the stage stats.
+    """
+    nlp = mode_pipeline(mode, nlp, expected_gazetteer)
+
+    processed_text, extraction, stats = prepare_text(content)
+
+    if processed_text is None:
+        return None, stats
+
+    start = time.perf_counter()
+    doc = ner_doc(nlp, processed_text)
+    stats["timings"]["ner"] = time.perf_counter() - start
+
+    result = filter_doc(processed_text, doc, stats)
+    result["extraction"] = extraction
+    return result, stats
+
+
+def analyze_texts(nlp: spacy.Language, texts: list[str], batch_size: int = BATCH_SIZE) -> list[tuple[dict, dict]]:
+    """
+    NER → filter stage for many cleaned texts at once, returning (result, stats) per text.
+    nlp.pipe amortises the pipeline overhead across each batch of `batch_size` texts; texts
+    over NER_CHUNK_CHARS are taken out of it and chunked by ner_doc(). A batch runs its
+    forward pass for all of its texts at once, so each one's "ner" timing is its share of
+    the batch's pass.
+    """
+    analyzed = [None] * len(texts)
+    short = [i for i, text in enumerate(texts) if len(text) <= NER_CHUNK_CHARS]
+    for first in range(0, len(short), batch_size):
+        batch = short[first:first + batch_size]
+        start = time.perf_counter()
+        docs = list(nlp.pipe([texts[i] for i in batch], batch_size=batch_size))
+        share = (time.perf_counter() - start) / len(batch)
+        for i, doc in zip(batch, docs):
+            stats = {"timings": {"ner": share}}
+            analyzed[i] = (filter_doc(texts[i], doc, stats), stats)
+
+    for i, text in enumerate(texts):
+        if analyzed[i] is None:
+            start = time.perf_counter()
+            doc = ner_doc(nlp, text)
+            stats = {"timings": {"ner": time.perf_counter() - start}}
+            analyzed[i] = (filter_doc(text, doc, stats), stats)
+    return analyzed
+
+
+def analyze_text_batch(texts: list[str], mode: Mode = "full", expected_gazetteer: str | None = None,
+                       batch_size: int = BATCH_SIZE) -> list[tuple[dict, dict]]:
+    """ Worker side of /analyze/batch, the /analyze micro-batcher and ingest --dedup: one NER pass over cleaned texts """
+    return analyze_texts(mode_pipeline(mode, None, expected_gazetteer), texts, batch_size=batch_size)
+
+
+def prepare_files(paths: list[str],
+                  signatures: bool = False) -> list[tuple[str, dict, str | None, numpy.ndarray | None]]:
+    """
+    Extract → clean stage of the ingest CLI, run inside a worker. Returns (path, record,
+    text, signature) per file: the record holds the extraction report, or an "error" (and
+    text None) when the file could not be analysed; with `signatures`, the text's MinHash.
+    """
+    prepared = []
+    for path in paths:
+        try:
+            text, extraction, _ = prepare_text(path)
+        except OSError as e:
+            prepared.append((path, {"error": str(e)}, None, None))
+            continue
+        if text is None:
+            prepared.append((path, {"error": "no extractable text", "extraction": extraction}, None, None))
+        else:
+            prepared.append((path, {"extraction": extraction}, text, minhash(text) if signatures else None))
+    return prepared
+
+
+def analyze_files(paths: list[str], batch_size: int = BATCH_SIZE, mode: Mode = "full") -> list[tuple[str, dict]]:
+    """
+    Bulk stage for the ingest CLI, run inside a worker: extract → clean each file,
+    then one nlp.pipe pass over the chunk. Returns (path, record) in input order; a
+    record holds the result, or an "error" when the file could not be analysed.
+    """
+    prepared = prepare_files(paths)
+    texts = [text for _, _, text, _ in prepared if text is not None]
+    analyzed = iter(analyze_texts(mode_pipeline(mode), texts, batch_size=batch_size))
+    return [(path, record if text is None else {**next(analyzed)[0], **record}) for path, record, text, _ in prepared]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Vitae-I NLP pipeline tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="write the assembled pipeline to disk for fast API start")
+    build.add_argument("--output", default=NLP_ARTIFACT_PATH)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        print(f"Built {args.output} (fingerprint {build_artifact(args.output)})")
@@ -0,0 +1,54 @@
+from typing import Any, Callable
+
+from fastapi import HTTPException, Query
+from fastapi.responses import JSONResponse
+
+from config import PREVIEW_CHARS
+
+try:
+    import orjson
+except ImportError:  # pinned in requirements.txt; without it, the standard json encoder is used
+    orjson = None
+
+# Public fields of an analysis result, in response order
+RESULT_FIELDS = (
+    "text_preview", "skills", "people", "info", "extraction", "gazetteer_version", "duplicate_of", "similarity",
+)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson when it is installed (several times faster on
+    large payloads). Endpoints return it directly so FastAPI's jsonable_encoder pass
+    is skipped as well; results are plain dicts/lists/str/int already.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content)
+
+
+def shape_result(result: dict, fields: tuple = RESULT_FIELDS, include_text: bool = False) -> dict:
+    """ Public view of a pipeline result: the requested fields (None when not computed), text cut to a preview """
+    shaped = {}
+    for field in fields:
+        shaped[field] = result["text"][:PREVIEW_CHARS] if field == "text_preview" else result.get(field)
+    if include_text:
+        shaped["text"] = result["text"]
+    return shaped
+
+
+def result_shaper(
+    fields: str | None = Query(None, description=f"Comma-separated subset of: {', '.join(RESULT_FIELDS)}"),
+    include_text: bool = Query(False, description="Also return the full cleaned text"),
+) -> Callable[[dict], dict]:
+    """ Dependency turning ?fields=skills,info&include_text=true into a result → response function """
+    selected = RESULT_FIELDS
+    if fields:
+        requested = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = requested.difference(RESULT_FIELDS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(sorted(unknown))}")
+        selected = tuple(field for field in RESULT_FIELDS if field in requested)
+    return lambda result: shape_result(result, selected, include_text)
@@ -4,8 +4,12 @@
 #  Usage:
 #    ./run.sh          → Start API + Frontend (full stack)
 #    ./run.sh api      → Start API only
+#    ./run.sh serve    → Start the API pre-forked (model loaded once, shared by workers)
 #    ./run.sh app      → Start Frontend only
 #    ./run.sh test     → Run the test suite
+#    ./run.sh build    → Prebuild the NLP pipeline for fast API start
+#    ./run.sh bench    → Run the performance benchmarks
+#    ./run.sh ingest   → Bulk-analyse a folder of PDFs to JSONL/Parquet
 # ============================================================
 
 set -e
@@ -47,6 +51,11 @@ start_api() {
     "$VENV_PYTHON" -m uvicorn api:app --host 127.0.0.1 --port 8000 --reload
 }
 
+start_server() {
+    info "Starting pre-fork API server on http://localhost:8000 ..."
+    "$VENV_PYTHON" "$SCRIPT_DIR/server.py" "${@}"
+}
+
 start_app() {
     info "Starting Streamlit frontend on http://localhost:8501 ..."
     "$VENV_PYTHON" -m streamlit run "$SCRIPT_DIR/app.py"
@@ -57,6 +66,21 @@ run_tests() {
     "$VENV_PYTHON" -m pytest "$SCRIPT_DIR/tests/" -v
 }
 
+build_model() {
+    info "Building the NLP pipeline artifact (model + entity ruler)..."
+    "$VENV_PYTHON" "$SCRIPT_DIR/pipeline.py" build
+}
+
+run_benchmarks() {
+    info "Running the benchmark suite..."
+    "$VENV_PYTHON" "$SCRIPT_DIR/benchmarks/run_benchmarks.py" "${@}"
+}
+
+run_ingest() {
+    info "Running bulk ingest..."
+    "$VENV_PYTHON" "$SCRIPT_DIR/ingest.py" "${@}"
+}
+
 start_all() {
     info "Starting full stack (API + Frontend)..."
     echo ""
@@ -88,11 +112,15 @@ ensure_venv
 
 case "${1:-all}" in
     api)   start_api ;;
+    serve) shift; start_server "$@" ;;
     app)   start_app ;;
     test)  run_tests ;;
+    build) build_model ;;
+    bench) shift; run_benchmarks "$@" ;;
+    ingest) shift; run_ingest "$@" ;;
     all)   start_all ;;
     *)
-        echo "Usage: $0 [api|app|test|all]"
+        echo "Usage: $0 [api|serve|app|test|build|bench|ingest|all]"
         exit 1
         ;;
 esac
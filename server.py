@@ -0,0 +1,188 @@
+"""
+Pre-fork server: loads the NLP pipeline once, then forks the uvicorn workers.
+
+    python server.py --workers 4 [--host 127.0.0.1] [--port 8000]
+    ./run.sh serve --workers 4
+
+`uvicorn api:app --workers N` starts N fresh interpreters and each one loads its
+own model. Here the master builds and warms up the pipeline, freezes the GC so
+the collector never touches (and copies) those objects, and forks the workers
+onto one shared listening socket. The model pages stay shared copy-on-write.
+
+Workers analyse in threads on the shared model (VITAE_WORKER_POOL=thread) and
+don't start page-extraction pools of their own. A memory report (unique vs
+shared per process, from /proc/<pid>/smaps_rollup) is printed once the workers
+are up, and again on `kill -USR1 <master pid>`.
+
+A gazetteer reload (POST /admin/gazetteers/reload on any worker, or
+`kill -HUP <master pid>`) reaches the master, which reloads its own copy, so
+replacement workers are forked with the new terms, and relays it to every
+worker as a SIGHUP.
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+# Before config is imported: a process pool would load one model per worker again
+os.environ["VITAE_WORKER_POOL"] = "thread"
+os.environ.setdefault("VITAE_PARALLEL_PDF_WORKERS", "1")
+
+SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def read_smaps_rollup(pid: int) -> dict[str, int] | None:
+    """ Memory totals of a process in kB from /proc/<pid>/smaps_rollup (Linux 4.14+), None if unavailable """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    values = {}
+    for line in lines[1:]:
+        name, _, rest = line.partition(":")
+        if name in SMAPS_FIELDS:
+            values[name] = int(rest.split()[0])
+    return values
+
+
+def memory_report(processes: dict[int, str]) -> str:
+    """
+    One line per process: RSS, PSS (its fair share of shared pages), shared and unique
+    (private) memory in MB. The PSS total is what the whole server really costs.
+    """
+    lines = [f"{'pid':>8s} {'role':8s} {'rss':>9s} {'pss':>9s} {'shared':>9s} {'unique':>9s}"]
+    total_pss = 0
+    for pid, role in processes.items():
+        m = read_smaps_rollup(pid)
+        if m is None:
+            lines.append(f"{pid:8d} {role:8s} {'(smaps_rollup unavailable)':>39s}")
+            continue
+        shared = m.get("Shared_Clean", 0) + m.get("Shared_Dirty", 0)
+        unique = m.get("Private_Clean", 0) + m.get("Private_Dirty", 0)
+        total_pss += m.get("Pss", 0)
+        lines.append(
+            f"{pid:8d} {role:8s} {m.get('Rss', 0) / 1024:8.1f}M {m.get('Pss', 0) / 1024:8.1f}M "
+            f"{shared / 1024:8.1f}M {unique / 1024:8.1f}M"
+        )
+    lines.append(f"total PSS: {total_pss / 1024:.1f} MB for {len(processes)} processes")
+    return "\n".join(lines)
+
+
+def listen(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock: socket.socket, log_level: str):
+    """ Child side of the fork: serve the inherited socket until told to stop """
+    import uvicorn
+
+    signal.signal(signal.SIGUSR1, signal.SIG_IGN)  # the report is the master's job
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)  # until the lifespan installs the reload handler
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Master:
+    def __init__(self, app, sock: socket.socket, workers: int, log_level: str):
+        self.app = app
+        self.sock = sock
+        self.n_workers = workers
+        self.log_level = log_level
+        self.workers = set()
+        self.stopping = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(self.app, self.sock, self.log_level)
+            finally:
+                os._exit(0)
+        self.workers.add(pid)
+
+    def report(self, *_):
+        processes = {os.getpid(): "master", **{pid: "worker" for pid in sorted(self.workers)}}
+        print(memory_report(processes), file=sys.stderr, flush=True)
+
+    def reload(self, *_):
+        """ SIGHUP: reload the master's gazetteer first (workers forked from now on get it), then each worker's """
+        from pipeline import reload_gazetteer
+
+        version = reload_gazetteer(self.app.state.nlp)
+        print(f"Gazetteer reloaded (version {version}), relaying to {len(self.workers)} workers",
+              file=sys.stderr, flush=True)
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGHUP)
+            except ProcessLookupError:
+                pass
+
+    def stop(self, *_):
+        self.stopping = True
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self, report_after: float):
+        signal.signal(signal.SIGUSR1, self.report)
+        signal.signal(signal.SIGHUP, self.reload)
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        for _ in range(self.n_workers):
+            self.spawn()
+        print(f"Master {os.getpid()} forked {self.n_workers} workers", file=sys.stderr, flush=True)
+
+        if report_after > 0:
+            time.sleep(report_after)  # let every worker run its lifespan first
+            if not self.stopping:
+                self.report()
+
+        while self.workers:
+            pid, status = os.wait()
+            self.workers.discard(pid)
+            if not self.stopping:
+                # A crashed worker is replaced by a new fork of the same, still loaded, master
+                print(f"Worker {pid} exited ({status}), forking a new one", file=sys.stderr, flush=True)
+                self.spawn()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--report-after", type=float, default=5, help="seconds before the first memory report (0 = none)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    from api import app
+    from pipeline import load_pipeline, warm_up
+
+    start = time.perf_counter()
+    app.state.nlp = warm_up(load_pipeline())
+    app.state.master_pid = os.getpid()  # where the workers send gazetteer reloads
+    print(f"Pipeline loaded in {time.perf_counter() - start:.1f}s, forking workers", file=sys.stderr, flush=True)
+
+    # Move everything allocated so far out of the GC's reach: collections would otherwise
+    # write to every object header and turn the shared model pages into private copies
+    gc.collect()
+    gc.freeze()
+
+    sock = listen(args.host, args.port)
+    Master(app, sock, args.workers, args.log_level).run(args.report_after)
+
+
+if __name__ == "__main__":
+    main()
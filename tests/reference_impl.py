@@ -0,0 +1,99 @@
+"""
+Verbatim copies of the original clean_text() and is_valid_entity().
+The optimised versions in utils.py must stay output-identical to these;
+tests compare both on generated corpora and the benchmarks time both.
+"""
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import INVALID_WORDS, JOB_KEYWORDS
+
+
+def clean_text(text: str) -> str:
+    page_pattern = re.compile(r'^\s*(?:p[áa]gina|page|p[áa]g\.?)\s*\d+(?:\s*(?:de|of|/)\s*\d+)?\s*$', re.IGNORECASE)
+    number_pattern = re.compile(r'^\s*\d+\s*(?:/|of|de)\s*\d+\s*$', re.IGNORECASE)
+
+    lines = text.split('\n')
+    cleaned_lines = []
+
+    SECTION_STARTERS = INVALID_WORDS.union(JOB_KEYWORDS)
+
+    for i, line in enumerate(lines):
+        line = line.strip()
+        if not line: continue
+
+        if page_pattern.match(line) or number_pattern.match(line): continue
+
+        add_period = False
+
+        if line[-1] not in ".!?:;":
+
+            if i < len(lines) - 1:
+                next_line = lines[i+1].strip()
+                next_line_lower = next_line.lower()
+
+                if any(next_line_lower.startswith(word) for word in SECTION_STARTERS):
+                    add_period = True
+                elif len(line) < 50:
+                    if next_line and next_line[0].isupper():
+                        add_period = True
+                    elif len(next_line) > 50:
+                        add_period = True
+
+        if add_period:
+            line += "."
+
+        cleaned_lines.append(line)
+
+    text = ' '.join(cleaned_lines)
+    text = re.sub(r'\n+', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def is_valid_entity(text: str, label: str) -> bool:
+    """
+    Post-processing filter: Decides if an entity is 'real' or noise.
+    Returns True if valid, False if it should be discarded.
+    """
+    text = text.strip()
+    text_lower = text.lower()
+
+    # Universal Rules:
+    if len(text) < 3: return False
+    if re.search(r'https?://|www\.|@|\.com', text_lower): return False # Rule 1: Regex to catch URLs, Emails, or file paths mistakenly labeled
+
+    # Rule: Check against our Massive Blacklist
+    if text_lower in INVALID_WORDS: return False
+    
+    # Rule 4: Filter PER (Person) entities
+    if label == "PER":
+        if text.islower(): return False
+        # Rule: A Person is NOT a Job Title (e.g. "Dev Backend")
+        if any(job in text_lower for job in JOB_KEYWORDS): return False
+        # Rule: A Person is NOT a Section Header (e.g. "Certificações")
+        if text_lower in INVALID_WORDS: return False
+        # Rule: People don't have numbers or symbols
+        if re.search(r'\d|[!@#$%*]', text): return False
+        # Rule: Must be at least 2 names ("Douglas" is risky, "Douglas Nascimento" is safe)
+        if " " not in text: return False
+    
+    # Rule 5: Filter ORG (Organization) entities
+    if label == "ORG":
+        # Rule: "Engenheiro de Software" is a Job, NOT an Organization
+        if any(job in text_lower for job in JOB_KEYWORDS): return False
+        # Rule: "Graduação em..." is a Degree, NOT an Organization //Need update in the future
+        if text_lower.startswith(("graduação", "bacharelado", "ensino", "mestrado")): return False
+        # Rule: Real Orgs aren't usually all lowercase
+        if text.islower(): return False
+    
+    # Rule 6: Filter LOC (Location) entities - similar checks
+    if label == "LOC":
+        if text_lower in INVALID_WORDS: return False
+        # Rule: People don't have numbers or symbols
+        if re.search(r'\d|[!@#$%*]', text): return False
+
+    return True
@@ -1,4 +1,5 @@
 import io
+import os
 import sys
 import pytest
 from pathlib import Path
@@ -6,8 +7,13 @@ from pathlib import Path
 # Add parent directory to path to allow importing api module
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Share the lifespan's model with a thread pool instead of spawning a model per process
+os.environ.setdefault("VITAE_WORKER_POOL", "thread")
+
 from fastapi.testclient import TestClient
+import metrics
 from api import app
+from pipeline import make_worker_pool
 
 
 @pytest.fixture(scope="session")
@@ -83,4 +89,426 @@ def test_analyze_rejects_non_pdf(client):
     """Test that a non-PDF upload returns a 400 error."""
     files = {"file": ("resume.txt", io.BytesIO(b"some text"), "text/plain")}
     response = client.post("/analyze", files=files)
-    assert response.status_code == 400
\ No newline at end of file
+    assert response.status_code == 400
+
+
+def test_analyze_batch(client):
+    """Test that the batch endpoint keeps upload order and reports per-file errors."""
+    files = [
+        ("files", ("a.pdf", io.BytesIO(make_pdf("Desenvolvedor Python.")), "application/pdf")),
+        ("files", ("b.txt", io.BytesIO(b"some text"), "text/plain")),
+        ("files", ("c.pdf", io.BytesIO(make_pdf("Experiencia com Docker.")), "application/pdf")),
+    ]
+    response = client.post("/analyze/batch", files=files)
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["filename"] for r in results] == ["a.pdf", "b.txt", "c.pdf"]
+    assert "Python" in results[0]["skills"]
+    assert "error" in results[1]
+    assert "Docker" in results[2]["skills"]
+
+
+def test_split_evenly_spreads_batch_over_workers():
+    """Test that a batch is cut into at most one slice per worker, in order and without losing texts."""
+    from api import split_evenly
+
+    assert split_evenly(list(range(10)), 4) == [[0, 1], [2, 3, 4], [5, 6], [7, 8, 9]]
+    assert split_evenly([0, 1], 4) == [[0], [1]]
+    assert split_evenly([], 4) == []
+
+
+def test_microbatch_is_split_over_workers(client, monkeypatch):
+    """Test that one coalesced /analyze batch runs on every pool worker, not on a single one."""
+    import asyncio
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    import api
+
+    started = threading.Barrier(3, timeout=10)  # only passes if three slices run at once
+    threads = []
+
+    def fake_batch(texts, mode, expected, *args):
+        threads.append(threading.get_ident())
+        started.wait()
+        return [(text, {}) for text in texts]
+
+    monkeypatch.setattr(api, "analyze_text_batch", fake_batch)
+    monkeypatch.setattr(api, "WORKER_POOL_SIZE", 3)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        monkeypatch.setattr(client.app.state, "pool", pool)
+        texts = [f"resume {i}" for i in range(7)]
+        results = asyncio.run(api.ner_batch(client.app, "full", texts))
+
+    assert [text for text, _ in results] == texts
+    assert len(set(threads)) == 3
+
+
+def test_analyze_concurrent_uploads(client):
+    """Test that several uploads in flight at once all get their own result."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    def post(skill):
+        pdf_bytes = make_pdf(f"Maria Souza. Desenvolvedora com experiencia em {skill}.")
+        files = {"file": ("resume.pdf", io.BytesIO(pdf_bytes), "application/pdf")}
+        return client.post("/analyze", files=files)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        responses = list(executor.map(post, ["Python", "Docker", "Kubernetes", "Django"]))
+
+    for skill, response in zip(["Python", "Docker", "Kubernetes", "Django"], responses):
+        assert response.status_code == 200
+        assert skill in response.json()["skills"]
+
+
+def test_make_worker_pool_rejects_unknown_kind():
+    """Test that a typo in VITAE_WORKER_POOL fails loudly instead of falling back."""
+    with pytest.raises(ValueError):
+        make_worker_pool(kind="fibers")
+
+
+def test_worker_ready_waits_for_every_worker(client):
+    """Test that the startup probes are answered by as many distinct workers as the pool has."""
+    from pipeline import worker_ready
+
+    with make_worker_pool(kind="thread", size=3, nlp=app.state.nlp) as pool:
+        ready = [future.result(timeout=30) for future in [pool.submit(worker_ready) for _ in range(3)]]
+    assert len(set(ready)) == 3
+
+
+def test_analyze_repeat_upload_hits_cache(client):
+    """Test that re-uploading the same bytes is served from the result cache."""
+    pdf_bytes = make_pdf("Ana Lima. Engenheira com experiencia em Kubernetes e Redis.")
+    files = {"file": ("resume.pdf", io.BytesIO(pdf_bytes), "application/pdf")}
+
+    first = client.post("/analyze", files=files)
+    hits_before = client.get("/cache/stats").json()["hits"]
+    files = {"file": ("resume.pdf", io.BytesIO(pdf_bytes), "application/pdf")}
+    second = client.post("/analyze", files=files)
+
+    assert second.json() == first.json()
+    assert client.get("/cache/stats").json()["hits"] == hits_before + 1
+
+
+def test_job_lifecycle(client):
+    """Test that POST /jobs answers right away and GET /jobs/{id} eventually has the result."""
+    import time
+
+    pdf_bytes = make_pdf("Carlos Mendes. Desenvolvedor Java e Spring Boot.")
+    files = {"file": ("resume.pdf", io.BytesIO(pdf_bytes), "application/pdf")}
+    response = client.post("/jobs", files=files)
+
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert response.headers["Location"] == f"/jobs/{job_id}"
+
+    for _ in range(100):
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("done", "failed"):
+            break
+        time.sleep(0.05)
+
+    assert job["status"] == "done"
+    assert "Java" in job["result"]["skills"]
+
+
+def test_unknown_job_is_404(client):
+    assert client.get("/jobs/does-not-exist").status_code == 404
+
+
+def test_full_job_queue_refuses_before_reading_the_upload(client, monkeypatch):
+    """Test that a full /jobs queue answers 429 without spooling the upload to a temp file."""
+    import api
+
+    async def receive_upload(file):
+        raise AssertionError("upload read although the queue is full")
+
+    monkeypatch.setattr(api, "receive_upload", receive_upload)
+    monkeypatch.setattr(client.app.state.jobs, "full", lambda: True)
+    files = {"file": ("resume.pdf", io.BytesIO(make_pdf("Ana Lima. Python.")), "application/pdf")}
+    response = client.post("/jobs", files=files)
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+
+
+def test_server_timing_and_metrics(client):
+    """Test that /analyze reports per-stage timings and /metrics exposes them."""
+    pdf_bytes = make_pdf("Paula Reis. Desenvolvedora Go e Rust.")
+    files = {"file": ("resume.pdf", io.BytesIO(pdf_bytes), "application/pdf")}
+    response = client.post("/analyze", files=files)
+
+    stages = [part.split(";")[0] for part in response.headers["Server-Timing"].split(", ")]
+    assert stages == ["upload", "cache", "extract", "clean", "ner", "filter"]
+
+    client.post("/analyze", files={"file": ("resume.txt", io.BytesIO(b"x"), "text/plain")})
+    body = client.get("/metrics").text
+    assert 'vitae_stage_duration_seconds_count{stage="ner"}' in body
+    assert 'vitae_entities_total{label="SKILL"}' in body
+    assert 'vitae_rejections_total{reason="not_pdf"}' in body
+
+
+def test_analyze_rejects_fake_pdf(client):
+    """Test that a file declared as PDF but without the %PDF- header is rejected before analysis."""
+    files = {"file": ("resume.pdf", io.BytesIO(b"MZ\x90\x00 not a pdf at all"), "application/pdf")}
+    response = client.post("/analyze", files=files)
+    assert response.status_code == 400
+
+
+def test_analyze_large_upload_is_spooled_to_disk(client, monkeypatch):
+    """Test that uploads over the spool threshold reach the extractor as a temp file, removed afterwards."""
+    import api
+    import uploads
+
+    monkeypatch.setattr(uploads, "UPLOAD_SPOOL_BYTES", 0)
+    sources = []
+
+    def recording_discard(upload):
+        sources.append(upload.source)
+        uploads.discard(upload)
+
+    monkeypatch.setattr(api, "discard", recording_discard)
+
+    pdf_bytes = make_pdf("Julia Castro. Desenvolvedora Python e PostgreSQL.")
+    files = {"file": ("resume.pdf", io.BytesIO(pdf_bytes), "application/pdf")}
+    response = client.post("/analyze", files=files)
+
+    assert response.status_code == 200
+    assert "PostgreSQL" in response.json()["skills"]
+    assert len(sources) == 1 and isinstance(sources[0], str)
+    assert not os.path.exists(sources[0])
+
+
+def test_upload_limit_middleware():
+    """Test that bodies over the limit (per path) get 413, by Content-Length and while streaming."""
+    from fastapi import FastAPI, Request
+    from uploads import UploadLimitMiddleware
+
+    small_app = FastAPI()
+    small_app.add_middleware(UploadLimitMiddleware, max_bytes=100, limits={"/batch": 300})
+
+    @small_app.post("/echo")
+    async def echo(request: Request):
+        return {"size": len(await request.body())}
+
+    @small_app.post("/batch")
+    async def batch(request: Request):
+        return {"size": len(await request.body())}
+
+    with TestClient(small_app) as small:
+        assert small.post("/echo", content=b"x" * 100).json() == {"size": 100}
+        assert small.post("/echo", content=b"x" * 101).status_code == 413
+        # No Content-Length: the body is cut off while it streams in
+        chunked = small.post("/echo", content=iter([b"x" * 60, b"x" * 60]))
+        assert chunked.status_code == 413
+        # The batch path has its own, larger cap
+        assert small.post("/batch", content=b"x" * 300).json() == {"size": 300}
+        too_large = small.post("/batch", content=b"x" * 301)
+        assert too_large.status_code == 413 and "Request" in too_large.json()["detail"]
+
+
+def test_batch_caps_each_file_not_the_total(client, monkeypatch):
+    """Test that a batch whose total is over the file limit is analysed, and only the oversized file is refused."""
+    import uploads
+
+    pdfs = [make_pdf(f"Candidato {n}. Desenvolvedor Python e Docker.") for n in range(6)]
+    limit = max(len(pdf) for pdf in pdfs) + 100
+    assert sum(len(pdf) for pdf in pdfs) > limit
+    monkeypatch.setattr(uploads, "MAX_UPLOAD_BYTES", limit)
+
+    oversized = pdfs[0] + b"%" + b"x" * limit
+    files = [("files", (f"{n}.pdf", io.BytesIO(pdf), "application/pdf")) for n, pdf in enumerate(pdfs)]
+    files.append(("files", ("big.pdf", io.BytesIO(oversized), "application/pdf")))
+    response = client.post("/analyze/batch", files=files)
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert all("Python" in result["skills"] for result in results[:6])
+    assert results[6]["error"] == uploads.TOO_LARGE_DETAIL
+
+    single = client.post("/analyze", files={"file": ("big.pdf", io.BytesIO(oversized), "application/pdf")})
+    assert single.status_code == 413
+
+
+def test_analyze_fields_and_preview(client):
+    """Test that ?fields= trims the response, the preview is capped and ?include_text= adds the full text."""
+    from config import PREVIEW_CHARS
+
+    text = "Rita Prado. Desenvolvedora Python. " + "Projetos de dados com SQL e Pandas. " * 40
+    pdf_bytes = make_pdf(text)
+
+    response = client.post("/analyze", files={"file": ("resume.pdf", io.BytesIO(pdf_bytes), "application/pdf")})
+    data = response.json()
+    assert list(data) == ["text_preview", "skills", "people", "info", "extraction", "gazetteer_version",
+                          "duplicate_of", "similarity"]
+    assert len(data["text_preview"]) == PREVIEW_CHARS
+
+    response = client.post(
+        "/analyze?fields=skills,info&include_text=true",
+        files={"file": ("resume.pdf", io.BytesIO(pdf_bytes), "application/pdf")},
+    )
+    data = response.json()
+    assert list(data) == ["skills", "info", "text"]
+    assert data["text"].startswith("Rita Prado") and len(data["text"]) > PREVIEW_CHARS
+    assert response.headers["content-encoding"] == "gzip"
+
+    response = client.post("/analyze?fields=skills,salary", files={"file": ("resume.pdf", io.BytesIO(pdf_bytes), "application/pdf")})
+    assert response.status_code == 400
+
+
+def test_admin_endpoints_fail_closed(client, monkeypatch):
+    """Test that the reload endpoint refuses every call without a configured token, and a wrong token."""
+    import api
+
+    monkeypatch.setattr(api, "ADMIN_TOKEN", None)
+    assert client.post("/admin/gazetteers/reload").status_code == 403
+    assert client.post("/admin/gazetteers/reload", headers={"X-Admin-Token": ""}).status_code == 403
+
+    monkeypatch.setattr(api, "ADMIN_TOKEN", "secret")
+    assert client.post("/admin/gazetteers/reload").status_code == 403
+    assert client.post("/admin/gazetteers/reload", headers={"X-Admin-Token": "guess"}).status_code == 403
+
+
+def test_gazetteer_hot_reload(client, monkeypatch, tmp_path):
+    """Test that reloading the term files changes matches, version and cache keys without a restart."""
+    import api
+    import pipeline
+
+    admin = {"X-Admin-Token": "secret"}
+    monkeypatch.setattr(api, "ADMIN_TOKEN", "secret")
+
+    pdf_bytes = make_pdf("Bruna Teles. Desenvolvedora Elixir e Phoenix.")
+    post = lambda: client.post("/analyze", files={"file": ("resume.pdf", io.BytesIO(pdf_bytes), "application/pdf")})
+
+    before = post().json()
+    assert "Elixir" not in before["skills"]
+
+    skills_file = tmp_path / "skills.txt"
+    skills_file.write_text("# added at runtime\nElixir\nPhoenix\n", encoding="utf-8")
+    monkeypatch.setitem(pipeline.GAZETTEER_FILES, "SKILL", str(skills_file))
+    reload = client.post("/admin/gazetteers/reload", headers=admin).json()
+
+    after = post().json()
+    assert reload["gazetteer_version"] != before["gazetteer_version"]
+    assert after["gazetteer_version"] == reload["gazetteer_version"]
+    assert {"Elixir", "Phoenix"} <= set(after["skills"])
+
+    monkeypatch.undo()
+    monkeypatch.setattr(api, "ADMIN_TOKEN", "secret")
+    assert client.post("/admin/gazetteers/reload", headers=admin).json()["gazetteer_version"] == before["gazetteer_version"]
+
+
+def test_gazetteer_reload_is_relayed_to_prefork_master(client, monkeypatch):
+    """Test that under server.py a reload on one worker signals the master, which relays it to the others."""
+    import api
+
+    signals = []
+    monkeypatch.setattr(api.os, "kill", lambda pid, sig: signals.append((pid, sig)))
+    monkeypatch.setattr(app.state, "master_pid", 4242, raising=False)
+    monkeypatch.setattr(api, "ADMIN_TOKEN", "secret")
+
+    assert client.post("/admin/gazetteers/reload", headers={"X-Admin-Token": "secret"}).status_code == 200
+    assert signals == [(4242, api.signal.SIGHUP)]
+
+
+def test_analyze_fast_mode(client):
+    """Test that ?mode=fast returns the gazetteer skills without people, cached apart from full mode."""
+    pdf_bytes = make_pdf("Joana Prado. Desenvolvedora Python com experiencia em Redis na UFMG.")
+
+    def post(path, mode):
+        files = {"file": ("resume.pdf", io.BytesIO(pdf_bytes), "application/pdf")}
+        return client.post(path, files=files, params={"mode": mode})
+
+    fast = post("/analyze", "fast").json()
+    assert fast["skills"] == ["Python", "Redis"]
+    assert fast["people"] == []
+    assert "UFMG" in fast["info"]
+
+    assert post("/analyze", "full").json()["skills"] == fast["skills"]
+    stats = client.get("/cache/stats").json()
+    assert post("/analyze", "fast").json() == fast
+    assert client.get("/cache/stats").json()["hits"] == stats["hits"] + 1
+
+    batch = client.post("/analyze/batch", params={"mode": "fast"},
+                        files=[("files", ("a.pdf", io.BytesIO(pdf_bytes), "application/pdf"))])
+    assert batch.json()["results"][0]["people"] == []
+    assert post("/analyze", "turbo").status_code == 422
+
+
+def test_candidate_search(client, monkeypatch):
+    """Test that analysed resumes land in the candidate index and can be searched by skill."""
+    from index import CandidateIndex
+
+    assert client.get("/candidates/search", params={"skills": "Python"}).status_code == 503
+
+    monkeypatch.setattr(client.app.state, "index", CandidateIndex(":memory:"))
+    pdf_bytes = make_pdf("Rita Campos. Engenheira com experiencia em Kotlin e Swift na UFSC.")
+    files = {"file": ("rita.pdf", io.BytesIO(pdf_bytes), "application/pdf")}
+    assert client.post("/analyze", files=files).status_code == 200
+
+    found = client.get("/candidates/search", params={"skills": "kotlin,swift", "org": "UFSC"}).json()
+    assert found["total"] == 1
+    assert found["results"][0]["filename"] == "rita.pdf"
+    assert found["results"][0]["skills"] == ["Kotlin", "Swift"]
+    assert client.get("/candidates/search", params={"skills": "Kotlin", "exclude": "Swift"}).json()["total"] == 0
+    assert client.get("/candidates/search", params={"q": '"oops'}).status_code == 400
+
+
+def near_duplicate_pdfs(name: str) -> tuple[bytes, bytes]:
+    """Two renderings of the same resume that only differ by the phone number."""
+    body = f"{name}. Desenvolvedora Rust e Go com experiencia em Redis e Kubernetes na UFPR. " * 4
+    return make_pdf(body + "Telefone 41 99999-1111."), make_pdf(body + "Telefone 41 98888-2222.")
+
+
+def test_near_duplicate_upload(client, monkeypatch):
+    """Test that a resume differing by a phone number is flagged and, with reuse on, skips the NER."""
+    import api
+    from dedup import DuplicateIndex
+
+    monkeypatch.setattr(app.state, "dedup", DuplicateIndex())
+    first, second = near_duplicate_pdfs("Carla Mendes")
+
+    def post(pdf_bytes, mode="full"):
+        files = {"file": ("resume.pdf", io.BytesIO(pdf_bytes), "application/pdf")}
+        return client.post(f"/analyze?mode={mode}", files=files).json()
+
+    # Fast-mode results are never indexed, so they are not even hashed
+    assert post(second, mode="fast")["duplicate_of"] is None
+    assert len(app.state.dedup) == 0
+
+    original = post(first)
+    assert original["duplicate_of"] is None
+
+    monkeypatch.setattr(api, "DEDUP_REUSE", True)
+    batches = metrics.NER_BATCH_SIZE._series.get(("full",), [0])[-1]
+    duplicate = post(second)
+    assert duplicate["duplicate_of"] is not None
+    assert duplicate["similarity"] >= 0.9
+    assert duplicate["skills"] == original["skills"]
+    assert duplicate["text_preview"] != original["text_preview"]
+    assert metrics.NER_BATCH_SIZE._series.get(("full",), [0])[-1] == batches
+
+
+def test_near_duplicates_within_one_batch(client, monkeypatch):
+    """Test that the second of two near-duplicates in the same batch is flagged and takes the first's entities."""
+    import api
+    from dedup import DuplicateIndex
+
+    monkeypatch.setattr(app.state, "dedup", DuplicateIndex())
+    monkeypatch.setattr(api, "DEDUP_REUSE", True)
+    analysed = []
+    analyze_text_batch = api.analyze_text_batch
+
+    def counting_batch(texts, *args):
+        analysed.extend(texts)
+        return analyze_text_batch(texts, *args)
+
+    monkeypatch.setattr(api, "analyze_text_batch", counting_batch)
+    first, second = near_duplicate_pdfs("Denise Prado")
+    files = [("files", ("a.pdf", io.BytesIO(first), "application/pdf")),
+             ("files", ("b.pdf", io.BytesIO(second), "application/pdf"))]
+    results = client.post("/analyze/batch", files=files).json()["results"]
+
+    assert results[0]["duplicate_of"] is None
+    assert results[1]["duplicate_of"] is not None and results[1]["similarity"] >= 0.9
+    assert results[1]["skills"] == results[0]["skills"]
+    assert len(analysed) == 1
@@ -0,0 +1,119 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to allow importing the batcher module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from batcher import MicroBatcher
+
+
+def test_lone_request_is_not_delayed():
+    """Test that with nothing running an item is dispatched at once, not after max_wait."""
+    async def scenario():
+        calls = []
+
+        async def handler(items):
+            calls.append(items)
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(handler, max_items=16, max_wait=10)
+        start = time.perf_counter()
+        assert await batcher.submit(21) == 42
+        assert time.perf_counter() - start < 1
+        assert calls == [[21]]
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_requests_share_a_batch():
+    """Test that items arriving while a batch runs go out together and each caller gets its own result."""
+    async def scenario():
+        calls = []
+        release = asyncio.Event()
+
+        async def handler(items):
+            calls.append(items)
+            await release.wait()
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(handler, max_items=16, max_wait=10)
+        first = asyncio.create_task(batcher.submit(0))
+        await asyncio.sleep(0)  # batch [0] is running
+        rest = [asyncio.create_task(batcher.submit(i)) for i in range(1, 6)]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await first == 0
+        assert await asyncio.gather(*rest) == [2, 4, 6, 8, 10]
+        assert calls == [[0], [1, 2, 3, 4, 5]]
+
+    asyncio.run(scenario())
+
+
+def test_full_batch_and_timeout_dispatch():
+    """Test that max_items sends a batch right away and max_wait bounds how long a partial one waits."""
+    async def scenario():
+        calls = []
+        block = asyncio.Event()
+
+        async def handler(items):
+            calls.append(items)
+            if items == ["busy"]:
+                await block.wait()
+            return items
+
+        batcher = MicroBatcher(handler, max_items=3, max_wait=0.01)
+        busy = asyncio.create_task(batcher.submit("busy"))
+        await asyncio.sleep(0)
+        assert await asyncio.gather(*[batcher.submit(i) for i in range(3)]) == [0, 1, 2]
+        assert await batcher.submit("late") == "late"  # waits max_wait, the first batch still runs
+        assert calls == [["busy"], [0, 1, 2], ["late"]]
+
+        block.set()
+        await busy
+
+    asyncio.run(scenario())
+
+
+def test_handler_error_reaches_every_caller():
+    """Test that a failing batch raises in each waiting handler instead of hanging them."""
+    async def scenario():
+        async def handler(items):
+            raise RuntimeError("model crashed")
+
+        batcher = MicroBatcher(handler, max_items=4, max_wait=0.01)
+        results = await asyncio.gather(*[batcher.submit(i) for i in range(3)], return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert batcher.stats() == {"pending": 0, "running": 0}
+
+    asyncio.run(scenario())
+
+
+def test_items_start_at_once_while_a_worker_is_idle():
+    """Test that with max_running=2 a second item runs beside the first instead of waiting for it."""
+    async def scenario():
+        calls = []
+        release = asyncio.Event()
+
+        async def handler(items):
+            calls.append(items)
+            await release.wait()
+            return items
+
+        batcher = MicroBatcher(handler, max_items=16, max_wait=10, max_running=2)
+        tasks = [asyncio.create_task(batcher.submit(i)) for i in range(2)]
+        await asyncio.sleep(0)
+        assert batcher.stats() == {"pending": 0, "running": 2}
+        await asyncio.sleep(0)
+        assert calls == [[0], [1]]
+
+        third = asyncio.create_task(batcher.submit(2))  # both running, so it waits
+        await asyncio.sleep(0)
+        assert batcher.stats()["pending"] == 1
+        release.set()
+        assert await asyncio.gather(*tasks, third) == [0, 1, 2]
+        assert calls == [[0], [1], [2]]
+
+    asyncio.run(scenario())
@@ -0,0 +1,83 @@
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow importing the cache module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cache import ResultCache
+
+
+def test_lru_evicts_least_recently_used():
+    """Test that the memory tier keeps at most max_entries, dropping the coldest."""
+    cache = ResultCache("fp", max_entries=2, db_path=None)
+    cache.set("a", {"skills": ["Python"]})
+    cache.set("b", {"skills": ["Docker"]})
+    cache.get("a")
+    cache.set("c", {"skills": ["Redis"]})
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_expired_entries_are_misses():
+    """Test that entries past their TTL are not served."""
+    cache = ResultCache("fp", ttl=-1, db_path=None)
+    cache.set("a", {"skills": []})
+
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    """Test that a new cache instance on the same SQLite file still has the result."""
+    db_path = str(tmp_path / "cache.sqlite")
+    first = ResultCache("fp", db_path=db_path)
+    key = first.key(b"%PDF-1.4 same bytes")
+    first.set(key, {"skills": ["Python"]})
+    first.close()
+
+    second = ResultCache("fp", db_path=db_path)
+    assert second.get(key) == {"skills": ["Python"]}
+    assert second.stats()["disk_hits"] == 1
+
+
+def test_key_depends_on_fingerprint():
+    """Test that a pipeline change (new fingerprint) never reuses old results."""
+    assert ResultCache("v1", db_path=None).key(b"x") != ResultCache("v2", db_path=None).key(b"x")
+
+
+def test_expired_rows_are_purged_once_per_interval(tmp_path):
+    """Test that writes drop expired SQLite rows through the expires_at index, not on every write."""
+    cache = ResultCache("fp", ttl=-1, db_path=str(tmp_path / "cache.sqlite"), purge_interval=3600)
+    indexes = [row[1] for row in cache._db.execute("PRAGMA index_list(results)")]
+    assert "results_expires_at" in indexes
+
+    cache.set("a", {"skills": []})  # first write purges, then not again for an hour
+    cache.set("b", {"skills": []})
+    cache.set("c", {"skills": []})
+    assert cache._db.execute("SELECT COUNT(*) FROM results").fetchone()[0] == 2
+
+    cache._next_purge = 0
+    cache.set("d", {"skills": []})
+    assert cache._db.execute("SELECT COUNT(*) FROM results").fetchone()[0] == 0
+
+
+def test_async_disk_tier_runs_off_the_event_loop(tmp_path, monkeypatch):
+    """Test that get_async/set_async do the SQLite work in another thread and still round-trip."""
+    import asyncio
+    import threading
+
+    cache = ResultCache("fp", max_entries=0, db_path=str(tmp_path / "cache.sqlite"))
+    threads = []
+    get, set_ = cache.get, cache.set
+    monkeypatch.setattr(cache, "get", lambda *a: threads.append(threading.get_ident()) or get(*a))
+    monkeypatch.setattr(cache, "set", lambda *a: threads.append(threading.get_ident()) or set_(*a))
+
+    async def scenario():
+        await cache.set_async("a", {"skills": ["Python"]})
+        return await cache.get_async("a")
+
+    assert asyncio.run(scenario()) == {"skills": ["Python"]}
+    assert cache.stats()["disk_hits"] == 1
+    assert threads and threading.get_ident() not in threads
@@ -0,0 +1,57 @@
+import random
+import sys
+import pytest
+from pathlib import Path
+
+# Add parent directory to path to allow importing the dedup module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dedup import DuplicateIndex, minhash
+
+
+def resume(seed: int, words: int = 400) -> list[str]:
+    rng = random.Random(seed)
+    return [f"palavra{rng.randint(0, 10_000)}" for _ in range(words)]
+
+
+def test_minhash_estimates_similarity():
+    """Test that a one-word edit stays close to 1, unrelated texts close to 0, and signatures are stable."""
+    words = resume(1)
+    edited = list(words)
+    edited[200] = "(31) 99999-1234"
+
+    original = minhash(" ".join(words))
+    assert (original == minhash(" ".join(words))).all()
+    assert (original == minhash(" ".join(edited))).mean() > 0.9
+    assert (original == minhash(" ".join(resume(2)))).mean() < 0.1
+
+
+def test_index_finds_best_near_duplicate():
+    """Test that query() returns the most similar stored document above the threshold, never the document itself."""
+    index = DuplicateIndex(threshold=0.8)
+    words = resume(1)
+    index.add("original", minhash(" ".join(words)), {"skills": ["Python"]})
+    index.add("other", minhash(" ".join(resume(2))))
+
+    edited = list(words)
+    edited[10] = "novo"
+    match = index.query(minhash(" ".join(edited)))
+    assert match.id == "original"
+    assert match.similarity > 0.8
+    assert match.entities == {"skills": ["Python"]}
+    assert index.query(minhash(" ".join(resume(3)))) is None
+    assert index.query(minhash(" ".join(words)), exclude="original") is None
+
+
+def test_index_keeps_last_max_docs():
+    """Test that the oldest documents are dropped from the LSH buckets too."""
+    index = DuplicateIndex(max_docs=2)
+    signatures = [minhash(" ".join(resume(seed))) for seed in range(3)]
+    for seed, signature in enumerate(signatures):
+        index.add(str(seed), signature)
+
+    assert len(index) == 2
+    assert index.query(signatures[0]) is None
+    assert index.query(signatures[2]).id == "2"
+    with pytest.raises(ValueError):
+        DuplicateIndex(num_perm=100, bands=16)
@@ -0,0 +1,99 @@
+import sys
+import pytest
+import spacy
+from pathlib import Path
+from spacy.tokens import Span
+
+# Add parent directory to path to allow importing the gazetteer module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import gazetteer  # noqa: F401  (registers the "gazetteer" factory)
+
+
+@pytest.fixture
+def nlp():
+    nlp = spacy.blank("pt")
+    ruler = nlp.add_pipe("gazetteer")
+    ruler.add_terms("SKILL", ["C++", "C#", ".NET", "ASP.NET", "CI/CD", "Node.js", "Machine Learning", "Java"])
+    ruler.add_terms("ORG", ["Universidade de São Paulo", "São Paulo Futebol Clube"])
+    ruler.add_terms("GPE", ["São Paulo"])
+    return nlp
+
+
+def ents(doc):
+    return [(e.text, e.label_) for e in doc.ents]
+
+
+def test_matches_punctuated_terms(nlp):
+    """Test the tokenization edge cases that per-token LOWER patterns used to miss."""
+    doc = nlp("Usei C++, C# e .NET (ASP.NET) com CI/CD, Node.js.")
+    assert ents(doc) == [
+        ("C++", "SKILL"), ("C#", "SKILL"), (".NET", "SKILL"), ("ASP.NET", "SKILL"),
+        ("CI/CD", "SKILL"), ("Node.js", "SKILL"),
+    ]
+
+
+def test_matching_is_case_insensitive(nlp):
+    """Test that matching runs on the LOWER attribute."""
+    assert ents(nlp("experiência com machine learning e JAVA")) == [
+        ("machine learning", "SKILL"), ("JAVA", "SKILL"),
+    ]
+
+
+def test_longest_match_wins(nlp):
+    """Test that overlapping terms resolve to the longest one."""
+    assert ents(nlp("Formado pela Universidade de São Paulo.")) == [("Universidade de São Paulo", "ORG")]
+
+
+def test_does_not_overwrite_existing_entities():
+    """Test the overwrite_ents=False precedence of the old entity_ruler."""
+    nlp = spacy.blank("pt")
+
+    @spacy.Language.component("preset_person")
+    def preset_person(doc):
+        doc.ents = [Span(doc, 0, 1, label="PER")]
+        return doc
+
+    nlp.add_pipe("preset_person")
+    nlp.add_pipe("gazetteer").add_terms("SKILL", ["Java"])
+
+    assert ents(nlp("Java Java")) == [("Java", "PER"), ("Java", "SKILL")]
+
+
+def test_loads_term_files(tmp_path):
+    """Test that term files skip blank lines and comments."""
+    path = tmp_path / "skills.txt"
+    path.write_text("# linguagens\nElixir\n\nHaskell\n", encoding="utf-8")
+    nlp = spacy.blank("pt")
+    ruler = nlp.add_pipe("gazetteer")
+    ruler.add_file("SKILL", path)
+
+    assert len(ruler) == 2
+    assert ents(nlp("Elixir e Haskell")) == [("Elixir", "SKILL"), ("Haskell", "SKILL")]
+
+
+def test_serialisation_round_trip(nlp, tmp_path):
+    """Test that a saved pipeline rebuilds the matcher with the same terms."""
+    nlp.to_disk(tmp_path / "nlp")
+    loaded = spacy.load(tmp_path / "nlp")
+    text = "Usei C# e CI/CD na Universidade de São Paulo."
+    assert ents(loaded(text)) == ents(nlp(text))
+
+    copy = spacy.blank("pt")
+    copy.add_pipe("gazetteer").from_bytes(nlp.get_pipe("gazetteer").to_bytes())
+    assert ents(copy(text)) == ents(nlp(text))
+
+
+def test_reload_swaps_terms_and_version():
+    """Test that reload() replaces the whole term set at once and bumps the version."""
+    nlp = spacy.blank("pt")
+    ruler = nlp.add_pipe("gazetteer")
+    ruler.add_terms("SKILL", ["Python"])
+    old_version = ruler.version
+
+    ruler.reload({"SKILL": ["Elixir"]})
+
+    doc = nlp("Python e Elixir")
+    assert [(e.text, e.label_) for e in doc.ents] == [("Elixir", "SKILL")]
+    assert ruler.version != old_version
+    assert doc.user_data["gazetteer_version"] == ruler.version
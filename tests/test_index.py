@@ -0,0 +1,56 @@
+import sys
+import pytest
+from pathlib import Path
+
+# Add parent directory to path to allow importing the index module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from index import CandidateIndex
+
+
+def result(skills, people=(), info=(), labels=()):
+    return {"skills": list(skills), "people": list(people), "info": list(info), "info_labels": list(labels)}
+
+
+@pytest.fixture
+def index():
+    index = CandidateIndex(":memory:")
+    index.add("a", result(["Python", "Docker"], ["Ana Lima"], ["UFMG", "Minas Gerais"], ["ORG", "LOC"]), "a.pdf")
+    index.add("b", result(["Python", "React", "Vue"], ["Bruno Costa"], ["UFRJ"], ["ORG"]), "b.pdf")
+    index.add("c", result(["Java", "React"], [], ["UFMG"], ["ORG"]), "c.pdf")
+    yield index
+    index.close()
+
+
+def digests(found: dict) -> list[str]:
+    return [r["digest"] for r in found["results"]]
+
+
+def test_boolean_filters(index):
+    """Test AND over skills/orgs/locations, NOT over skills, case-insensitive matching."""
+    assert digests(index.search(skills=["python"])) == ["b", "a"]
+    assert digests(index.search(skills=["PYTHON", "docker"], orgs=["ufmg"], locations=["minas gerais"])) == ["a"]
+    assert digests(index.search(orgs=["UFMG"], exclude=["Java"])) == ["a"]
+    assert index.search(skills=["Python", "Java"])["total"] == 0
+
+
+def test_ranking_by_optional_skills_and_text(index):
+    """Test that any= ranks by the number of matching skills and q= matches names via FTS5."""
+    found = index.search(any_skills=["React", "Vue"])
+    assert digests(found) == ["b", "c"]
+    assert [r["score"] for r in found["results"]] == [2, 1]
+    assert digests(index.search(skills=["Python"], any_skills=["Docker"])) == ["a", "b"]
+    assert digests(index.search(q="ana")) == ["a"]
+    with pytest.raises(ValueError):
+        index.search(q='"unterminated')
+
+
+def test_reindexing_replaces_entry_and_pagination(index):
+    """Test that the same digest is stored once, with its latest result, and limit/offset page through."""
+    index.add("a", result(["Go"]))
+
+    assert index.count() == 3
+    assert digests(index.search(skills=["Python"])) == ["b"]
+    assert index.search(skills=["Go"])["results"][0]["orgs"] == []
+    page = index.search(limit=2, offset=1)
+    assert page["total"] == 3 and len(page["results"]) == 2
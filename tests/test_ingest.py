@@ -0,0 +1,35 @@
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow importing the ingest module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ingest import JsonlWriter, find_pdfs
+
+
+def test_find_pdfs_walks_directories_and_file_lists(tmp_path):
+    """Test that directories are searched recursively and a file list is merged in, without duplicates."""
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    for name in ("a/one.pdf", "a/b/two.PDF", "a/notes.txt"):
+        (tmp_path / name).write_bytes(b"%PDF-")
+    file_list = tmp_path / "list.txt"
+    file_list.write_text(f"{tmp_path / 'a' / 'one.pdf'}\n/elsewhere/three.pdf\n\n")
+
+    found = find_pdfs([str(tmp_path / "a")], str(file_list))
+
+    assert found == sorted([str(tmp_path / "a" / "one.pdf"), str(tmp_path / "a" / "b" / "two.PDF"), "/elsewhere/three.pdf"])
+
+
+def test_jsonl_writer_resumes_after_interrupted_write(tmp_path):
+    """Test that a half-written last line is dropped and finished paths are reported as done."""
+    output = tmp_path / "results.jsonl"
+    output.write_text(json.dumps({"path": "a.pdf", "skills": []}) + "\n" + '{"path": "b.pd')
+
+    writer = JsonlWriter(output, include_text=False)
+    assert writer.done() == {"a.pdf"}
+    writer.write([{"path": "b.pdf", "skills": ["Python"], "text": "full text"}])
+    writer.close()
+
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert lines == [{"path": "a.pdf", "skills": []}, {"path": "b.pdf", "skills": ["Python"]}]
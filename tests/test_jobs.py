@@ -0,0 +1,96 @@
+import asyncio
+import sys
+import pytest
+from pathlib import Path
+
+# Add parent directory to path to allow importing the jobs module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from jobs import JobQueue, QueueFull
+
+
+async def wait_for(queue: JobQueue, job_id: str) -> dict:
+    while queue.get(job_id)["status"] in ("queued", "running"):
+        await asyncio.sleep(0.001)
+    return queue.get(job_id)
+
+
+def test_full_queue_rejects_instead_of_growing():
+    """Test the backpressure: with every worker busy, only max_queued jobs are accepted."""
+    async def scenario():
+        release = asyncio.Event()
+
+        async def handler(payload):
+            await release.wait()
+            return {"payload": payload}
+
+        queue = JobQueue(handler, workers=1, max_queued=2)
+        queue.start()
+        first = queue.submit(1)
+        await asyncio.sleep(0)  # the worker takes job 1, freeing its slot
+        queue.submit(2)
+        queue.submit(3)
+        assert queue.full()
+        with pytest.raises(QueueFull):
+            queue.submit(4)
+
+        release.set()
+        assert (await wait_for(queue, first["id"]))["result"] == {"payload": 1}
+        await queue.stop()
+
+    asyncio.run(scenario())
+
+
+def test_failed_job_reports_error():
+    async def scenario():
+        async def handler(payload):
+            raise ValueError("no text")
+
+        queue = JobQueue(handler, workers=1)
+        queue.start()
+        job = await wait_for(queue, queue.submit(b"")["id"])
+        await queue.stop()
+        return job
+
+    job = asyncio.run(scenario())
+    assert job["status"] == "failed"
+    assert job["error"] == "no text"
+
+
+def test_oldest_finished_jobs_are_forgotten():
+    async def scenario():
+        async def handler(payload):
+            return {}
+
+        queue = JobQueue(handler, workers=1, max_finished=2)
+        queue.start()
+        ids = [queue.submit(i)["id"] for i in range(3)]
+        await wait_for(queue, ids[-1])
+        await queue.stop()
+        return queue, ids
+
+    queue, ids = asyncio.run(scenario())
+    assert queue.get(ids[0]) is None
+    assert queue.get(ids[2])["status"] == "done"
+
+
+def test_stop_drops_queued_jobs():
+    """Test that jobs still waiting at shutdown are failed and their payloads released, not leaked."""
+    async def scenario():
+        dropped = []
+
+        async def handler(payload):
+            await asyncio.Event().wait()  # never finishes
+
+        queue = JobQueue(handler, workers=1, on_drop=dropped.append)
+        queue.start()
+        running = queue.submit("running")
+        await asyncio.sleep(0)
+        waiting = [queue.submit(name) for name in ("a", "b")]
+        await queue.stop()
+        return queue, dropped, running, waiting
+
+    queue, dropped, running, waiting = asyncio.run(scenario())
+    assert dropped == ["a", "b"]
+    assert all(queue.get(job["id"])["status"] == "failed" for job in waiting)
+    assert queue.stats()["queued"] == 0
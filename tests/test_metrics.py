@@ -0,0 +1,27 @@
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow importing the metrics module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from metrics import Counter, Histogram, server_timing
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("t_seconds", "test", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, "ner")
+
+    lines = histogram.render()
+    assert 't_seconds_bucket{stage="ner",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{stage="ner",le="1.0"} 2' in lines
+    assert 't_seconds_bucket{stage="ner",le="+Inf"} 3' in lines
+    assert 't_seconds_count{stage="ner"} 3' in lines
+
+
+def test_counter_without_labels_starts_at_zero():
+    assert Counter("t_total", "test").render()[-1] == "t_total 0"
+
+
+def test_server_timing_uses_pipeline_order_and_milliseconds():
+    assert server_timing({"ner": 0.0125, "upload": 0.001}) == "upload;dur=1.00, ner;dur=12.50"
@@ -0,0 +1,172 @@
+import sys
+import pytest
+from pathlib import Path
+
+# Add parent directory to path to allow importing the pipeline module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import spacy
+import srsly
+from pipeline import ARTIFACT_STAMP, build_artifact, excluded_components, load_model_with_ruler, load_pipeline
+
+# Small reference corpus: names, skills, orgs, locations, section headers and job titles
+REFERENCE_CORPUS = [
+    "Leonardo Ruhmann. Desenvolvedor Python com experiencia em Docker e Kubernetes.",
+    "Maria Souza. Engenheira de Software na Petrobras em Belo Horizonte, Minas Gerais.",
+    "Formação acadêmica. Bacharelado em Ciência da Computação pela Universidade de São Paulo.",
+    "Experiência profissional. Analista de Dados no Itaú Unibanco, usando SQL, Pandas e AWS.",
+    "João Pedro Alves. Contato: joao@email.com. Rio de Janeiro. Habilidades: React, Node.js, CI/CD.",
+]
+
+
+@pytest.fixture(scope="module")
+def full_nlp():
+    return load_model_with_ruler(components="all")
+
+
+@pytest.fixture(scope="module")
+def trimmed_nlp():
+    return load_model_with_ruler()
+
+
+def test_trimmed_pipeline_keeps_only_allowed_components(trimmed_nlp):
+    """Test that the default allow-list drops everything except tok2vec, ner and the gazetteer."""
+    assert set(trimmed_nlp.pipe_names) <= {"tok2vec", "ner", "gazetteer"}
+    assert "gazetteer" in trimmed_nlp.pipe_names
+
+
+def test_trimmed_pipeline_entities_identical(full_nlp, trimmed_nlp):
+    """Test that dropping the unused components does not change a single entity."""
+    for text in REFERENCE_CORPUS:
+        full = [(e.start_char, e.end_char, e.label_) for e in full_nlp(text).ents]
+        trimmed = [(e.start_char, e.end_char, e.label_) for e in trimmed_nlp(text).ents]
+        assert trimmed == full, text
+
+
+def test_excluded_components_all_keeps_everything():
+    """Test that "all" disables the allow-list."""
+    assert excluded_components("all") == []
+
+
+def test_load_pipeline_uses_fresh_artifact(tmp_path, trimmed_nlp):
+    """Test that a freshly built artifact is loaded as-is and finds the same entities."""
+    path = str(tmp_path / "nlp")
+    fingerprint = build_artifact(path)
+
+    nlp = load_pipeline(path)
+
+    assert nlp.meta[ARTIFACT_STAMP] == fingerprint
+    assert nlp.pipe_names == trimmed_nlp.pipe_names
+    for text in REFERENCE_CORPUS:
+        assert [e.text for e in nlp(text).ents] == [e.text for e in trimmed_nlp(text).ents]
+
+
+def test_load_pipeline_rebuilds_stale_or_missing_artifact(tmp_path):
+    """Test that an artifact built from another config is ignored, as is a missing one."""
+    path = tmp_path / "nlp"
+    build_artifact(str(path))
+    meta = spacy.util.load_meta(path / "meta.json")
+    meta[ARTIFACT_STAMP] = "stale"
+    srsly.write_json(path / "meta.json", meta)
+
+    assert ARTIFACT_STAMP not in load_pipeline(str(path)).meta
+    assert ARTIFACT_STAMP not in load_pipeline(str(tmp_path / "missing")).meta
+
+
+def test_fingerprint_covers_gazetteer_matching(monkeypatch):
+    """Test that editing gazetteer.py changes the fingerprint, so cached results from the old matcher are dropped."""
+    import inspect
+    import gazetteer
+    import pipeline
+
+    before = pipeline.pipeline_fingerprint()
+    getsource = inspect.getsource
+    monkeypatch.setattr(pipeline.inspect, "getsource",
+                        lambda obj: getsource(obj) + ("# changed" if obj is gazetteer else ""))
+    assert pipeline.pipeline_fingerprint() != before
+
+
+def test_extract_entities_keeps_document_order(trimmed_nlp):
+    """Test that skills and info come back deduplicated, in order of first appearance."""
+    from pipeline import extract_entities
+
+    doc = trimmed_nlp("Docker, Python e Docker de novo. Depois Kubernetes, Python e Redis.")
+    assert extract_entities(doc)["skills"] == ["Docker", "Python", "Kubernetes", "Redis"]
+
+
+def test_analyze_files_reports_errors_in_order(tmp_path, trimmed_nlp):
+    """Test that the ingest worker stage keeps input order and marks unreadable files."""
+    from pipeline import analyze_files, init_worker
+    from test_utils import make_multipage_pdf
+
+    good = tmp_path / "good.pdf"
+    good.write_bytes(make_multipage_pdf(["Desenvolvedor Python com experiencia em Docker."]))
+    missing = str(tmp_path / "missing.pdf")
+
+    init_worker(trimmed_nlp)
+    records = analyze_files([missing, str(good)])
+
+    assert [path for path, _ in records] == [missing, str(good)]
+    assert "error" in records[0][1]
+    assert records[1][1]["skills"] == ["Python", "Docker"]
+    assert records[1][1]["extraction"]["pages_read"] == 1
+
+
+def test_analyze_texts_splits_batch_time_across_its_texts(trimmed_nlp, monkeypatch):
+    """Test that texts of one nlp.pipe batch share its time equally, and long texts keep their place."""
+    import pipeline
+    from pipeline import analyze_texts, extract_entities
+
+    monkeypatch.setattr(pipeline, "NER_CHUNK_CHARS", 85)
+    long = [i for i, text in enumerate(REFERENCE_CORPUS) if len(text) > 85]
+    assert long and len(long) < len(REFERENCE_CORPUS) - 1
+
+    analyzed = analyze_texts(trimmed_nlp, REFERENCE_CORPUS, batch_size=2)
+    assert [result["skills"] for result, _ in analyzed] == [
+        extract_entities(trimmed_nlp(text))["skills"] for text in REFERENCE_CORPUS
+    ]
+    short = [i for i in range(len(REFERENCE_CORPUS)) if i not in long]
+    ner = [analyzed[i][1]["timings"]["ner"] for i in short]
+    assert ner[0] == ner[1] and all(seconds > 0 for seconds in ner)
+
+
+def test_split_chunks_partitions_text_at_sentence_boundaries():
+    """Test that the windows respect the size limit, end at ". " when they can and join back exactly."""
+    from pipeline import split_chunks
+
+    text = " ".join(REFERENCE_CORPUS * 5)
+    chunks = split_chunks(text, 120)
+
+    assert "".join(chunks) == text
+    assert all(len(chunk) <= 120 for chunk in chunks)
+    assert all(chunk.endswith(". ") for chunk in chunks[:-1])
+    assert split_chunks("curto", 120) == ["curto"]
+    assert split_chunks("x" * 300, 120) == ["x" * 120, "x" * 120, "x" * 60]
+
+
+def test_chunked_ner_keeps_offsets_and_gazetteer_entities(trimmed_nlp):
+    """Test that windowed NER returns entities at their offsets in the full text, same as one pass."""
+    from pipeline import ner_doc
+
+    text = " ".join(REFERENCE_CORPUS * 3)
+    whole = ner_doc(trimmed_nlp, text)
+    chunked = ner_doc(trimmed_nlp, text, max_chars=150)
+
+    assert chunked.text == text
+    assert all(text[e.start_char:e.end_char] == e.text for e in chunked.ents)
+    gazetteer = lambda doc: [(e.start_char, e.text) for e in doc.ents if e.label_ == "SKILL"]
+    assert gazetteer(chunked) == gazetteer(whole)
+
+
+def test_fast_pipeline_finds_gazetteer_entities_only(trimmed_nlp):
+    """Test that mode="fast" skips the statistical components but matches the same dictionary skills."""
+    from pipeline import extract_entities, load_fast_pipeline
+
+    fast_nlp = load_fast_pipeline()
+
+    assert fast_nlp.pipe_names == ["gazetteer"]
+    for text in REFERENCE_CORPUS:
+        fast = extract_entities(fast_nlp(text))
+        assert fast["skills"] == extract_entities(trimmed_nlp(text))["skills"], text
+        assert fast["people"] == []
+    assert "Belo Horizonte" in extract_entities(fast_nlp(REFERENCE_CORPUS[1]))["info"]
@@ -0,0 +1,51 @@
+import os
+import signal
+import sys
+from types import SimpleNamespace
+from pathlib import Path
+
+# Add parent directory to path to allow importing the server module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from server import Master, memory_report, read_smaps_rollup
+
+
+def test_read_smaps_rollup_splits_shared_and_private():
+    """Test that the rollup of a live process is parsed into kB counters."""
+    rollup = read_smaps_rollup(os.getpid())
+    if rollup is None:  # kernels older than 4.14 or no /proc
+        return
+    assert rollup["Rss"] > 0
+    assert rollup["Rss"] >= rollup["Private_Dirty"]
+
+
+def test_memory_report_lists_every_process():
+    """Test that the report has one line per process, survives dead pids and ends with the PSS total."""
+    report = memory_report({os.getpid(): "master", 2 ** 22 + 1: "worker"}).splitlines()
+
+    assert len(report) == 4
+    assert "master" in report[1]
+    assert "unavailable" in report[2]
+    assert report[-1].startswith("total PSS:")
+
+
+def test_master_reloads_its_gazetteer_then_relays_to_every_worker(monkeypatch, tmp_path):
+    """Test that SIGHUP on the master reloads its copy (inherited by new forks) and signals each worker."""
+    import pipeline
+    import server
+
+    nlp = pipeline.load_fast_pipeline()
+    before = pipeline.gazetteer_version(nlp)
+    skills_file = tmp_path / "skills.txt"
+    skills_file.write_text("Elixir\n", encoding="utf-8")
+    monkeypatch.setitem(pipeline.GAZETTEER_FILES, "SKILL", str(skills_file))
+
+    signals = []
+    monkeypatch.setattr(server.os, "kill", lambda pid, sig: signals.append((pid, sig)))
+    master = Master(SimpleNamespace(state=SimpleNamespace(nlp=nlp)), None, 2, "info")
+    master.workers = {101, 102}
+    master.reload()
+
+    assert pipeline.gazetteer_version(nlp) != before
+    assert "Elixir" in [ent.text for ent in nlp("Desenvolvedor Elixir.").ents]
+    assert sorted(signals) == [(101, signal.SIGHUP), (102, signal.SIGHUP)]
@@ -0,0 +1,204 @@
+import random
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add parent directory to path to allow importing the utils module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from reference_impl import clean_text as reference_clean_text, is_valid_entity as reference_is_valid_entity
+from utils import (
+    INVALID_WORDS, JOB_KEYWORDS, EntityFilter, clean_text, extract_pdf, is_valid_entity, iter_pdf_pages, read_pdf,
+)
+
+
+def make_multipage_pdf(pages: list[str]) -> bytes:
+    """
+    Generates a valid PDF with one page per string (correct xref offsets),
+    so page-wise extraction can be tested without files on disk.
+    """
+    n = len(pages)
+    font_id = 3 + 2 * n
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % (3 + 2 * i) for i in range(n))
+        + b"] /Count %d >>" % n,
+    ]
+    for i, text in enumerate(pages):
+        stream = b"BT /F1 12 Tf 50 750 Td (" + text.encode("latin-1", errors="replace") + b") Tj ET"
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R"
+            b" /Resources << /Font << /F1 %d 0 R >> >> >>" % (4 + 2 * i, font_id)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF" % (len(objects) + 1, xref)
+    return pdf
+
+
+def test_extract_pdf_joins_pages_in_order():
+    """Test that every page ends with a newline, same as the old concatenation."""
+    extraction = extract_pdf(make_multipage_pdf(["Primeira", "Segunda", "Terceira"]))
+
+    assert extraction.text == "Primeira\nSegunda\nTerceira\n"
+    assert extraction.pages_read == extraction.total_pages == 3
+    assert not extraction.truncated
+
+
+def test_extract_pdf_stops_at_max_pages():
+    """Test that pages past the limit are never extracted."""
+    extraction = extract_pdf(make_multipage_pdf([f"Pagina {i}" for i in range(10)]), max_pages=2)
+
+    assert extraction.text == "Pagina 0\nPagina 1\n"
+    assert extraction.pages_read == 2
+    assert extraction.total_pages == 10
+    assert extraction.truncated
+
+
+def test_extract_pdf_stops_at_max_chars():
+    """Test that extraction stops once the character budget is spent."""
+    extraction = extract_pdf(make_multipage_pdf(["a" * 40] * 10), max_chars=100)
+
+    assert len(extraction.text) == 100
+    assert extraction.pages_read == 3
+    assert extraction.truncated
+
+
+def test_iter_pdf_pages_reports_failed_pages():
+    """Test that one broken page is reported instead of discarding the document."""
+    def broken():
+        raise ValueError("bad content stream")
+
+    pages = [SimpleNamespace(extract_text=lambda: "ok"), SimpleNamespace(extract_text=broken)]
+
+    assert list(iter_pdf_pages(SimpleNamespace(pages=pages))) == [(1, "ok"), (2, None)]
+
+
+def test_page_parallel_extraction_matches_serial(monkeypatch):
+    """Test that extraction through the page pool gives exactly the serial result, in page order."""
+    import utils
+
+    pdf = make_multipage_pdf([f"Experiencia na empresa {n}. Pagina {n} do curriculo." for n in range(1, 13)])
+    monkeypatch.setattr(utils, "PARALLEL_PDF_WORKERS", 1)
+    serial = extract_pdf(pdf)
+    serial_capped = extract_pdf(pdf, max_pages=11, max_chars=200)
+
+    monkeypatch.setattr(utils, "PARALLEL_PDF_WORKERS", 2)
+    monkeypatch.setattr(utils, "PARALLEL_PDF_MIN_PAGES", 10)
+    assert utils.use_page_pool(12)
+    assert extract_pdf(pdf) == serial
+    assert extract_pdf(pdf, max_pages=11, max_chars=200) == serial_capped
+
+
+def test_page_parallel_extraction_cancels_ranges_after_char_limit(monkeypatch):
+    """Test that reaching max_chars cancels the page ranges still waiting in the page pool."""
+    from concurrent.futures import Future
+    import utils
+
+    submitted = []
+
+    class QueuedPool:
+        """Runs the first range at once and leaves the others queued."""
+        def submit(self, fn, *args):
+            future = Future()
+            if not submitted:
+                future.set_result(fn(*args))
+            submitted.append(future)
+            return future
+
+    pdf = make_multipage_pdf([f"Experiencia na empresa {n}. Pagina {n} do curriculo." for n in range(1, 13)])
+    monkeypatch.setattr(utils, "page_pool", QueuedPool)
+    monkeypatch.setattr(utils, "PARALLEL_PDF_WORKERS", 2)
+    monkeypatch.setattr(utils, "PARALLEL_PDF_MIN_PAGES", 10)
+
+    extraction = extract_pdf(pdf, max_chars=20)
+    assert extraction.truncated and extraction.pages_read == 1
+    assert len(submitted) > 1 and all(future.cancelled() for future in submitted[1:])
+
+
+def test_read_pdf_garbage_returns_empty_string():
+    """Test that a corrupted upload still yields an empty string."""
+    assert read_pdf(b"definitely not a pdf") == ""
+
+
+# Building blocks for generated resumes: names, headers, job titles, page numbers,
+# odd whitespace and the punctuation that decides where sentence boundaries go
+CORPUS_PIECES = [
+    "Leonardo Ruhmann", "Maria das Graças Souza", "EXPERIÊNCIA PROFISSIONAL", "Experiência",
+    "formação acadêmica", "Habilidades:", "Desenvolvedor Full Stack", "engenheiro de software",
+    "Analista de Dados na Petrobras", "Python, Docker, Kubernetes", "São Paulo - SP",
+    "Página 2 de 3", "page 4", "Pág. 1", "3 / 7", "2 of 5", "10 de 12", "Pagina", "Page two",
+    "Trabalhei com APIs REST e filas de mensagens em sistemas distribuídos de alta disponibilidade.",
+    "janeiro 2020 - atual", "İstanbul", "ceo", "CTO e co-founder", "e-mail: a@b.com", "fim.",
+    "Resumo!", "Objetivo?", "Contato;", "", "   ", "\t", "\r", "\xa0", " ", "\x0c", "\x1c",
+]
+
+
+def generate_resume(rng) -> str:
+    lines = []
+    for _ in range(rng.randint(0, 60)):
+        parts = rng.sample(CORPUS_PIECES, rng.randint(1, 3))
+        separator = rng.choice([" ", "  ", "\t", "\xa0", ""])
+        lines.append(rng.choice(["", " ", "\t"]) + separator.join(parts) + rng.choice(["", " ", "\r", " "]))
+    return rng.choice(["\n", "\n\n", "\n \n"]).join(lines)
+
+
+def test_clean_text_matches_reference_on_generated_corpus():
+    """Test that the single-pass cleaner is byte-identical to the original implementation."""
+    rng = random.Random(1234)
+    for _ in range(3000):
+        text = generate_resume(rng)
+        assert clean_text(text) == reference_clean_text(text), repr(text)
+
+
+def test_clean_text_edge_cases():
+    """Test the boundary rules on small hand-written inputs."""
+    for text in ["", "\n", "Leonardo Ruhmann\nFullstack", "Nome\ndesenvolvedor", "Página 1 de 2", "a\n\nB", "x" * 60 + "\ny"]:
+        assert clean_text(text) == reference_clean_text(text)
+    assert clean_text("Leonardo Ruhmann\nDesenvolvedor Python\nPágina 1 de 2") == "Leonardo Ruhmann. Desenvolvedor Python."
+
+
+ENTITY_LABELS = ["PER", "ORG", "LOC", "GPE", "MISC", "SKILL"]
+ENTITY_PIECES = (
+    sorted(INVALID_WORDS) + sorted(JOB_KEYWORDS)
+    + ["Leonardo", "Ruhmann", "Petrobras", "UFMG", "São Paulo", "Itaú", "Nubank", "Douglas", "Nascimento"]
+    + ["https://x.io", "www.site", "a@b", ".com", "2020", "R$", "!", "#", "%", "*", "-", "ab", "X", " ", "\t"]
+)
+
+
+def random_entity(rng) -> str:
+    """ Joins a few pieces and mutates case/padding, so every rule fires on some inputs """
+    text = rng.choice(["", " ", "  "]).join(rng.sample(ENTITY_PIECES, rng.randint(1, 3)))
+    text = rng.choice([str.lower, str.upper, str.title, str.capitalize, lambda t: t])(text)
+    return rng.choice(["", " ", "\n"]) + text + rng.choice(["", " "])
+
+
+def test_entity_filter_matches_reference_decisions():
+    """Property test: the compiled filter decides exactly like the original function."""
+    rng = random.Random(99)
+    for _ in range(20000):
+        text, label = random_entity(rng), rng.choice(ENTITY_LABELS)
+        assert is_valid_entity(text, label) == reference_is_valid_entity(text, label), (text, label)
+
+
+def test_entity_filter_memo_is_bounded_and_consistent():
+    """Test that repeated lookups hit the memo, never exceed its size, and never change the answer."""
+    entity_filter = EntityFilter(cache_size=8)
+    rng = random.Random(5)
+    samples = [(random_entity(rng), rng.choice(ENTITY_LABELS)) for _ in range(50)]
+
+    first = [entity_filter(text, label) for text, label in samples]
+    second = [entity_filter(text, label) for text, label in samples]
+
+    assert first == second == [reference_is_valid_entity(text, label) for text, label in samples]
+    assert entity_filter.is_valid.cache_info().currsize <= 8
+    assert EntityFilter(cache_size=8)("Leonardo Ruhmann", "PER") is True
@@ -0,0 +1,125 @@
+import hashlib
+import os
+import tempfile
+from typing import NamedTuple
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+import metrics
+from config import MAX_UPLOAD_BYTES, MAX_UPLOAD_MB, MAX_BATCH_BYTES, UPLOAD_SPOOL_BYTES
+
+TOO_LARGE_DETAIL = f"File is larger than {MAX_UPLOAD_MB:g} MB"
+
+# Request body caps of the endpoints that take several files (the others get MAX_UPLOAD_BYTES)
+BODY_LIMITS = {"/analyze/batch": MAX_BATCH_BYTES}
+
+# Every PDF starts with this header. The spec lets it appear anywhere in the first 1024 bytes.
+PDF_MAGIC = b"%PDF-"
+MAGIC_WINDOW = 1024
+CHUNK_SIZE = 1024 * 1024
+
+
+class Upload(NamedTuple):
+    """ A received PDF: its SHA-256, size and either the bytes or the path of a spooled temp file """
+    digest: str
+    size: int
+    source: bytes | str
+
+
+class UploadLimitMiddleware:
+    """
+    Pure ASGI middleware that caps request bodies at `max_bytes`, or at the limit `limits`
+    gives for the request's path (the batch endpoint carries many files per body).
+    A Content-Length over the limit is answered with 413 before a single body byte is
+    read; bodies without one (chunked) are counted while they stream in and cut off
+    with 413 as soon as they cross the limit. Each file is capped on its own by receive_upload().
+    """
+
+    def __init__(self, app, max_bytes: int = MAX_UPLOAD_BYTES, limits: dict[str, int] | None = None):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.limits = BODY_LIMITS if limits is None else limits
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT"):
+            await self.app(scope, receive, send)
+            return
+
+        if scope["path"] in self.limits:
+            max_bytes = self.limits[scope["path"]]
+            detail = f"Request is larger than {max_bytes / (1024 * 1024):g} MB"
+        else:
+            max_bytes, detail = self.max_bytes, TOO_LARGE_DETAIL
+
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        if length.isdigit() and int(length) > max_bytes:
+            metrics.REJECTIONS.inc("too_large")
+            response = JSONResponse({"detail": detail}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    metrics.REJECTIONS.inc("too_large")
+                    # Raised inside the body parser, turned into the 413 response by FastAPI
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def receive_upload(file: UploadFile) -> Upload | None:
+    """
+    Checks the PDF header and hashes the upload in chunks.
+    Returns None when the bytes are not a PDF, whatever the declared content type, and
+    raises a 413 HTTPException for a file over MAX_UPLOAD_BYTES (counted while it is read).
+    Small files come back as bytes; files over UPLOAD_SPOOL_BYTES are copied chunk by
+    chunk to a temp file whose path is returned (call discard() when done with it).
+    """
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise too_large()
+
+    head = await file.read(MAGIC_WINDOW)
+    if PDF_MAGIC not in head:
+        return None
+
+    digest = hashlib.sha256(head)
+    if file.size is not None and file.size <= UPLOAD_SPOOL_BYTES:
+        rest = await file.read()
+        digest.update(rest)
+        return Upload(digest.hexdigest(), len(head) + len(rest), head + rest)
+
+    size = len(head)
+    with tempfile.NamedTemporaryFile(prefix="vitae-", suffix=".pdf", delete=False) as spool:
+        spool.write(head)
+        while chunk := await file.read(CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_UPLOAD_BYTES:
+                break
+            digest.update(chunk)
+            spool.write(chunk)
+    if size > MAX_UPLOAD_BYTES:
+        os.unlink(spool.name)
+        raise too_large()
+    return Upload(digest.hexdigest(), size, spool.name)
+
+
+def too_large() -> HTTPException:
+    metrics.REJECTIONS.inc("too_large")
+    return HTTPException(status_code=413, detail=TOO_LARGE_DETAIL)
+
+
+def discard(upload: Upload | None):
+    """ Removes the temp file behind a spooled upload, if any """
+    if upload is not None and isinstance(upload.source, str):
+        try:
+            os.unlink(upload.source)
+        except FileNotFoundError:
+            pass
@@ -1,6 +1,15 @@
 import re
 import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from functools import lru_cache
+from typing import BinaryIO, Iterator, NamedTuple
 from pypdf import PdfReader
+from config import (
+    MAX_PDF_PAGES, MAX_PDF_CHARS, ENTITY_FILTER_CACHE_SIZE, PARALLEL_PDF_MIN_PAGES, PARALLEL_PDF_WORKERS,
+)
 
 # Resume section headers (not People or Orgs)
 SECTION_HEADERS = {
@@ -52,63 +61,134 @@ JOB_KEYWORDS = {
 }
 
 
+# Regex to identify "Page 1 of 3", "Página 2", "1 / 4" (Case Insensitive)
+# 1. Matches "Page 1", "Pag. 1", "Página 1 de 2"
+# 2. Matches isolated numbers like "1 / 3" or "2 of 5"
+PAGE_NUMBER_PATTERN = re.compile(
+    r'^\s*(?:(?:p[áa]gina|page|p[áa]g\.?)\s*\d+(?:\s*(?:de|of|/)\s*\d+)?|\d+\s*(?:/|of|de)\s*\d+)\s*$',
+    re.IGNORECASE,
+)
+
+# Words that open a new section (headers, noise, job titles), indexed by first letter.
+# A line starting with one of them gets a sentence boundary before it.
+def index_by_initial(words: set[str]) -> dict[str, tuple[str, ...]]:
+    """ {first letter: words} so a prefix check only looks at the words that can match """
+    index = {}
+    for word in sorted(words):
+        index.setdefault(word[0], []).append(word)
+    return {initial: tuple(group) for initial, group in index.items()}
+
+
+SECTION_STARTERS = INVALID_WORDS.union(JOB_KEYWORDS)
+SECTION_STARTERS_BY_INITIAL = index_by_initial(SECTION_STARTERS)
+
+
 def clean_text(text: str) -> str:
     """
     Pre-processing: Removes noise but preserves sentence structure.
+    Single pass over the lines, producing the whitespace-normalised text directly.
     """
-    # Regex to identify "Page 1 of 3", "Página 2", "1 / 4"
-    # 1. Matches "Page 1", "Pag. 1", "Página 1 de 2" (Case Insensitive)
-    page_pattern = re.compile(r'^\s*(?:p[áa]gina|page|p[áa]g\.?)\s*\d+(?:\s*(?:de|of|/)\s*\d+)?\s*$', re.IGNORECASE)
-    # 2. Matches isolated numbers like "1 / 3" or "2 of 5"
-    number_pattern = re.compile(r'^\s*\d+\s*(?:/|of|de)\s*\d+\s*$', re.IGNORECASE)
-
-
     # Add sentence boundary when a line that looks like a name is followed by skills/job keywords
     # This prevents "Leonardo Ruhmann\nFullstack" from becoming one entity
     lines = text.split('\n')
-    cleaned_lines = []
-    
-    SECTION_STARTERS = INVALID_WORDS.union(JOB_KEYWORDS)
-    
-    for i, line in enumerate(lines):
-        line = line.strip()
+    last = len(lines) - 1
+    words = []
+
+    next_line = lines[0].strip()
+    for i in range(len(lines)):
+        line = next_line
+        next_line = lines[i + 1].strip() if i < last else ""
+
         if not line: continue
 
-        if page_pattern.match(line) or number_pattern.match(line): continue
+        if PAGE_NUMBER_PATTERN.match(line): continue
 
         add_period = False
-        
+
         # Check if current line looks like a name (2-3 capitalized words, no special chars)
         # Pattern: FirstName LastName or FirstName MiddleName LastName
-        if line[-1] not in ".!?:;":
-            
-            if i < len(lines) - 1:
-                next_line = lines[i+1].strip()
-                next_line_lower = next_line.lower()
+        if line[-1] not in ".!?:;" and i < last:
+            next_line_lower = next_line.lower()
+            starters = SECTION_STARTERS_BY_INITIAL.get(next_line_lower[:1])
 
-                if any(next_line_lower.startswith(word) for word in SECTION_STARTERS):
+            if starters and next_line_lower.startswith(starters):
+                add_period = True
+            elif len(line) < 50:
+                if next_line and next_line[0].isupper():
                     add_period = True
-                elif len(line) < 50:
-                    if next_line and next_line[0].isupper():
-                        add_period = True
-                    elif len(next_line) > 50:
-                        add_period = True
-
-        if add_period:        
-            line += "."
-                
-        cleaned_lines.append(line)
-    
-    text = ' '.join(cleaned_lines)
-    
-    # Replace newlines with space
-    text = re.sub(r'\n+', ' ', text)
-    
-    # Replace multiple spaces with a single space
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Strip leading/trailing whitespace
-    return text.strip()
+                elif len(next_line) > 50:
+                    add_period = True
+
+        # split() also collapses every inner whitespace run to a single space
+        line_words = line.split()
+        if add_period:
+            line_words[-1] += "."
+
+        words.extend(line_words)
+
+    return ' '.join(words)
+
+
+class EntityFilter:
+    """
+    Post-processing filter: Decides if an entity is 'real' or noise.
+    Compiled once from the word lists: one alternation regex finds any job keyword
+    inside the text in a single scan, and decisions are memoised per (text, label)
+    because the same orgs and locations show up in resume after resume.
+    """
+
+    # Rule 1: Regex to catch URLs, Emails, or file paths mistakenly labeled
+    URL_PATTERN = re.compile(r'https?://|www\.|@|\.com')
+    # Rule: People and places don't have numbers or symbols
+    SYMBOL_PATTERN = re.compile(r'\d|[!@#$%*]')
+    # Rule: "Graduação em..." is a Degree, NOT an Organization //Need update in the future
+    DEGREE_PREFIXES = ("graduação", "bacharelado", "ensino", "mestrado")
+
+    def __init__(self, invalid_words: set[str] = INVALID_WORDS, job_keywords: set[str] = JOB_KEYWORDS,
+                 cache_size: int = ENTITY_FILTER_CACHE_SIZE):
+        self.invalid_words = frozenset(invalid_words)
+        self.job_pattern = re.compile("|".join(re.escape(job) for job in sorted(job_keywords, key=len, reverse=True)))
+        self.is_valid = lru_cache(maxsize=cache_size)(self._is_valid)
+
+    def __call__(self, text: str, label: str) -> bool:
+        return self.is_valid(text, label)
+
+    def _is_valid(self, text: str, label: str) -> bool:
+        text = text.strip()
+        text_lower = text.lower()
+
+        # Universal Rules:
+        if len(text) < 3: return False
+        if self.URL_PATTERN.search(text_lower): return False
+
+        # Rule: Check against our Massive Blacklist (also covers section headers posing as people or places)
+        if text_lower in self.invalid_words: return False
+
+        # Rule 4: Filter PER (Person) entities
+        if label == "PER":
+            if text.islower(): return False
+            # Rule: A Person is NOT a Job Title (e.g. "Dev Backend")
+            if self.job_pattern.search(text_lower): return False
+            if self.SYMBOL_PATTERN.search(text): return False
+            # Rule: Must be at least 2 names ("Douglas" is risky, "Douglas Nascimento" is safe)
+            if " " not in text: return False
+
+        # Rule 5: Filter ORG (Organization) entities
+        elif label == "ORG":
+            # Rule: "Engenheiro de Software" is a Job, NOT an Organization
+            if self.job_pattern.search(text_lower): return False
+            if text_lower.startswith(self.DEGREE_PREFIXES): return False
+            # Rule: Real Orgs aren't usually all lowercase
+            if text.islower(): return False
+
+        # Rule 6: Filter LOC (Location) entities - similar checks
+        elif label == "LOC":
+            if self.SYMBOL_PATTERN.search(text): return False
+
+        return True
+
+
+ENTITY_FILTER = EntityFilter()
 
 
 def is_valid_entity(text: str, label: str) -> bool:
@@ -116,58 +196,125 @@ def is_valid_entity(text: str, label: str) -> bool:
     Post-processing filter: Decides if an entity is 'real' or noise.
     Returns True if valid, False if it should be discarded.
     """
-    text = text.strip()
-    text_lower = text.lower()
-
-    # Universal Rules:
-    if len(text) < 3: return False
-    if re.search(r'https?://|www\.|@|\.com', text_lower): return False # Rule 1: Regex to catch URLs, Emails, or file paths mistakenly labeled
-
-    # Rule: Check against our Massive Blacklist
-    if text_lower in INVALID_WORDS: return False
-    
-    # Rule 4: Filter PER (Person) entities
-    if label == "PER":
-        if text.islower(): return False
-        # Rule: A Person is NOT a Job Title (e.g. "Dev Backend")
-        if any(job in text_lower for job in JOB_KEYWORDS): return False
-        # Rule: A Person is NOT a Section Header (e.g. "Certificações")
-        if text_lower in INVALID_WORDS: return False
-        # Rule: People don't have numbers or symbols
-        if re.search(r'\d|[!@#$%*]', text): return False
-        # Rule: Must be at least 2 names ("Douglas" is risky, "Douglas Nascimento" is safe)
-        if " " not in text: return False
-    
-    # Rule 5: Filter ORG (Organization) entities
-    if label == "ORG":
-        # Rule: "Engenheiro de Software" is a Job, NOT an Organization
-        if any(job in text_lower for job in JOB_KEYWORDS): return False
-        # Rule: "Graduação em..." is a Degree, NOT an Organization //Need update in the future
-        if text_lower.startswith(("graduação", "bacharelado", "ensino", "mestrado")): return False
-        # Rule: Real Orgs aren't usually all lowercase
-        if text.islower(): return False
-    
-    # Rule 6: Filter LOC (Location) entities - similar checks
-    if label == "LOC":
-        if text_lower in INVALID_WORDS: return False
-        # Rule: People don't have numbers or symbols
-        if re.search(r'\d|[!@#$%*]', text): return False
-
-    return True
-
-def read_pdf(file_byte: bytes) -> str:
-    """ Extracts raw text from a PDF file in memory """
+    return ENTITY_FILTER(text, label)
+
+
+class PdfExtraction(NamedTuple):
+    """ Result of extract_pdf(): the raw text plus what happened on the way """
+    text: str
+    pages_read: int
+    total_pages: int
+    failed_pages: list[int]
+    truncated: bool
+
+
+def iter_pdf_pages(pdf: PdfReader, max_pages: int = MAX_PDF_PAGES, first: int = 1) -> Iterator[tuple[int, str | None]]:
+    """
+    Yields (page_number, text) one page at a time, from page `first` up to max_pages.
+    Text is None when that page could not be extracted, the rest keep going.
+    """
+    for number in range(first, min(len(pdf.pages), max_pages) + 1):
+        try:
+            yield number, pdf.pages[number - 1].extract_text()
+        except Exception:
+            yield number, None
+
+
+def extract_page_range(source: bytes | str, first: int, last: int) -> list[tuple[int, str | None]]:
+    """ Runs in the page pool: opens the PDF and extracts pages first..last """
+    pdf = PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+    return list(iter_pdf_pages(pdf, last, first))
+
+
+_page_pool = None
+_page_pool_lock = threading.Lock()
+
+
+def page_pool() -> ProcessPoolExecutor:
+    """ Process pool for page-parallel extraction, started on first use """
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            _page_pool = ProcessPoolExecutor(
+                max_workers=PARALLEL_PDF_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _page_pool
+
+
+def use_page_pool(pages: int) -> bool:
+    # Rule: parallelise at one level only. Inside a worker process (the default "process"
+    # API pool, ingest), the cores are already busy with other documents, so only
+    # extraction outside worker processes (VITAE_WORKER_POOL=thread, scripts) goes parallel
+    return PARALLEL_PDF_WORKERS > 1 and pages >= PARALLEL_PDF_MIN_PAGES and multiprocessing.parent_process() is None
+
+
+def iter_pdf_pages_parallel(source: bytes | str, pages: int) -> Iterator[tuple[int, str | None]]:
+    """
+    Same output as iter_pdf_pages(), but page ranges are extracted in the page pool
+    (each worker parses the PDF itself) and reassembled in order.
+    """
+    # A few ranges per worker, so one slow range doesn't leave the others idle
+    n_ranges = min(pages, PARALLEL_PDF_WORKERS * 4)
+    bounds = [pages * i // n_ranges for i in range(n_ranges + 1)]
+    futures = [
+        page_pool().submit(extract_page_range, source, bounds[i] + 1, bounds[i + 1])
+        for i in range(n_ranges)
+    ]
     try:
-        # create a PDF reader object from the bytes
-        pdf = PdfReader(io.BytesIO(file_byte))
+        for future in futures:
+            yield from future.result()
+    finally:
+        # Closed early (max_chars reached) or failed: ranges not started yet are dropped
+        for future in futures:
+            future.cancel()
 
-        text = ""
 
-        for page in pdf.pages:
-            text += page.extract_text() + "\n"
+def extract_pdf(source: bytes | str | BinaryIO, max_pages: int = MAX_PDF_PAGES,
+                max_chars: int = MAX_PDF_CHARS) -> PdfExtraction:
+    """
+    Extracts raw text page by page and joins it once.
+    Stops early at max_pages or max_chars and reports the pages that failed.
+    Long PDFs are extracted by the page pool (see use_page_pool) with the same result.
+    """
+    try:
+        pdf = PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+        total_pages = len(pdf.pages)
+    except Exception:
+        # If the pdf is corrupted or weird, there is nothing to extract
+        return PdfExtraction("", 0, 0, [], False)
 
-        return text
+    pages_to_read = min(total_pages, max_pages)
+    if use_page_pool(pages_to_read):
+        if not isinstance(source, (bytes, str)):
+            source.seek(0)
+            source = source.read()
+        pages = iter_pdf_pages_parallel(source, pages_to_read)
+    else:
+        pages = iter_pdf_pages(pdf, max_pages)
 
-    except Exception as e:
-        # If the pdf is corrupted or weird, return empty string
-        return ""
\ No newline at end of file
+    parts = []
+    chars = 0
+    pages_read = 0
+    failed_pages = []
+
+    with closing(pages):  # stopping early cancels the page ranges still queued
+        for number, text in pages:
+            pages_read = number
+            if text is None:
+                failed_pages.append(number)
+                continue
+
+            parts.append(text + "\n")
+            chars += len(text) + 1
+            if chars >= max_chars:
+                break
+
+    text = "".join(parts)
+    truncated = len(text) > max_chars or pages_read < total_pages
+
+    return PdfExtraction(text[:max_chars], pages_read, total_pages, failed_pages, truncated)
+
+
+def read_pdf(file_byte: bytes | str | BinaryIO) -> str:
+    """ Extracts raw text from a PDF file in memory """
+    return extract_pdf(file_byte).text